@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+"""
+Micro-benchmark of the edge emission between adjacent layers
+
+Compares the bulk _connect_layers with the previous per-edge path, which called
+Graph.edge() once per edge, on wide dense stacks.
+
+$ python benchmarks/bench_connect.py
+"""
+
+import os
+import sys
+import timeit
+
+import graphviz as gv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from neuralnet_visualize.visualize import visualizer
+
+def per_edge(names, types, units, l1_idx, l2_idx):
+    # The previous implementation, one Graph.edge() call and two name concatenations per edge
+
+    edges = gv.Graph()
+
+    for l1 in range(min(units[l1_idx], 10)):
+        for l2 in range(min(units[l2_idx], 10)):
+            if types[l1_idx] in ['dense', 'linear'] and types[l2_idx] in ['dense', 'linear']:
+                n1 = names[l1_idx]+'_'+str(l1)
+                n2 = names[l2_idx]+'_'+str(l2)
+            elif types[l1_idx] in ['dense', 'linear']:
+                n1 = names[l1_idx]+'_'+str(l1)
+                n2 = names[l2_idx]
+            elif types[l2_idx] in ['dense', 'linear']:
+                n1 = names[l1_idx]
+                n2 = names[l2_idx]+'_'+str(l2)
+            else:
+                n1 = names[l1_idx]
+                n2 = names[l2_idx]
+
+            edges.edge(n1, n2)
+
+    return edges.body
+
+def main():
+    for depth in [10, 100, 1000]:
+        network = visualizer()
+        for _ in range(depth):
+            network.add_layer('dense', 64)
+
+        pairs = range(depth - 1)
+        names, types, units = network.layer_names_, network.layer_types_, network.layer_units_
+
+        old = min(timeit.repeat(lambda: [per_edge(names, types, units, i, i+1) for i in pairs], number=3, repeat=5)) / 3
+        new = min(timeit.repeat(lambda: [network._connect_layers(i, i+1) for i in pairs], number=3, repeat=5)) / 3
+
+        print("{:>5} dense layers: per-edge {:8.2f} ms, bulk {:8.2f} ms, speedup {:5.1f}x".format(depth, old * 1e3, new * 1e3, old / new))
+
+if __name__ == '__main__':
+    main()
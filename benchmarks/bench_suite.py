@@ -0,0 +1,239 @@
+#!/usr/bin/python3
+
+"""
+Benchmark suite of the graph construction and rendering at scale
+
+Builds synthetic architectures and times every stage separately
+
+* add_layer : adding all the layers to a new visualizer
+* build : _build_network, emitting the node and edge fragments
+* source : serializing the DOT source
+* svg : drawing with the native engine
+* dot : piping the DOT source to the dot process, only when it is installed and for the cases up to --dot-max layers
+
+The peak memory of the whole pipeline is measured with tracemalloc, in a separate run so that
+tracing does not slow down the timings.
+
+The results are compared with the baseline in benchmarks/baseline.json, a stage slower than the
+baseline by more than the threshold is a regression and the exit status is 1. The timings only
+compare on the machine which wrote them, so the baseline is not committed, and a baseline written
+on another machine or Python version is skipped with a warning. In CI, write the baseline from the
+base commit then compare the change on the same runner. A missing baseline is an error with
+--require-baseline or when the CI environment variable is set, so the gate cannot pass without
+comparing anything.
+
+$ git stash && python benchmarks/bench_suite.py --save && git stash pop   # baseline of the base commit
+$ python benchmarks/bench_suite.py                                         # compare with it
+$ python benchmarks/bench_suite.py --quick -k dense                        # only the small dense cases
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import argparse
+import platform
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from neuralnet_visualize.visualize import visualizer
+from neuralnet_visualize.layout import LayeredLayout
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+STAGES = ['add_layer', 'build', 'source', 'svg', 'dot']
+
+# stages faster than this are too noisy to compare with the baseline
+MIN_SECONDS = 0.01
+
+def dense_stack(depth, units=16):
+    # A stack of dense layers, drawn with all their nodes
+    return [dict(layer_type='dense', nodes=units) for _ in range(depth)]
+
+def wide_stack(depth, units=4096):
+    # Dense layers wider than the 10 node cap
+    return [dict(layer_type='dense', nodes=units) for _ in range(depth)]
+
+def conv_mix(blocks):
+    # conv/conv/pool blocks, then flatten and a dense head
+    layers = list()
+    for i in range(blocks):
+        layers.append(dict(layer_type='conv2d', filters=32 * (i % 4 + 1), kernel_size=3, padding='same', stride=1))
+        layers.append(dict(layer_type='conv2d', filters=32 * (i % 4 + 1), kernel_size=(3, 3), padding='same', stride=1))
+        layers.append(dict(layer_type=['maxpool2d', 'avgpool2d'][i % 2], pool_size=2))
+    layers.append(dict(layer_type='flatten'))
+    layers.extend(dense_stack(2, 64))
+    layers.append(dict(layer_type='dense', nodes=10))
+
+    return layers
+
+def cases(quick=False):
+    # (name, layers) of every benchmark case
+    depths = [10, 100, 1000] if quick else [10, 100, 1000, 10000]
+
+    result = list()
+    for depth in depths:
+        result.append(('dense_'+str(depth), dense_stack(depth)))
+    for depth in depths[:-1]:
+        result.append(('wide_'+str(depth), wide_stack(depth)))
+    for blocks in ([10, 100] if quick else [10, 100, 1000]):
+        result.append(('conv_'+str(blocks), conv_mix(blocks)))
+
+    return result
+
+def run_pipeline(layers, timings=None, dot=False):
+    # Run every stage once, adding its duration to timings
+
+    def stage(name, start):
+        now = time.perf_counter()
+        if timings is not None:
+            timings[name] = now - start
+        return now
+
+    start = time.perf_counter()
+    network = visualizer(filename='bench')
+    for layer in layers:
+        network.add_layer(**layer)
+    start = stage('add_layer', start)
+
+    network._build_network()
+    start = stage('build', start)
+
+    source = network.network_.source
+    start = stage('source', start)
+
+    LayeredLayout(network).to_svg()
+    start = stage('svg', start)
+
+    if dot:
+        network.network_.pipe(format='svg')
+        stage('dot', start)
+
+    return len(source)
+
+def measure(layers, repeat, dot):
+    # Best time of every stage over the repeats, and the peak memory of a traced run
+
+    best = dict()
+    for _ in range(repeat):
+        timings = dict()
+        gc.collect()
+        dot_bytes = run_pipeline(layers, timings, dot)
+        for name, value in timings.items():
+            best[name] = min(best.get(name, value), value)
+
+    gc.collect()
+    tracemalloc.start()
+    run_pipeline(layers, None, False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(seconds=best, peak_bytes=peak, dot_bytes=dot_bytes)
+
+def environment()->dict:
+    # Machine and Python version the timings were measured on
+
+    return dict(python=platform.python_version(), machine=platform.machine(), host=platform.node())
+
+def compare(results, baseline, threshold):
+    # Regressions of the results against the baseline, as printable lines
+
+    regressions = list()
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+
+        for stage, seconds in result['seconds'].items():
+            before = old['seconds'].get(stage)
+            if before and max(before, seconds) > MIN_SECONDS and seconds > before * (1 + threshold):
+                regressions.append("{} {}: {:.2f} ms -> {:.2f} ms (+{:.0%})".format(name, stage, before * 1e3, seconds * 1e3, seconds / before - 1))
+
+        before = old.get('peak_bytes')
+        if before and result['peak_bytes'] > before * (1 + threshold):
+            regressions.append("{} peak memory: {:.1f} MiB -> {:.1f} MiB (+{:.0%})".format(name, before / 2**20, result['peak_bytes'] / 2**20, result['peak_bytes'] / before - 1))
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the graph construction and rendering at scale")
+    parser.add_argument('-k', dest='match', default='', help="only run the cases whose name contains this string")
+    parser.add_argument('--quick', action='store_true', help="skip the largest cases")
+    parser.add_argument('--repeat', type=int, default=5, help="runs of every case, the best time is kept (default: 5)")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed slow down over the baseline (default: 0.25)")
+    parser.add_argument('--baseline', default=BASELINE, help="baseline JSON file (default: benchmarks/baseline.json)")
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--require-baseline', action='store_true', default=bool(os.environ.get('CI')),
+                        help="fail when there is no baseline (default: set when the CI environment variable is)")
+    parser.add_argument('--dot-max', type=int, default=1000, help="largest number of layers rendered with dot (default: 1000)")
+    args = parser.parse_args(argv)
+
+    has_dot = shutil.which('dot') is not None
+    if not has_dot:
+        print("dot is not installed, the dot stage is skipped")
+
+    # the lazy imports and the first compiled regexes are not part of any case
+    run_pipeline(conv_mix(1))
+
+    results = dict()
+    header = "{:<12}{:>8}  ".format('case', 'layers') + "".join("{:>12}".format(s+' ms') for s in STAGES) + "{:>12}{:>12}".format('peak MiB', 'DOT KiB')
+    print(header)
+    print("-" * len(header))
+
+    for name, layers in cases(args.quick):
+        if args.match not in name:
+            continue
+
+        result = measure(layers, args.repeat, has_dot and len(layers) <= args.dot_max)
+        results[name] = result
+
+        seconds = result['seconds']
+        row = "{:<12}{:>8}  ".format(name, len(layers))
+        row = row + "".join("{:>12.2f}".format(seconds[s] * 1e3) if s in seconds else "{:>12}".format('-') for s in STAGES)
+        row = row + "{:>12.1f}{:>12.1f}".format(result['peak_bytes'] / 2**20, result['dot_bytes'] / 2**10)
+        print(row)
+
+    if args.save:
+        baseline = dict()
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get('cases', {})
+        baseline.update(results)
+
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(environment(), cases=baseline), f, indent=2, sort_keys=True)
+        print("Baseline written to "+args.baseline)
+
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline at "+args.baseline+", run with --save to create it")
+        return 1 if args.require_baseline else 0
+
+    with open(args.baseline) as f:
+        stored = json.load(f)
+
+    measured = environment()
+    if any(stored.get(key) != value for key, value in measured.items()):
+        written = ", ".join(key+"="+str(stored.get(key)) for key in measured)
+        print("\nWarning: the baseline was written on "+written+", the comparison is skipped, run with --save on this machine")
+        return 0
+
+    baseline = stored.get('cases', {})
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\n{} regression(s) over {:.0%}".format(len(regressions), args.threshold))
+        for line in regressions:
+            print("  "+line)
+        return 1
+
+    print("\nNo regression over {:.0%}".format(args.threshold))
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
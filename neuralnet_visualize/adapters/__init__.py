@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+
+"""
+Framework Adapters
+==================
+
+An adapter converts a model of some framework into the layers of the visualizer. It is a
+generator function which takes the model and yields one dict of add_layer() arguments per layer.
+
+The adapters are registered by their dotted path, so neither the adapter module nor its
+framework is imported until the adapter is used for the first time.
+"""
+
+import importlib
+
+_ADAPTERS = {
+    'pytorch': 'neuralnet_visualize.adapters.pytorch:iter_graph_layers',
+    'pytorch_modules': 'neuralnet_visualize.adapters.pytorch:iter_layers',
+    'tensorflow': 'neuralnet_visualize.adapters.tensorflow:iter_layers',
+    'keras_config': 'neuralnet_visualize.adapters.tensorflow:iter_config_layers',
+    'keras_file': 'neuralnet_visualize.adapters.keras_file:iter_layers',
+    'onnx': 'neuralnet_visualize.adapters.onnx_file:iter_layers',
+}
+
+def register_adapter(name:str, adapter)->None:
+    """Registers an adapter
+
+    Parameters
+    ----------
+    name : str
+        Name of the adapter, used with visualizer.from_adapter()
+    adapter : callable or str
+        Generator function taking the model and yielding dicts of add_layer() arguments,
+        or its 'package.module:function' path, imported on first use
+
+    Examples
+    --------
+    >>> from neuralnet_visualize.adapters import register_adapter
+    >>>
+    >>> def iter_mlp(sizes):
+    ...     for size in sizes:
+    ...         yield dict(layer_type='dense', nodes=size)
+    >>>
+    >>> register_adapter('mlp', iter_mlp)
+    >>> network.from_adapter('mlp', [7, 12, 4])
+    """
+
+    if not callable(adapter) and not isinstance(adapter, str):
+        raise TypeError("Expects a callable or a 'module:function' path, but got "+str(type(adapter)))
+
+    _ADAPTERS[name] = adapter
+
+    return
+
+def get_adapter(name:str):
+    """Gives the adapter registered with the given name, importing it if needed
+
+    Parameters
+    ----------
+    name : str
+        Name of the adapter
+
+    Returns
+    -------
+    adapter : callable
+        Generator function yielding dicts of add_layer() arguments
+
+    Raises
+    ------
+    KeyError
+        When there is no adapter with that name
+    """
+
+    if name not in _ADAPTERS:
+        raise KeyError("No adapter named '"+name+"', the registered adapters are "+str(sorted(_ADAPTERS)))
+
+    adapter = _ADAPTERS[name]
+    if isinstance(adapter, str):
+        module, function = adapter.split(':')
+        adapter = getattr(importlib.import_module(module), function)
+        _ADAPTERS[name] = adapter
+
+    return adapter
+
+def adapter_names()->list:
+    """Gives the names of all the registered adapters"""
+
+    return sorted(_ADAPTERS)
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+
+"""
+Keras File Adapter
+==================
+
+Reads the architecture of a saved keras model without importing tensorflow. Only the model
+config JSON is read, the weight tensors are never touched.
+
+* .keras files are zip archives, only their 'config.json' member is read
+* .h5 files store the config in the 'model_config' attribute of the root group, read with h5py
+"""
+
+import json
+import zipfile
+
+from .tensorflow import iter_config_layers
+
+def read_config(path:str)->dict:
+    """Reads the model config of a saved keras model
+
+    Parameters
+    ----------
+    path : str
+        Path of a .keras or .h5 file
+
+    Returns
+    -------
+    config : dict
+        The model config, with its 'layers' list
+
+    Raises
+    ------
+    ImportError
+        When an HDF5 file is given and h5py is not installed
+    ValueError
+        When the file has no model config
+    """
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            try:
+                model_config = json.loads(archive.read('config.json'))
+            except KeyError:
+                raise ValueError(path+" is not a keras archive, it has no config.json")
+    else:
+        try:
+            import h5py
+        except ImportError:
+            raise ImportError("Reading HDF5 keras files needs h5py, install it with `pip install h5py`")
+
+        with h5py.File(path, 'r') as f:
+            if 'model_config' not in f.attrs:
+                raise ValueError(path+" has no model_config, it holds only the weights")
+            model_config = f.attrs['model_config']
+
+        if isinstance(model_config, bytes):
+            model_config = model_config.decode('utf-8')
+        model_config = json.loads(model_config)
+
+    config = model_config.get('config', model_config)
+
+    # Keras < 2.2.3 stored the layers of a Sequential model directly as the config
+    if isinstance(config, list):
+        config = {'layers': config}
+
+    return config
+
+def iter_layers(path:str):
+    """Yields the add_layer() arguments of every supported layer of a saved keras model
+
+    Parameters
+    ----------
+    path : str
+        Path of a .keras or .h5 file
+
+    Yields
+    ------
+    params : dict
+        add_layer() arguments of a layer
+    """
+
+    return iter_config_layers(read_config(path))
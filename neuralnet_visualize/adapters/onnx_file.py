@@ -0,0 +1,262 @@
+#!/usr/bin/python3
+
+"""
+ONNX File Adapter
+=================
+
+Reads the architecture of an .onnx file without the onnx package and without loading the weights.
+
+The file is memory-mapped and walked with a minimal protobuf wire format reader. Only the nodes
+of the graph and the names and dims of the initializers are decoded, the weight blobs are skipped
+by their length, so their pages are never read and the memory used depends on the number of ops,
+not on the size of the weights.
+"""
+
+import mmap
+
+# Field numbers of the onnx.proto messages which are read
+MODEL_GRAPH = 7
+GRAPH_NODE, GRAPH_INITIALIZER = 1, 5
+NODE_INPUT, NODE_OUTPUT, NODE_OP_TYPE, NODE_ATTRIBUTE = 1, 2, 4, 5
+ATTR_NAME, ATTR_I, ATTR_S, ATTR_T, ATTR_INTS = 1, 3, 4, 5, 8
+TENSOR_DIMS, TENSOR_NAME = 1, 8
+
+VARINT, FIXED64, LENGTH, FIXED32 = 0, 1, 2, 5
+
+def _varint(buf, pos):
+    # Decode a varint starting at pos, gives the value and the position after it
+
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos = pos + 1
+        result = result | ((byte & 0x7f) << shift)
+        if byte < 0x80:
+            return result, pos
+        shift = shift + 7
+
+def _int64(value):
+    # Interpret a decoded varint as a signed 64 bit integer
+
+    if value >= 1 << 63:
+        value = value - (1 << 64)
+
+    return value
+
+def _fields(buf, start, end):
+    # Yields (field number, wire type, value) of a message, the value of a length delimited field is its (start, end)
+
+    pos = start
+    while pos < end:
+        key, pos = _varint(buf, pos)
+        field, wire = key >> 3, key & 0x7
+
+        if wire == VARINT:
+            value, pos = _varint(buf, pos)
+        elif wire == LENGTH:
+            length, pos = _varint(buf, pos)
+            value = (pos, pos + length)
+            pos = pos + length
+        elif wire == FIXED64:
+            value = None
+            pos = pos + 8
+        elif wire == FIXED32:
+            value = None
+            pos = pos + 4
+        else:
+            raise ValueError("Unsupported protobuf wire type "+str(wire)+", the file is not a valid onnx model")
+
+        yield field, wire, value
+
+    return
+
+def _string(buf, span):
+    # Decode a length delimited string field
+
+    return bytes(buf[span[0]:span[1]]).decode('utf-8')
+
+def _ints(buf, wire, value, into):
+    # Append a repeated int64 field, packed or not, to the given list
+
+    if wire == VARINT:
+        into.append(_int64(value))
+        return
+
+    pos, end = value
+    while pos < end:
+        item, pos = _varint(buf, pos)
+        into.append(_int64(item))
+
+    return
+
+def _tensor(buf, span):
+    # Name and dims of a TensorProto, the data fields are skipped
+
+    name = None
+    dims = list()
+    for field, wire, value in _fields(buf, *span):
+        if field == TENSOR_DIMS:
+            _ints(buf, wire, value, dims)
+        elif field == TENSOR_NAME:
+            name = _string(buf, value)
+
+    return name, dims
+
+def _attribute(buf, span):
+    # Name and value of an AttributeProto, only the int, ints, string and tensor dims values are kept
+
+    name = None
+    result = None
+    ints = list()
+    for field, wire, value in _fields(buf, *span):
+        if field == ATTR_NAME:
+            name = _string(buf, value)
+        elif field == ATTR_I:
+            result = _int64(value)
+        elif field == ATTR_S:
+            result = _string(buf, value)
+        elif field == ATTR_T:
+            result = _tensor(buf, value)[1]
+        elif field == ATTR_INTS:
+            _ints(buf, wire, value, ints)
+
+    if result is None and ints:
+        result = ints
+
+    return name, result
+
+def _node(buf, span):
+    # (op_type, inputs, outputs, attributes) of a NodeProto
+
+    op_type = None
+    inputs = list()
+    outputs = list()
+    attributes = dict()
+    for field, wire, value in _fields(buf, *span):
+        if field == NODE_INPUT:
+            inputs.append(_string(buf, value))
+        elif field == NODE_OUTPUT:
+            outputs.append(_string(buf, value))
+        elif field == NODE_OP_TYPE:
+            op_type = _string(buf, value)
+        elif field == NODE_ATTRIBUTE:
+            name, result = _attribute(buf, value)
+            attributes[name] = result
+
+    return op_type, inputs, outputs, attributes
+
+def read_graph(path:str):
+    """Reads the nodes of the graph and the dims of its initializers
+
+    Parameters
+    ----------
+    path : str
+        Path of an .onnx file
+
+    Returns
+    -------
+    nodes : list
+        (op_type, inputs, outputs, attributes) of every node, in the order of the graph
+    dims : dict
+        Dims of every initializer and Constant output, by name
+
+    Raises
+    ------
+    ValueError
+        When the file is not an onnx model
+    """
+
+    nodes = list()
+    dims = dict()
+
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        graph = None
+        for field, wire, value in _fields(buf, 0, len(buf)):
+            if field == MODEL_GRAPH and wire == LENGTH:
+                graph = value
+
+        if graph is None:
+            raise ValueError(path+" is not an onnx model, it has no graph")
+
+        for field, wire, value in _fields(buf, *graph):
+            if field == GRAPH_NODE:
+                nodes.append(_node(buf, value))
+            elif field == GRAPH_INITIALIZER:
+                name, shape = _tensor(buf, value)
+                dims[name] = shape
+    finally:
+        buf.close()
+
+    for op_type, _, outputs, attributes in nodes:
+        if op_type == 'Constant' and isinstance(attributes.get('value'), list):
+            dims[outputs[0]] = attributes['value']
+
+    return nodes, dims
+
+def _padding(attributes):
+    # padding argument of add_layer from the auto_pad and pads attributes of a Conv
+
+    if attributes.get('auto_pad', 'NOTSET') in ['SAME_UPPER', 'SAME_LOWER']:
+        return 'same'
+
+    pads = attributes.get('pads', [])
+    if not any(pads):
+        return 'valid'
+
+    return tuple(pads[:len(pads) // 2])
+
+def iter_layers(path:str):
+    """Yields the add_layer() arguments of every supported node of an onnx model
+
+    Gemm and MatMul are drawn as dense layers, Conv as conv2d, MaxPool as maxpool2d,
+    AveragePool as avgpool2d and Flatten as flatten, all the other ops are skipped. A Gemm
+    or MatMul whose weight is not an initializer is skipped too, its width is unknown
+
+    Parameters
+    ----------
+    path : str
+        Path of an .onnx file
+
+    Yields
+    ------
+    params : dict
+        add_layer() arguments of a layer
+    """
+
+    nodes, dims = read_graph(path)
+
+    for op_type, inputs, _, attributes in nodes:
+        if op_type in ['Gemm', 'MatMul']:
+            weight = dims.get(inputs[1]) if len(inputs) > 1 else None
+            if not weight:
+                # The weight is computed in the graph, such as the product of two activations, its
+                # width is unknown and the node is not a layer of the model
+                continue
+            if op_type == 'Gemm' and attributes.get('transB', 0):
+                yield dict(layer_type='dense', nodes=weight[0])
+            else:
+                yield dict(layer_type='dense', nodes=weight[-1])
+        elif op_type == 'Conv':
+            weight = dims.get(inputs[1], [])
+            kernel_size = attributes.get('kernel_shape', weight[2:])
+            if len(kernel_size) != 2:
+                continue
+
+            params = dict(layer_type='conv2d', kernel_size=tuple(kernel_size), stride=tuple(attributes.get('strides', [1, 1])), padding=_padding(attributes))
+            if weight:
+                params['filters'] = weight[0]
+            yield params
+        elif op_type in ['MaxPool', 'AveragePool']:
+            pool_size = attributes.get('kernel_shape', [])
+            if len(pool_size) != 2:
+                continue
+
+            yield dict(layer_type='maxpool2d' if op_type == 'MaxPool' else 'avgpool2d', pool_size=tuple(pool_size))
+        elif op_type == 'Flatten':
+            yield dict(layer_type='flatten')
+
+    return
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+
+"""
+PyTorch Adapter
+===============
+
+Converts a torch.nn.Module into the layers of the visualizer. The modules are inspected
+through their attributes, so torch itself is never imported by the module walk.
+
+Every module class is resolved once to an extractor, a function giving the add_layer()
+arguments of a module, and the result is memoized by class. Modules without an extractor,
+such as Sequential, ModuleList or user defined blocks, are containers and the walk descends
+into their children, the children of a module with an extractor are not walked.
+
+iter_graph_layers traces the forward pass with torch.fx instead, so the residual and
+multi-branch models are drawn with their real connections. The modules with an extractor are
+kept as leaves of the trace, and the ones which are not drawn, such as ReLU or BatchNorm2d, or
+an addition, pass their inputs through to the layers they feed.
+"""
+
+def _conv2d(layer):
+    return dict(layer_type='conv2d', kernel_size=layer.kernel_size, filters=layer.out_channels, stride=layer.stride, padding=layer.padding)
+
+def _maxpool2d(layer):
+    return dict(layer_type='maxpool2d', pool_size=layer.kernel_size)
+
+def _avgpool2d(layer):
+    return dict(layer_type='avgpool2d', pool_size=layer.kernel_size)
+
+def _flatten(layer):
+    return dict(layer_type='flatten')
+
+def _linear(layer):
+    # the weight is (out_features, in_features), the visualizer takes (inputs, units), both are views without a copy
+    return dict(layer_type='dense', nodes=layer.out_features, weights=layer.weight.detach().T)
+
+# Extractors of the supported torch.nn modules, by the lower case class name
+EXTRACTORS = {
+    'conv2d': _conv2d,
+    'maxpool2d': _maxpool2d,
+    'avgpool2d': _avgpool2d,
+    'flatten': _flatten,
+    'linear': _linear,
+}
+
+# Memoized extractor of every class seen so far, None for the classes which are not drawn
+_DISPATCH = dict()
+
+def register_module(cls, extractor)->None:
+    """Registers the extractor of a custom module class
+
+    Parameters
+    ----------
+    cls : type
+        The torch.nn.Module subclass
+    extractor : callable
+        Takes a module of that class and gives a dict of add_layer() arguments, or None to skip it.
+        Pass None to draw the children of the module instead
+
+    Examples
+    --------
+    >>> from neuralnet_visualize.adapters.pytorch import register_module
+    >>>
+    >>> register_module(MyAttention, lambda layer: dict(layer_type='dense', nodes=layer.embed_dim))
+    """
+
+    _DISPATCH[cls] = extractor
+
+    return
+
+def _resolve(cls):
+    # Find the extractor of a class seen for the first time, by its name
+
+    extractor = EXTRACTORS.get(cls.__name__.lower())
+    _DISPATCH[cls] = extractor
+
+    return extractor
+
+def iter_layers(model):
+    """Yields the add_layer() arguments of every supported module of the model
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        A pytorch model
+
+    Yields
+    ------
+    params : dict
+        add_layer() arguments of a layer
+    """
+
+    dispatch = _DISPATCH
+    seen = set()
+    stack = [model]
+
+    # Depth first, in the same order as model.modules()
+    while stack:
+        layer = stack.pop()
+        if id(layer) in seen:
+            continue
+        seen.add(id(layer))
+
+        cls = type(layer)
+        extractor = dispatch[cls] if cls in dispatch else _resolve(cls)
+
+        if extractor is None:
+            stack.extend(reversed(list(layer.children())))
+            continue
+
+        params = extractor(layer)
+        if params is not None:
+            yield params
+
+    return
+
+def _trace(model):
+    # The torch.fx graph of the model, the modules with an extractor are not traced through
+
+    import torch.fx
+
+    dispatch = _DISPATCH
+
+    class Tracer(torch.fx.Tracer):
+        def is_leaf_module(self, module, qualname):
+            cls = type(module)
+            extractor = dispatch[cls] if cls in dispatch else _resolve(cls)
+
+            return extractor is not None or super().is_leaf_module(module, qualname)
+
+    return Tracer().trace(model)
+
+def iter_graph_layers(model):
+    """Yields the add_layer() arguments of every supported layer of the model, with its inputs
+
+    The model is traced with torch.fx, and the layers are yielded in the order of the trace,
+    which is a topological order. A model which cannot be traced, such as one with data dependent
+    control flow, falls back to iter_layers(), drawn as a chain.
+
+    Parameters
+    ----------
+    model : torch.nn.Module
+        A pytorch model
+
+    Yields
+    ------
+    params : dict
+        add_layer() arguments of a layer, its 'inputs' are the positions of the layers feeding
+        it among the yielded ones
+    """
+
+    try:
+        graph = _trace(model)
+    except Exception:
+        # any tracing failure, the modules are still drawn in their order
+        yield from iter_layers(model)
+        return
+
+    dispatch = _DISPATCH
+    modules = dict(model.named_modules())
+    # positions of the drawn layers an fx node depends on, through the nodes which are not drawn
+    drawn = dict()
+    count = 0
+
+    for node in graph.nodes:
+        params = None
+        if node.op == 'call_module':
+            layer = modules[node.target]
+            cls = type(layer)
+            extractor = dispatch[cls] if cls in dispatch else _resolve(cls)
+            if extractor is not None:
+                params = extractor(layer)
+        elif node.op in ('call_function', 'call_method'):
+            name = node.target if isinstance(node.target, str) else getattr(node.target, '__name__', '')
+            if name == 'flatten':
+                params = _flatten(None)
+
+        inputs = sorted(set(k for arg in node.all_input_nodes for k in drawn.get(arg, ())))
+        if params is None:
+            drawn[node] = inputs
+            continue
+
+        params['inputs'] = inputs
+        yield params
+        drawn[node] = [count]
+        count = count + 1
+
+    return
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+
+"""
+TensorFlow Adapter
+==================
+
+Converts a keras model, or its config, into the layers of the visualizer. Only the model
+config is read, so tensorflow itself is never imported here.
+
+The layers of a functional model config list the layers they are called on in their
+'inbound_nodes', they are read into a LayerGraph and the layers are yielded in its topological
+order, with their inputs. The layers which are not drawn, such as InputLayer, Add or
+Concatenate, pass their inputs through to the layers they feed.
+"""
+
+from ..graph import LayerGraph
+
+def iter_layers(model):
+    """Yields the add_layer() arguments of every supported layer of the keras model
+
+    Parameters
+    ----------
+    model : tensorflow.keras.Model
+        A tensorflow model
+
+    Yields
+    ------
+    params : dict
+        add_layer() arguments of a layer
+    """
+
+    # the kernels are (inputs, units) variables, converted only if the 'topk' edges read them
+    kernels = {layer.name: layer.kernel for layer in model.layers if getattr(layer, 'kernel', None) is not None}
+
+    return iter_config_layers(model.get_config(), kernels)
+
+def iter_config_layers(config, kernels=None):
+    """Yields the add_layer() arguments of every supported layer of a keras model config
+
+    Parameters
+    ----------
+    config : dict
+        Model config, as returned by model.get_config()
+    kernels : dict, optional
+        Weight matrix of the layers, by layer name, passed to the Dense layers. Default is None
+
+    Yields
+    ------
+    params : dict
+        add_layer() arguments of a layer, for a functional model its 'inputs' are the positions of
+        the layers feeding it among the yielded ones
+    """
+
+    layers = config['layers']
+    if not any(layer.get('inbound_nodes') for layer in layers):
+        # a Sequential config, every layer is fed by the previous one
+        for layer in layers:
+            params = _layer_params(layer, kernels)
+            if params is not None:
+                yield params
+        return
+
+    index = {_layer_name(layer): i for i, layer in enumerate(layers)}
+    sources, targets = list(), list()
+    for i, layer in enumerate(layers):
+        for name in dict.fromkeys(_inbound_names(layer.get('inbound_nodes', []))):
+            if name in index:
+                sources.append(index[name])
+                targets.append(i)
+
+    graph = LayerGraph(len(layers), sources, targets)
+    # positions of the drawn layers a layer depends on, through the layers which are not drawn
+    drawn = dict()
+    count = 0
+
+    for i in graph.topological_order():
+        inputs = sorted(set(k for j in graph.predecessors(i) for k in drawn[j]))
+        params = _layer_params(layers[i], kernels)
+        if params is None:
+            drawn[i] = inputs
+            continue
+
+        params['inputs'] = inputs
+        yield params
+        drawn[i] = [count]
+        count = count + 1
+
+    return
+
+def _layer_name(layer):
+    # Name of a layer of a model config
+
+    return layer.get('name', layer['config'].get('name'))
+
+def _inbound_names(value)->list:
+    # Names of the layers in the inbound nodes of a layer config, in the keras 2 format
+    # [[[name, node_index, tensor_index, kwargs], ...]] or the keras 3 format, where the arguments
+    # of every call hold tensors with their {'keras_history': [name, node_index, tensor_index]}
+
+    if isinstance(value, dict):
+        history = value.get('config', {}).get('keras_history') if value.get('class_name') == '__keras_tensor__' else None
+        if history:
+            return [history[0]]
+        return [name for item in value.values() for name in _inbound_names(item)]
+
+    if isinstance(value, (list, tuple)):
+        if len(value) >= 3 and isinstance(value[0], str) and isinstance(value[1], int):
+            return [value[0]]
+        return [name for item in value for name in _inbound_names(item)]
+
+    return []
+
+def _layer_params(layer, kernels):
+    # add_layer() arguments of a layer config, None for the layers which are not drawn
+
+    layer_params = layer['config']
+    if layer['class_name'] == 'Dense':
+        params = dict(layer_type='dense', nodes=layer_params['units'])
+        if kernels and layer_params.get('name') in kernels:
+            params['weights'] = kernels[layer_params['name']]
+        return params
+    elif layer['class_name'] == 'Conv2D':
+        return dict(layer_type='conv2d', filters=layer_params['filters'], kernel_size=layer_params['kernel_size'], stride=layer_params['strides'], padding=layer_params['padding'])
+    elif layer['class_name'] == 'MaxPooling2D':
+        return dict(layer_type='maxpool2d', pool_size=layer_params['pool_size'])
+    elif layer['class_name'] == 'AveragePooling2D':
+        return dict(layer_type='avgpool2d', pool_size=layer_params['pool_size'])
+    elif layer['class_name'] == 'Flatten':
+        return dict(layer_type='flatten')
+
+    return None
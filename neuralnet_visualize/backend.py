@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+
+"""
+Graphviz Backend
+================
+
+Runs the Graphviz layout engines on a DOT source, piping it over stdin and reading the image
+from stdout, so that nothing is written to the disk.
+"""
+
+import asyncio
+import threading
+import subprocess
+
+CHUNK_SIZE = 64 * 1024
+
+def dot_command(file_type:str, engine='dot')->list:
+    """Gives the command line which renders a DOT source read from stdin
+
+    Parameters
+    ----------
+    file_type : str
+        Format of the image
+    engine : str, optional
+        Graphviz layout engine. Default is 'dot'
+
+    Returns
+    -------
+    cmd : list
+        The command and its arguments
+    """
+
+    return [engine, '-T'+file_type.lower()]
+
+def write_chunks(data:bytes, out, chunk_size=CHUNK_SIZE)->int:
+    """Writes bytes to a file-like object in chunks
+
+    Parameters
+    ----------
+    data : bytes
+        The data
+    out : file-like
+        Any object with a write(bytes) method, such as a socket file or an HTTP response stream
+    chunk_size : int, optional
+        Size of every write. Default is 64 KiB
+
+    Returns
+    -------
+    size : int
+        Number of bytes written
+    """
+
+    view = memoryview(data)
+    for pos in range(0, len(view), chunk_size):
+        out.write(view[pos:pos+chunk_size])
+
+    return len(view)
+
+def pipe(source:str, file_type:str, engine='dot', out=None, chunk_size=CHUNK_SIZE):
+    """Renders a DOT source in a subprocess, over its stdin and stdout
+
+    The source is fed by a thread while the image is read, so neither side blocks on a full pipe,
+    and nothing is written to the disk.
+
+    Parameters
+    ----------
+    source : str
+        DOT source of the graph
+    file_type : str
+        Format of the image
+    engine : str, optional
+        Graphviz layout engine. Default is 'dot'
+    out : file-like, optional
+        When given, the image is written to it chunk by chunk as the process produces it,
+        instead of being returned. Default is None
+    chunk_size : int, optional
+        Size of the chunks read from the process. Default is 64 KiB
+
+    Returns
+    -------
+    data : bytes or int
+        The image, or the number of bytes written when `out` is given
+
+    Raises
+    ------
+    graphviz.ExecutableNotFound
+        When the Graphviz executables are not on the PATH
+    graphviz.CalledProcessError
+        When the layout process fails, the chunks already written to `out` are not taken back
+    """
+
+    cmd = dot_command(file_type, engine)
+
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        import graphviz as gv
+
+        raise gv.ExecutableNotFound(cmd)
+
+    errors = list()
+
+    def feed():
+        try:
+            proc.stdin.write(source.encode('utf-8'))
+        except BrokenPipeError:
+            # the process exited early, its status tells why
+            pass
+        finally:
+            proc.stdin.close()
+
+    def drain():
+        errors.append(proc.stderr.read())
+
+    threads = [threading.Thread(target=feed, daemon=True), threading.Thread(target=drain, daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    chunks = list()
+    size = 0
+    with proc.stdout:
+        for chunk in iter(lambda: proc.stdout.read(chunk_size), b''):
+            if out is None:
+                chunks.append(chunk)
+            else:
+                out.write(chunk)
+            size = size + len(chunk)
+
+    for thread in threads:
+        thread.join()
+    proc.wait()
+    proc.stderr.close()
+
+    if proc.returncode != 0:
+        import graphviz as gv
+
+        raise gv.CalledProcessError(proc.returncode, cmd, output=b''.join(chunks), stderr=errors[0])
+
+    if out is None:
+        return b''.join(chunks)
+
+    return size
+
+def render_files(source:str, outputs, engine='dot')->None:
+    """Renders a DOT source into many files with a single layout process
+
+    Graphviz lays the graph out once and writes it with every -T/-o pair of the command line,
+    so the cost of more formats is only their rendering, not another layout
+
+    Parameters
+    ----------
+    source : str
+        DOT source of the graph
+    outputs : list
+        (file_type, path) of every output file
+    engine : str, optional
+        Graphviz layout engine. Default is 'dot'
+
+    Raises
+    ------
+    graphviz.ExecutableNotFound
+        When the Graphviz executables are not on the PATH
+    graphviz.CalledProcessError
+        When the layout process fails
+    """
+
+    cmd = [engine]
+    for file_type, path in outputs:
+        cmd.extend(['-T'+file_type.lower(), '-o'+path])
+
+    try:
+        proc = subprocess.run(cmd, input=source.encode('utf-8'), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        import graphviz as gv
+
+        raise gv.ExecutableNotFound(cmd)
+
+    if proc.returncode != 0:
+        import graphviz as gv
+
+        raise gv.CalledProcessError(proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr)
+
+    return
+
+async def pipe_async(source:str, file_type:str, engine='dot', semaphore=None)->bytes:
+    """Renders a DOT source in an asyncio subprocess
+
+    Parameters
+    ----------
+    source : str
+        DOT source of the graph
+    file_type : str
+        Format of the image
+    engine : str, optional
+        Graphviz layout engine. Default is 'dot'
+    semaphore : asyncio.Semaphore, optional
+        Limits the number of concurrently running layout processes. Default is None, no limit
+
+    Returns
+    -------
+    data : bytes
+        The image
+
+    Raises
+    ------
+    graphviz.ExecutableNotFound
+        When the Graphviz executables are not on the PATH
+    graphviz.CalledProcessError
+        When the layout process fails
+    """
+
+    if semaphore is None:
+        return await _pipe_async(source, file_type, engine)
+
+    async with semaphore:
+        return await _pipe_async(source, file_type, engine)
+
+async def _pipe_async(source, file_type, engine):
+    # Run a single layout process
+
+    cmd = dot_command(file_type, engine)
+
+    try:
+        proc = await asyncio.create_subprocess_exec(*cmd, stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    except FileNotFoundError:
+        import graphviz as gv
+
+        raise gv.ExecutableNotFound(cmd)
+
+    out, err = await proc.communicate(source.encode('utf-8'))
+    if proc.returncode != 0:
+        import graphviz as gv
+
+        raise gv.CalledProcessError(proc.returncode, cmd, output=out, stderr=err)
+
+    return out
@@ -0,0 +1,181 @@
+#!/usr/bin/python3
+
+"""
+Bulk Renderer
+=============
+
+Render the architecture images of many models on a process pool.
+
+A model is described by a spec, a dict with one of the following keys
+
+* 'layers' : list of add_layer() arguments, each one a dict of keyword arguments or a [layer_type, nodes] list
+* 'tensorflow' : a keras model config, as returned by model.get_config()
+* 'pytorch' : path of a PyTorch model saved with torch.save()
+* 'onnx' : path of an .onnx file
+* 'keras' : path of a .keras or .h5 file
+* 'snapshot' : path of a snapshot written by visualizer.save(), the options of the spec override the saved ones
+* 'file' : path of a JSON file containing a spec
+
+and optionally 'name', the file name of the image, and 'options', a dict of keyword arguments for the visualizer.
+"""
+
+import os
+import json
+import traceback
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .visualize import visualizer
+from .exceptions import *
+
+RenderResult = namedtuple('RenderResult', ['index', 'name', 'path', 'error'])
+RenderResult.__doc__ = """Result of rendering a single spec, `error` is None when the render succeeded, otherwise `path` is None"""
+
+def load_spec(spec)->dict:
+    """Gives the spec dict, reading it from the JSON file if needed
+
+    Parameters
+    ----------
+    spec : dict or str
+        A spec dict, or path of a JSON file containing one
+
+    Returns
+    -------
+    spec : dict
+        The spec
+    """
+
+    if isinstance(spec, str):
+        spec = {'file': spec}
+
+    if 'file' in spec:
+        with open(spec['file']) as f:
+            loaded = json.load(f)
+        loaded.setdefault('name', os.path.splitext(os.path.basename(spec['file']))[0])
+        loaded.update({k: v for k, v in spec.items() if k != 'file'})
+        spec = loaded
+
+    return spec
+
+def build_visualizer(spec, name=None)->visualizer:
+    """Builds a visualizer from a spec
+
+    Parameters
+    ----------
+    spec : dict or str
+        A spec dict, or path of a JSON file containing one
+    name : str, optional
+        Default file name of the image, when the spec has no 'name'. Default is 'neuralnet'
+
+    Returns
+    -------
+    network : visualizer
+        The visualizer with all the layers of the spec added
+
+    Raises
+    ------
+    CannotCreateModel
+        When the spec does not describe a model
+    """
+
+    spec = load_spec(spec)
+
+    options = dict(spec.get('options', {}))
+    options.setdefault('filename', spec.get('name', name or 'neuralnet'))
+
+    if 'snapshot' in spec:
+        return visualizer.load(spec['snapshot'], **options)
+
+    network = visualizer(**options)
+
+    if 'layers' in spec:
+        for layer in spec['layers']:
+            if isinstance(layer, dict):
+                network.add_layer(**layer)
+            else:
+                network.add_layer(*layer)
+    elif 'tensorflow' in spec:
+        network.from_adapter('keras_config', spec['tensorflow'])
+    elif 'pytorch' in spec:
+        import torch
+
+        network.from_pytorch(torch.load(spec['pytorch'], weights_only=False))
+    elif 'onnx' in spec:
+        network.from_onnx(spec['onnx'])
+    elif 'keras' in spec:
+        network.from_keras_file(spec['keras'])
+    else:
+        raise CannotCreateModel("The spec should have one of 'layers', 'tensorflow', 'pytorch', 'onnx', 'keras', 'snapshot' or 'file'")
+
+    return network
+
+def render_spec(spec, directory='./graphs', index=0)->RenderResult:
+    """Renders a single spec, never raises
+
+    Parameters
+    ----------
+    spec : dict or str
+        A spec dict, or path of a JSON file containing one
+    directory : str, optional
+        Directory in which the image is written. Default is './graphs'
+    index : int, optional
+        Position of the spec in the batch. Default is 0
+
+    Returns
+    -------
+    result : RenderResult
+        Path of the image, or the error of the failed render
+    """
+
+    name = 'neuralnet_'+str(index)
+    try:
+        network = build_visualizer(spec, name)
+        name = network.filename
+
+        return RenderResult(index, name, network.render(directory), None)
+    except Exception:
+        return RenderResult(index, name, None, traceback.format_exc())
+
+def render_many(specs, workers=None, directory='./graphs'):
+    """Renders many specs on a process pool
+
+    The results are yielded as soon as each render finishes, so they are not in the order of the specs.
+    A failing spec gives a result with the error, it does not stop the rest of the batch.
+
+    Parameters
+    ----------
+    specs : iterable
+        Spec dicts, or paths of JSON files containing one
+    workers : int, optional
+        Number of worker processes. Default is the number of CPUs
+    directory : str, optional
+        Directory in which the images are written. Default is './graphs'
+
+    Yields
+    ------
+    result : RenderResult
+        Result of each spec
+
+    Examples
+    --------
+    >>> from neuralnet_visualize.batch import render_many
+    >>>
+    >>> specs = [{'name': 'mlp_'+str(n), 'layers': [['dense', 8], ['dense', n], ['dense', 2]]} for n in range(4, 64)]
+    >>> for result in render_many(specs, workers=8):
+    ...     print(result.name, result.path or result.error)
+    """
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = dict()
+        for i, spec in enumerate(specs):
+            futures[executor.submit(render_spec, spec, directory, i)] = i
+
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception:
+                # The worker process itself died, only this spec is reported as failed
+                yield RenderResult(futures[future], 'neuralnet_'+str(futures[future]), None, traceback.format_exc())
+
+    return
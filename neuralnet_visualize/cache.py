@@ -0,0 +1,270 @@
+#!/usr/bin/python3
+
+"""
+Render Cache
+============
+
+A content addressed on-disk cache of the rendered images, keyed by a hash of the DOT source
+"""
+
+import os
+import re
+import hashlib
+import tempfile
+import threading
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'neuralnet_visualize')
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# Name of a cached image, as given by _path(), the other files of the directory are never counted nor removed
+ENTRY_NAME = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+
+class RenderCache():
+    """
+    Content addressed cache of the rendered images
+
+    The key of an image is the sha256 hash of the DOT source, the file type and the
+    Graphviz layout engine. When the size of the cache goes above `max_size`, the least
+    recently used images are evicted. Only the files named after a key are images of the cache,
+    so the directory can be shared with other files, which are left alone.
+
+    A cache can be shared between threads, the counters and the size are updated under a lock,
+    and an image removed by another thread or process while it is read is a miss.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Directory where the images are stored. Default is the NNVIZ_CACHE_DIR environment
+        variable if set, otherwise ~/.cache/neuralnet_visualize
+    max_size : int, optional
+        Maximum size of the cache in bytes. Default is 256 MiB
+
+    Attributes
+    ----------
+    hits_ : int
+        Number of lookups which found a stored image
+    misses_ : int
+        Number of lookups which did not find a stored image
+    evictions_ : int
+        Number of images removed to keep the cache under `max_size`
+    size_ : int
+        Current size of the cache in bytes
+
+    Examples
+    --------
+    >>> from neuralnet_visualize import visualize as nnviz
+    >>> from neuralnet_visualize.cache import RenderCache
+    >>>
+    >>> cache = RenderCache(max_size=64 * 1024 * 1024)
+    >>> network = nnviz.visualizer(cache=cache)
+    >>> network.add_layer('dense', 7)
+    >>> network.add_layer('dense', 4)
+    >>> network.visualize()
+    >>> cache.hits_, cache.misses_
+    (0, 1)
+    """
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+        if directory is None:
+            directory = os.environ.get('NNVIZ_CACHE_DIR', DEFAULT_DIRECTORY)
+
+        if max_size <= 0:
+            raise ValueError("max_size should be a positive integer, but got "+str(max_size))
+
+        self.directory = directory
+        self.max_size = max_size
+        self.hits_ = 0
+        self.misses_ = 0
+        self.evictions_ = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.size_ = sum(size for _, _, size in self._entries())
+
+    def key(self, source:str, file_type:str, engine='dot')->str:
+        """Gives the cache key of a rendered image
+
+        Parameters
+        ----------
+        source : str
+            DOT source of the graph
+        file_type : str
+            Format of the image
+        engine : str, optional
+            Graphviz layout engine. Default is 'dot'
+
+        Returns
+        -------
+        key : str
+            Hex digest identifying the image
+        """
+
+        digest = hashlib.sha256()
+        digest.update(engine.encode('utf-8')+b'\0'+file_type.lower().encode('utf-8')+b'\0')
+        digest.update(source.encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def _path(self, key, file_type):
+        # Path of the cached image
+
+        return os.path.join(self.directory, key+'.'+file_type.lower())
+
+    def _entries(self):
+        # (mtime, path, size) of every image in the cache
+
+        entries = list()
+        for entry in os.scandir(self.directory):
+            if ENTRY_NAME.match(entry.name) and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # evicted meanwhile
+                    continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+
+        return entries
+
+    def get(self, key:str, file_type:str):
+        """Gives the stored image, if present
+
+        Parameters
+        ----------
+        key : str
+            Key given by `key()`
+        file_type : str
+            Format of the image
+
+        Returns
+        -------
+        data : bytes or None
+            The image, None when it is not in the cache
+        """
+
+        path = self._path(key, file_type)
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses_ = self.misses_ + 1
+            return None
+
+        # Touching the file marks it as the most recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # evicted once read, the image is still whole
+            pass
+
+        with self._lock:
+            self.hits_ = self.hits_ + 1
+
+        return data
+
+    def put(self, key:str, file_type:str, data:bytes)->None:
+        """Stores an image, evicting the least recently used ones if needed
+
+        Parameters
+        ----------
+        key : str
+            Key given by `key()`
+        file_type : str
+            Format of the image
+        data : bytes
+            The rendered image
+        """
+
+        path = self._path(key, file_type)
+
+        # Write to a temporary file first, so that concurrent readers never see a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        with self._lock:
+            try:
+                self.size_ = self.size_ - os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+
+            self.size_ = self.size_ + len(data)
+            if self.size_ > self.max_size:
+                self._evict()
+
+        return
+
+    def fetch(self, source:str, file_type:str, render, engine='dot')->bytes:
+        """Gives the stored image, rendering and storing it on a miss
+
+        Parameters
+        ----------
+        source : str
+            DOT source of the graph
+        file_type : str
+            Format of the image
+        render : callable
+            Called without arguments on a miss, should return the image as bytes
+        engine : str, optional
+            Graphviz layout engine. Default is 'dot'
+
+        Returns
+        -------
+        data : bytes
+            The image
+        """
+
+        key = self.key(source, file_type, engine)
+
+        data = self.get(key, file_type)
+        if data is None:
+            data = render()
+            self.put(key, file_type, data)
+
+        return data
+
+    def _evict(self):
+        # Remove the least recently used images until the cache fits in max_size, called holding the lock
+
+        entries = sorted(self._entries())
+        self.size_ = sum(size for _, _, size in entries)
+
+        for _, path, size in entries:
+            if self.size_ <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size_ = self.size_ - size
+            self.evictions_ = self.evictions_ + 1
+
+        return
+
+    def clear(self)->None:
+        """Removes every image from the cache"""
+
+        with self._lock:
+            for _, path, _ in self._entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self.size_ = 0
+
+        return
+
+    def stats(self)->dict:
+        """Gives the counters of the cache
+
+        Returns
+        -------
+        stats : dict
+            hits, misses, evictions, size and max_size of the cache
+        """
+
+        with self._lock:
+            return dict(hits=self.hits_, misses=self.misses_, evictions=self.evictions_, size=self.size_, max_size=self.max_size)
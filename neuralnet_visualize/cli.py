@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+
+"""
+Command Line Interface
+======================
+
+$ nnviz render-many specs.json --workers 8 --output ./graphs
+$ nnviz serve --preload torch
+$ nnviz render model.onnx --format svg
+$ nnviz stop
+"""
+
+import os
+import sys
+import json
+import argparse
+import itertools
+import traceback
+
+def _read_specs(paths, failures):
+    # Read the specs from JSON files, each one holds a spec, a list of specs or one spec per line.
+    # A file which cannot be read adds a failed RenderResult, without an index, to failures.
+
+    from .batch import RenderResult
+
+    for path in paths:
+        try:
+            with open(path) as f:
+                text = f.read()
+
+            try:
+                loaded = json.loads(text)
+            except ValueError:
+                loaded = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except Exception:
+            failures.append(RenderResult(None, path, None, traceback.format_exc()))
+            continue
+
+        if isinstance(loaded, dict):
+            # a single spec is named after its file
+            yield {'file': path}
+        elif isinstance(loaded, list):
+            for spec in loaded:
+                yield spec
+        else:
+            failures.append(RenderResult(None, path, None, "ValueError: "+path+" holds neither a spec nor a list of specs"))
+
+    return
+
+def render_many_command(args):
+    # Render all the specs and print one line per model as they finish
+
+    from .batch import render_many
+
+    failed = 0
+    unread = list()
+    # the unread files are all known once render_many has consumed the specs
+    results = itertools.chain(render_many(_read_specs(args.specs, unread), workers=args.workers, directory=args.output), unread)
+    for result in results:
+        if result.error is None:
+            print("ok\t"+result.name+"\t"+result.path)
+        else:
+            failed = failed + 1
+            print("failed\t"+result.name+"\t"+result.error.strip().splitlines()[-1], file=sys.stderr)
+        sys.stdout.flush()
+
+    return 1 if failed else 0
+
+# Spec key of the model files, by extension
+MODEL_KEYS = {'.json': 'file', '.onnx': 'onnx', '.keras': 'keras', '.h5': 'keras', '.pt': 'pytorch', '.pth': 'pytorch', '.nnviz': 'snapshot'}
+
+def serve_command(args):
+    # Run the render daemon in the foreground
+
+    from .daemon import serve
+    from .cache import RenderCache
+
+    serve(args.socket, RenderCache(args.cache_dir) if args.cache_dir else None, args.preload)
+
+    return 0
+
+def render_command(args):
+    # Send a model to the render daemon and write the image
+
+    from .daemon import render
+
+    name, ext = os.path.splitext(os.path.basename(args.model))
+    if ext.lower() not in MODEL_KEYS:
+        print("Unknown model file "+args.model+", expected one of "+", ".join(MODEL_KEYS), file=sys.stderr)
+        return 2
+
+    # the daemon runs in another directory
+    spec = {MODEL_KEYS[ext.lower()]: os.path.abspath(args.model)}
+    if ext.lower() != '.json':
+        spec['name'] = name
+
+    try:
+        data = render(spec, args.format, args.socket)
+    except (ConnectionError, RuntimeError) as error:
+        print(str(error).strip().splitlines()[-1], file=sys.stderr)
+        return 1
+
+    output = args.output or name+'.'+args.format
+    if output == '-':
+        sys.stdout.buffer.write(data)
+        sys.stdout.flush()
+    else:
+        with open(output, 'wb') as f:
+            f.write(data)
+        print(output)
+
+    return 0
+
+def stop_command(args):
+    # Ask the render daemon to exit
+
+    from .daemon import request
+
+    try:
+        request({'op': 'shutdown'}, args.socket)
+    except ConnectionError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    return 0
+
+def main(argv=None):
+    """Entry point of the `nnviz` command"""
+
+    parser = argparse.ArgumentParser(prog='nnviz', description='Generate neural network architecture images')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    many = commands.add_parser('render-many', help='Render many models on a process pool')
+    many.add_argument('specs', nargs='+', help='JSON files with a spec, a list of specs or one spec per line')
+    many.add_argument('-j', '--workers', type=int, default=None, help='Number of worker processes, default is the number of CPUs')
+    many.add_argument('-o', '--output', default='./graphs', help='Directory in which the images are written')
+    many.set_defaults(func=render_many_command)
+
+    serve = commands.add_parser('serve', help='Run the render daemon, which keeps the frameworks imported and the cache warm')
+    serve.add_argument('--socket', default=None, help='Path of the Unix socket, default is $NNVIZ_SOCKET or nnviz.sock in $XDG_RUNTIME_DIR')
+    serve.add_argument('--preload', nargs='*', default=[], help='Modules to import before serving, such as torch or tensorflow')
+    serve.add_argument('--cache-dir', default=None, help='Directory of the render cache, default is $NNVIZ_CACHE_DIR or ~/.cache/neuralnet_visualize')
+    serve.set_defaults(func=serve_command)
+
+    draw = commands.add_parser('render', help='Render a model file with the render daemon')
+    draw.add_argument('model', help='A .json spec, .onnx, .keras, .h5, .pt, .pth or .nnviz snapshot file')
+    draw.add_argument('-f', '--format', default='png', help='Format of the image, default is png')
+    draw.add_argument('-o', '--output', default=None, help='Path of the image, - for stdout, default is the model name with the format extension')
+    draw.add_argument('--socket', default=None, help='Path of the Unix socket of the daemon')
+    draw.set_defaults(func=render_command)
+
+    stop = commands.add_parser('stop', help='Stop the render daemon')
+    stop.add_argument('--socket', default=None, help='Path of the Unix socket of the daemon')
+    stop.set_defaults(func=stop_command)
+
+    args = parser.parse_args(argv)
+
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+
+"""
+Layer Cost Model
+================
+
+Propagates an input shape through the layers of the visualizer and computes, for every layer,
+its output shape, number of parameters, multiply-accumulates and activation memory.
+
+The shapes are channels first, (channels, height, width) for the convolution and pooling
+layers and (features,) for the dense layers. A dense layer applied on a multi dimensional
+input flattens it first, and has in_features x units weights and units biases.
+
+Without an input shape, a dense first layer is the input itself, as drawn by the input nodes of a
+network built with add_layer(), so it has no parameters. With an input shape, the first layer is
+applied on it like any other.
+
+In a graph, a layer receives the output of its first input, and a layer without inputs receives
+the input shape.
+"""
+
+import math
+
+from collections import namedtuple
+
+from .layers import DENSE, CONV2D, FLATTEN, LINEAR
+from .exceptions import CannotCreateModel, NotAValidOption
+
+LayerCost = namedtuple('LayerCost', ['output_shape', 'params', 'macs', 'activation_bytes'])
+LayerCost.__doc__ = """Cost of a layer, `macs` are the multiply-accumulates (or the compare/add ops of a pooling layer) for the whole batch"""
+
+DTYPE_BYTES = {'float64': 8, 'float32': 4, 'float16': 2, 'bfloat16': 2, 'int32': 4, 'int8': 1, 'uint8': 1}
+
+COST_FIELDS = ['params', 'macs', 'activation_bytes']
+
+def _pair(value):
+    # An int or a pair of ints as a (height, width) tuple
+
+    if isinstance(value, (list, tuple)):
+        return (int(value[0]), int(value[1]))
+
+    return (int(value), int(value))
+
+def _conv_output(size, kernel, stride, padding):
+    # Output size along one dimension
+
+    if padding == 'same':
+        return -(-size // stride)
+    if padding == 'valid':
+        padding = 0
+
+    return (size + 2 * padding - kernel) // stride + 1
+
+def _padding(padding):
+    # padding parameter as 'same', 'valid' or a (height, width) tuple of ints
+
+    if isinstance(padding, str):
+        return [padding.lower()] * 2
+
+    return list(_pair(padding))
+
+def propagate(table, input_shape, batch_size=1, dtype='float32', inputs=None)->list:
+    """Computes the cost of every layer
+
+    Parameters
+    ----------
+    table : LayerTable
+        The layers of the network
+    input_shape : tuple or None
+        Shape of a single input, (channels, height, width) or (features,). None when the dense layers
+        without inputs are the inputs of the network
+    batch_size : int, optional
+        Number of inputs processed at once. Default is 1
+    dtype : str, optional
+        Data type of the activations, one of DTYPE_BYTES. Default is 'float32'
+    inputs : list, optional
+        Index of the first layer feeding every layer, None for a layer without inputs. Default is None,
+        every layer is fed by the previous one
+
+    Returns
+    -------
+    costs : list
+        LayerCost of every layer
+
+    Raises
+    ------
+    CannotCreateModel
+        When a layer cannot be applied on the shape it receives, or a layer other than a dense one has no
+        inputs and there is no input shape
+    NotAValidOption
+        When the dtype is not known
+    """
+
+    if dtype not in DTYPE_BYTES:
+        raise NotAValidOption(dtype, list(DTYPE_BYTES))
+
+    item_bytes = DTYPE_BYTES[dtype]
+    if input_shape is not None:
+        input_shape = tuple(int(d) for d in input_shape)
+    shape = input_shape
+    costs = list()
+
+    for idx in range(len(table)):
+        code = table.type_codes[idx]
+        params = table.params[idx]
+        n_params = 0
+        macs = 0
+
+        if inputs is None:
+            first = idx == 0
+        else:
+            first = inputs[idx] is None
+            shape = input_shape if first else costs[inputs[idx]].output_shape
+
+        if first and input_shape is None:
+            if code not in (DENSE, LINEAR):
+                raise CannotCreateModel(table.names[idx]+" has no inputs, the input shape is needed to compute its cost")
+            shape = (table.units[idx],)
+        elif code in (DENSE, LINEAR):
+            in_features = math.prod(shape)
+            units = table.units[idx]
+
+            shape = (units,)
+            n_params = (in_features + 1) * units
+            macs = in_features * units
+        elif code == FLATTEN:
+            shape = (math.prod(shape),)
+        else:
+            if len(shape) != 3:
+                raise CannotCreateModel(table.names[idx]+" expects a (channels, height, width) input, but got "+str(shape))
+
+            channels, height, width = shape
+
+            if code == CONV2D:
+                kh, kw = _pair(params['kernel_size'])
+                sh, sw = _pair(params['stride'])
+                ph, pw = _padding(params['padding'])
+                filters = int(params['filters'])
+
+                shape = (filters, _conv_output(height, kh, sh, ph), _conv_output(width, kw, sw, pw))
+                n_params = (kh * kw * channels + 1) * filters
+                macs = kh * kw * channels * math.prod(shape)
+            else:
+                kh, kw = _pair(params['pool_size'])
+
+                # the stride of a pooling layer defaults to its size, in keras and pytorch
+                shape = (channels, _conv_output(height, kh, kh, 0), _conv_output(width, kw, kw, 0))
+                macs = kh * kw * math.prod(shape)
+
+            if min(shape) < 1:
+                raise CannotCreateModel(table.names[idx]+" gives an empty output "+str(shape)+", the input is too small")
+
+        costs.append(LayerCost(shape, n_params, macs * batch_size, math.prod(shape) * batch_size * item_bytes))
+
+    return costs
+
+def format_count(value)->str:
+    """Formats a count with a K/M/G/T suffix, such as 18.5K"""
+
+    for suffix in ['', 'K', 'M', 'G']:
+        if abs(value) < 1000:
+            return (str(value) if suffix == '' else "{:.1f}".format(value))+suffix
+        value = value / 1000
+
+    return "{:.1f}T".format(value)
+
+def format_bytes(value)->str:
+    """Formats a number of bytes with a binary suffix, such as 256.0 KiB"""
+
+    for suffix in ['B', 'KiB', 'MiB', 'GiB']:
+        if abs(value) < 1024:
+            return (str(value) if suffix == 'B' else "{:.1f}".format(value))+' '+suffix
+        value = value / 1024
+
+    return "{:.1f} TiB".format(value)
+
+def format_shape(shape)->str:
+    """Formats a shape as 64x32x32"""
+
+    return "x".join(map(str, shape))
+
+def heat_color(value, max_value)->str:
+    """Color of a value on a logarithmic yellow to red scale
+
+    Parameters
+    ----------
+    value : int
+        The value
+    max_value : int
+        Largest value of the scale
+
+    Returns
+    -------
+    color : str
+        Hex RGB color
+    """
+
+    ratio = math.log1p(value) / math.log1p(max_value) if max_value > 0 else 0.0
+
+    return '#ff{:02x}00'.format(int(round(255 * (1 - ratio))))
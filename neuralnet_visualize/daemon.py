@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+
+"""
+Render Daemon
+=============
+
+A long-lived local render server on a Unix socket. The adapters and the frameworks stay imported
+and the render cache stays warm between requests, so drawing a diagram from the CLI or a CI job
+does not pay the Python startup and the framework imports every time.
+
+The protocol is a JSON line per request, answered by a JSON line and, on success, the `size`
+bytes of the image
+
+* {"op": "render", "spec": <spec>, "format": "svg"} renders a spec, as described in batch.py
+* {"op": "ping"} gives the pid and the number of requests served
+* {"op": "stats"} gives the counters of the server and of the render cache
+* {"op": "shutdown"} stops the server
+
+$ nnviz serve --preload torch &
+$ nnviz render model.onnx -f svg -o model.svg
+
+The client side of this module only uses the standard library, so the client stays fast to start.
+"""
+
+import os
+import json
+import socket
+
+def default_socket()->str:
+    """Gives the path of the socket, the NNVIZ_SOCKET environment variable if set, otherwise
+    nnviz.sock in XDG_RUNTIME_DIR, or in the temporary directory with the user id in its name"""
+
+    if 'NNVIZ_SOCKET' in os.environ:
+        return os.environ['NNVIZ_SOCKET']
+
+    if 'XDG_RUNTIME_DIR' in os.environ:
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'nnviz.sock')
+
+    return os.path.join('/tmp', 'nnviz-'+str(os.getuid())+'.sock')
+
+def _read_message(rfile):
+    # Read a JSON line, None at the end of the stream
+
+    line = rfile.readline()
+    if not line:
+        return None
+
+    return json.loads(line)
+
+def _write_message(wfile, message, data=b''):
+    # Write a JSON line followed by the raw data
+
+    wfile.write(json.dumps(message).encode('utf-8')+b'\n')
+    if data:
+        wfile.write(data)
+    wfile.flush()
+
+    return
+
+def request(message:dict, socket_path=None, timeout=None):
+    """Sends a request to the daemon
+
+    Parameters
+    ----------
+    message : dict
+        The request, with its 'op'
+    socket_path : str, optional
+        Path of the socket. Default is default_socket()
+    timeout : float, optional
+        Timeout of the connection in seconds. Default is None, no timeout
+
+    Returns
+    -------
+    response : dict
+        The response
+    data : bytes
+        The image of a render, empty otherwise
+
+    Raises
+    ------
+    ConnectionError
+        When the daemon is not running
+    RuntimeError
+        When the daemon could not serve the request, with its error
+    """
+
+    path = socket_path or default_socket()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise ConnectionError("The render daemon is not running on "+path+", start it with `nnviz serve`")
+
+        with sock.makefile('rwb') as f:
+            _write_message(f, message)
+            response = _read_message(f)
+            if response is None:
+                raise ConnectionError("The render daemon closed the connection")
+
+            data = f.read(response['size']) if response.get('size') else b''
+
+    if not response['ok']:
+        raise RuntimeError(response['error'])
+
+    return response, data
+
+def render(spec, file_type='png', socket_path=None, timeout=None)->bytes:
+    """Renders a spec on the daemon
+
+    Parameters
+    ----------
+    spec : dict or str
+        A spec dict, or path of a JSON file containing one. The paths in it are read by the
+        daemon, so they should be absolute
+    file_type : str, optional
+        Format of the image. Default is 'png'
+    socket_path : str, optional
+        Path of the socket. Default is default_socket()
+    timeout : float, optional
+        Timeout of the connection in seconds. Default is None, no timeout
+
+    Returns
+    -------
+    data : bytes
+        The image
+
+    Examples
+    --------
+    >>> from neuralnet_visualize import daemon
+    >>>
+    >>> svg = daemon.render({'layers': [['dense', 4], ['dense', 8], ['dense', 2]]}, 'svg')
+    """
+
+    return request(dict(op='render', spec=spec, format=file_type), socket_path, timeout)[1]
+
+def serve(socket_path=None, cache=None, preload=()):
+    """Runs the daemon until a shutdown request or an interrupt
+
+    Parameters
+    ----------
+    socket_path : str, optional
+        Path of the socket. Default is default_socket()
+    cache : RenderCache, optional
+        Render cache shared by all the requests. Default is a RenderCache in its default directory
+    preload : iterable, optional
+        Modules imported before serving, such as 'torch' or 'tensorflow'. Default is ()
+
+    Raises
+    ------
+    OSError
+        When another daemon is already running on the socket
+    """
+
+    import importlib
+    import socketserver
+    import threading
+    import traceback
+
+    from .batch import load_spec, build_visualizer
+    from .cache import RenderCache
+
+    path = socket_path or default_socket()
+    cache = cache or RenderCache()
+
+    for name in preload:
+        importlib.import_module(name)
+    # graphviz is imported by every dot render
+    importlib.import_module('graphviz')
+
+    if os.path.exists(path):
+        try:
+            request(dict(op='ping'), path, timeout=1)
+        except ConnectionError:
+            # left over by a daemon which did not exit cleanly
+            os.unlink(path)
+        else:
+            raise OSError("A render daemon is already running on "+path)
+
+    counters = dict(requests=0, renders=0, errors=0)
+    lock = threading.Lock()
+
+    def handle(message):
+        # The response and the image of a request
+
+        op = message.get('op')
+        with lock:
+            counters['requests'] = counters['requests'] + 1
+
+        if op == 'ping':
+            return dict(ok=True, pid=os.getpid(), requests=counters['requests']), b''
+        if op == 'stats':
+            return dict(ok=True, pid=os.getpid(), cache=cache.stats(), **counters), b''
+        if op == 'shutdown':
+            threading.Thread(target=server.shutdown, daemon=True).start()
+            return dict(ok=True), b''
+        if op != 'render':
+            return dict(ok=False, error="Unknown op "+repr(op)), b''
+
+        try:
+            spec = dict(load_spec(message['spec']))
+            spec['options'] = dict(spec.get('options', {}), cache=cache)
+            network = build_visualizer(spec)
+            data = network.render_bytes(message.get('format'))
+        except Exception:
+            with lock:
+                counters['errors'] = counters['errors'] + 1
+            return dict(ok=False, error=traceback.format_exc()), b''
+
+        with lock:
+            counters['renders'] = counters['renders'] + 1
+
+        return dict(ok=True, size=len(data), format=message.get('format') or network.file_type), data
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            # A connection may send many requests, one after the other
+            while True:
+                try:
+                    message = _read_message(self.rfile)
+                except ValueError:
+                    _write_message(self.wfile, dict(ok=False, error="The request is not a JSON line"))
+                    return
+                if message is None:
+                    return
+
+                response, data = handle(message)
+                _write_message(self.wfile, response, data)
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    # only the user can connect
+    umask = os.umask(0o177)
+    try:
+        server = Server(path, Handler)
+    finally:
+        os.umask(umask)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+    return
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+
+"""
+Weighted Edge Selection
+=======================
+
+Selects the strongest connections between two dense layers from the weight matrix of the
+second one, so that only the connections which matter are drawn. numpy is imported on first use.
+"""
+
+EDGE_MODES = ['all', 'topk']
+
+def top_edges(weights, rows, cols, k:int):
+    """Gives the k connections of largest magnitude between the drawn inputs and units
+
+    The magnitudes are computed on the whole block at once and the k largest are found with
+    argpartition, in linear time, without sorting the weights
+
+    Parameters
+    ----------
+    weights : array-like
+        Weight matrix of shape (inputs, units), a numpy array, a torch tensor or a tf variable
+    rows : list
+        Indices of the inputs drawn, in increasing order
+    cols : list
+        Indices of the units drawn, in increasing order
+    k : int
+        Number of connections kept
+
+    Returns
+    -------
+    edges : list
+        (row, col, strength) of every kept connection, positions in rows and cols, in the order of
+        the inputs, strength is the magnitude divided by the largest one, in (0, 1]
+
+    Raises
+    ------
+    ImportError
+        When numpy is not installed
+    """
+
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("The 'topk' edges need numpy, install it with `pip install numpy`")
+
+    # only the block up to the last drawn input and unit is converted, not the whole matrix
+    block = np.asarray(weights[:rows[-1]+1, :cols[-1]+1], dtype=np.float64)
+    magnitude = np.abs(block[np.ix_(list(rows), list(cols))]).ravel()
+
+    if k < magnitude.size:
+        keep = np.argpartition(magnitude, magnitude.size - k)[magnitude.size - k:]
+        # a sort of the k indices, so that the DOT source does not depend on the partition order
+        keep.sort()
+    else:
+        keep = np.arange(magnitude.size)
+
+    top = magnitude[keep]
+    peak = top.max() if top.size else 0.0
+    strengths = top / peak if peak > 0 else np.ones_like(top)
+    tails, heads = np.divmod(keep, len(cols))
+
+    return list(zip(tails.tolist(), heads.tolist(), strengths.tolist()))
+
+def as_matrix(weights):
+    """Gives the weight matrix as a numpy array when it has no shape, such as nested lists
+
+    Parameters
+    ----------
+    weights : array-like
+        Weight matrix of shape (inputs, units)
+
+    Returns
+    -------
+    weights : array-like
+        The weights themselves when they have a shape, such as a numpy array, a torch tensor or
+        a tf variable, otherwise a numpy array
+
+    Raises
+    ------
+    ImportError
+        When numpy is not installed
+    """
+
+    if hasattr(weights, 'shape'):
+        return weights
+
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("The 'topk' edges need numpy, install it with `pip install numpy`")
+
+    return np.asarray(weights, dtype=np.float64)
+
+def edge_style(strength:float)->str:
+    """Gives the DOT attributes of an edge of the given strength, wider and darker when stronger"""
+
+    level = int(round(200 * (1 - strength)))
+
+    return 'color="#%02x%02x%02x" penwidth=%.2f' % (level, level, level, 0.5 + 2.5 * strength)
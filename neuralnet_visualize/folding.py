@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+
+"""
+Repeated Block Folding
+======================
+
+Finds the maximal runs of a repeated layer subsequence, such as the blocks of a ResNet or the
+encoder layers of a BERT, so that each run can be drawn once with its repeat count.
+"""
+
+from collections import namedtuple
+
+Run = namedtuple('Run', ['start', 'period', 'count'])
+Run.__doc__ = """`count` consecutive copies of the `period` layers starting at index `start`"""
+
+MAX_PERIOD = 32
+
+def layer_signatures(table)->list:
+    """Gives an integer per layer, equal for the layers which are drawn the same
+
+    Parameters
+    ----------
+    table : LayerTable
+        The layers of the network
+
+    Returns
+    -------
+    signatures : list
+        Signature of every layer
+    """
+
+    ids = dict()
+    signatures = list()
+
+    for code, units, params in zip(table.type_codes, table.units, table.params):
+        key = (code, units, tuple(sorted((k, repr(v)) for k, v in params.items())))
+        signatures.append(ids.setdefault(key, len(ids)))
+
+    return signatures
+
+def find_runs(signatures, max_period=MAX_PERIOD)->list:
+    """Splits a sequence of layer signatures into runs of repeated subsequences
+
+    Scans from left to right, at every position the period which covers the most layers
+    with at least two consecutive copies is taken, the smallest such period on ties.
+
+    Parameters
+    ----------
+    signatures : list
+        Signature of every layer
+    max_period : int, optional
+        Length of the longest subsequence looked for. Default is 32
+
+    Returns
+    -------
+    runs : list
+        Runs covering all the layers in order, the layers which are not repeated are runs with a count of 1
+    """
+
+    n = len(signatures)
+    runs = list()
+    i = 0
+
+    while i < n:
+        best_period, best_count = 1, 1
+
+        for period in range(1, min(max_period, (n - i) // 2) + 1):
+            pattern = signatures[i:i+period]
+            count = 1
+            while signatures[i+count*period:i+(count+1)*period] == pattern:
+                count = count + 1
+
+            if count > 1 and period * count > best_period * best_count:
+                best_period, best_count = period, count
+
+        runs.append(Run(i, best_period, best_count))
+        i = i + best_period * best_count
+
+    return runs
+
+def visible_layers(runs)->list:
+    """Gives the indices of the layers drawn for the runs, the first copy of each run
+
+    Parameters
+    ----------
+    runs : list
+        Runs given by find_runs()
+
+    Returns
+    -------
+    layers : list
+        Layer indices in order
+    """
+
+    layers = list()
+    for run in runs:
+        layers.extend(range(run.start, run.start + run.period))
+
+    return layers
@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+
+"""
+Layer Graph
+===========
+
+A compressed sparse row (CSR) adjacency index of the connections between the layers, for the
+models which are not a plain chain, such as residual, Inception or multi-input networks.
+
+The layers are integer ids, the successors of layer u are targets[offsets[u]:offsets[u+1]] and
+its predecessors are sources[reverse_offsets[u]:reverse_offsets[u+1]]. Both are built with a
+counting sort of the edges, in O(V+E).
+"""
+
+from array import array
+
+from .exceptions import CannotCreateModel
+
+def _csr(n, keys, values):
+    # Offsets and values of the edges grouped by key, a counting sort which keeps the order of the edges
+
+    offsets = array('q', bytes(8 * (n + 1)))
+    for key in keys:
+        offsets[key + 1] = offsets[key + 1] + 1
+    for i in range(n):
+        offsets[i + 1] = offsets[i + 1] + offsets[i]
+
+    grouped = array('q', bytes(8 * len(keys)))
+    position = offsets[:-1]
+    for key, value in zip(keys, values):
+        grouped[position[key]] = value
+        position[key] = position[key] + 1
+
+    return offsets, grouped
+
+class LayerGraph():
+    """
+    Adjacency index of the layers
+
+    Parameters
+    ----------
+    n : int
+        Number of layers
+    sources : array-like
+        Source layer of every edge
+    targets : array-like
+        Target layer of every edge
+
+    Attributes
+    ----------
+    offsets : array.array
+        Start of the successors of every layer in `targets`, with a last entry equal to the number of edges
+    targets : array.array
+        Successors of all the layers, grouped by layer
+    reverse_offsets : array.array
+        Start of the predecessors of every layer in `sources`
+    sources : array.array
+        Predecessors of all the layers, grouped by layer
+
+    Examples
+    --------
+    >>> graph = LayerGraph(4, [0, 0, 1, 2], [1, 2, 3, 3])
+    >>> list(graph.successors(0)), list(graph.predecessors(3))
+    ([1, 2], [1, 2])
+    >>> graph.topological_order()
+    [0, 1, 2, 3]
+    """
+
+    __slots__ = ('offsets', 'targets', 'reverse_offsets', 'sources')
+
+    def __init__(self, n:int, sources, targets):
+        for u in sources:
+            if not 0 <= u < n:
+                raise CannotCreateModel("Edge from layer "+str(u)+", the network has "+str(n)+" layers")
+        for v in targets:
+            if not 0 <= v < n:
+                raise CannotCreateModel("Edge to layer "+str(v)+", the network has "+str(n)+" layers")
+
+        self.offsets, self.targets = _csr(n, sources, targets)
+        self.reverse_offsets, self.sources = _csr(n, targets, sources)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def successors(self, u:int):
+        """Gives the layers fed by the layer u"""
+
+        return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+    def predecessors(self, v:int):
+        """Gives the layers feeding the layer v, in the order of the edges"""
+
+        return self.sources[self.reverse_offsets[v]:self.reverse_offsets[v + 1]]
+
+    def edges(self):
+        """Yields every (source, target) edge, grouped by source"""
+
+        offsets, targets = self.offsets, self.targets
+        for u in range(len(self)):
+            for e in range(offsets[u], offsets[u + 1]):
+                yield (u, targets[e])
+
+        return
+
+    def topological_order(self)->list:
+        """Gives the layers in an order where every layer comes after all the layers feeding it
+
+        Kahn's algorithm, the ready layers are taken in the order they became ready, so a chain
+        keeps its order
+
+        Raises
+        ------
+        CannotCreateModel
+            When the connections have a cycle
+        """
+
+        n = len(self)
+        offsets, targets = self.offsets, self.targets
+        degree = array('q', (self.reverse_offsets[v + 1] - self.reverse_offsets[v] for v in range(n)))
+
+        order = [v for v in range(n) if degree[v] == 0]
+        head = 0
+        while head < len(order):
+            u = order[head]
+            head = head + 1
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                degree[v] = degree[v] - 1
+                if degree[v] == 0:
+                    order.append(v)
+
+        if len(order) != n:
+            raise CannotCreateModel("The connections between the layers have a cycle")
+
+        return order
+
+    def levels(self, order=None)->list:
+        """Gives the level of every layer, the length of the longest path reaching it from a layer without inputs
+
+        Parameters
+        ----------
+        order : list, optional
+            A topological order, computed if not given
+        """
+
+        offsets, targets = self.offsets, self.targets
+        level = [0] * len(self)
+
+        for u in (order if order is not None else self.topological_order()):
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if level[v] < level[u] + 1:
+                    level[v] = level[u] + 1
+
+        return level
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+
+"""
+Layer Table
+===========
+
+A compact struct-of-arrays store of the layers added to the visualizer
+"""
+
+import sys
+
+from array import array
+
+LAYER_TYPES = ('dense', 'conv2d', 'maxpool2d', 'avgpool2d', 'flatten', 'linear')
+TYPE_CODES = {layer_type: code for code, layer_type in enumerate(LAYER_TYPES)}
+
+DENSE, CONV2D, MAXPOOL2D, AVGPOOL2D, FLATTEN, LINEAR = range(len(LAYER_TYPES))
+
+# Indexed by the type code, True for the layers drawn as a column of nodes
+IS_DENSE = tuple(code in (DENSE, LINEAR) for code in range(len(LAYER_TYPES)))
+
+# Prefix of the layer names, indexed by the type code
+NAME_PREFIXES = tuple(sys.intern(layer_type.capitalize()) for layer_type in LAYER_TYPES)
+
+class LayerTable():
+    """
+    Struct-of-arrays store of the layers
+
+    The layer types are kept as small integer codes and the units as a C array of 64 bit integers,
+    the layer names are interned and indexed, so that a name can be looked up in O(1).
+
+    Attributes
+    ----------
+    names : list
+        Interned name of each layer
+    type_codes : array.array
+        Type code of each layer, an index into LAYER_TYPES
+    units : array.array
+        Number of units of each layer
+    params : list
+        Parameter dict of each layer, such as filters, kernel_size, padding, stride, pool_size
+    """
+
+    __slots__ = ('names', 'type_codes', 'units', 'params', '_index')
+
+    def __init__(self):
+        self.names = list()
+        self.type_codes = array('B')
+        self.units = array('q')
+        self.params = list()
+        self._index = dict()
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, name:str, layer_type:str, units:int, params:dict)->int:
+        """Appends a layer to the table
+
+        Parameters
+        ----------
+        name : str
+            Unique name of the layer
+        layer_type : str
+            One of LAYER_TYPES
+        units : int
+            Number of units of the layer
+        params : dict
+            Parameters of the layer
+
+        Returns
+        -------
+        idx : int
+            Index of the new layer
+        """
+
+        idx = len(self.names)
+        name = sys.intern(name)
+
+        self.names.append(name)
+        self.type_codes.append(TYPE_CODES[layer_type])
+        self.units.append(units)
+        self.params.append(params)
+        self._index[name] = idx
+
+        return idx
+
+    def type(self, idx:int)->str:
+        """Gives the type of the layer at the given index"""
+
+        return LAYER_TYPES[self.type_codes[idx]]
+
+    def is_dense(self, idx:int)->bool:
+        """Checks whether the layer at the given index is drawn as a column of nodes"""
+
+        return IS_DENSE[self.type_codes[idx]]
+
+    def types(self)->list:
+        """Gives the types of all the layers"""
+
+        return [LAYER_TYPES[code] for code in self.type_codes]
+
+    def index(self, name:str)->int:
+        """Gives the index of the layer with the given name
+
+        Raises
+        ------
+        KeyError
+            When there is no such layer
+        """
+
+        return self._index[name]
+
+    @classmethod
+    def from_columns(cls, names, type_codes, units, params):
+        """Makes a table from its columns, without appending the layers one by one
+
+        Parameters
+        ----------
+        names : list
+            Unique name of each layer
+        type_codes : array.array
+            Type code of each layer, unsigned bytes
+        units : array.array
+            Number of units of each layer, 64 bit integers
+        params : list
+            Parameter dict of each layer
+
+        Returns
+        -------
+        table : LayerTable
+            The table, which takes the given columns
+        """
+
+        table = cls()
+        table.names = [sys.intern(name) for name in names]
+        table.type_codes = type_codes
+        table.units = units
+        table.params = params
+        table._index = {name: idx for idx, name in enumerate(table.names)}
+
+        return table
@@ -0,0 +1,393 @@
+#!/usr/bin/python3
+
+"""
+Native Layered Layout
+=====================
+
+A pure-Python layout engine for the layered networks built by the visualizer.
+
+The networks drawn by the visualizer are layered DAGs. A chain is drawn one layer per rank,
+and the layers of a graph are ranked by the longest path reaching them, walking the adjacency
+index in topological order, with the layers of the same rank side by side. The node coordinates
+are computed directly from the ranks without running the Graphviz `dot` process.
+"""
+
+from html import escape
+
+from .folding import visible_layers
+
+# All the sizes are in points (1 inch = 72 points), same as Graphviz
+RANK_SEP = 144
+NODE_SEP = 18
+MARGIN = 36
+TITLE_HEIGHT = 36
+POINT_SIZE = 36
+FONT_SIZE = 14
+LINE_HEIGHT = 17
+
+# (shape, width, height) of the spatial layers, same as the ones used with Graphviz
+SPATIAL_SHAPES = {
+    'conv2d': ('box3d', 108, 108),
+    'maxpool2d': ('ellipse', 36, 144),
+    'avgpool2d': ('ellipse', 36, 144),
+    'flatten': ('rectangle', 36, 324)
+}
+
+class LayeredLayout():
+    """
+    Node coordinates of a layered network
+
+    Parameters
+    ----------
+    network : visualizer
+        The visualizer object whose layers has to be positioned
+
+    Attributes
+    ----------
+    width : float
+        Width of the drawing
+    height : float
+        Height of the drawing
+    layers_ : list
+        Index of every layer drawn, in the layer table of the network, in the order of their ranks
+    nodes_ : list
+        One list per layer, containing (x, y) center of the every node drawn for that layer
+    shapes_ : list
+        One (shape, width, height, fillcolor, label) tuple per layer
+    extras_ : list
+        (x, y, text) of the '+N' labels of the layers which have more units than drawn nodes, and of the cost annotations
+    blocks_ : list
+        (left, top, right, bottom, label) of the boxes around the folded runs of repeated layers
+    pairs_ : list
+        (tail, head) positions in layers_ of every pair of connected layers
+    links_ : list
+        One entry per pair of connected layers, the (tail, head, strength) of the connections drawn
+        with the 'topk' edges, or None when all the nodes are connected
+    """
+
+    def __init__(self, network):
+        self.title = network.title
+        self.orient_ = network.orient_.upper()
+        self.layers_ = list()
+        self.nodes_ = list()
+        self.shapes_ = list()
+        self.extras_ = list()
+        self.blocks_ = list()
+        self.pairs_ = list()
+        self.links_ = list()
+
+        self._compute(network)
+
+    def _ranks(self, network, runs):
+        # The layers of every rank, and the connected pairs of layers
+
+        visible = visible_layers(runs)
+        if network._chain_:
+            return [[i] for i in visible], list(zip(visible, visible[1:]))
+
+        graph = network.layer_graph_
+        levels = graph.levels(graph.topological_order())
+        ranks = [list() for _ in range(max(levels) + 1)]
+        for i in visible:
+            ranks[levels[i]].append(i)
+
+        return ranks, network._edge_pairs()
+
+    def _compute(self, network):
+        # Compute the rank and the cross coordinates as if the orientation is 'LR', then transform them
+
+        horizontal = self.orient_ in ['LR', 'RL']
+        table = network.layer_table_
+        network._refresh_costs()
+        runs = network._runs()
+        ranks, pairs = self._ranks(network, runs)
+        self.layers_ = [i for members in ranks for i in members]
+        # the last layer drawn of a folded chain is the output, even when it is inside a repeated run
+        outputs = {self.layers_[-1]} if network._chain_ else set(network._sinks())
+
+        sizes = list()
+        rank_centers = list()
+        rank_pos = 0
+
+        for members in ranks:
+            rank_size = 0
+            for i in members:
+                layer_type = table.type(i)
+
+                if table.is_dense(i):
+                    nodes = len(network._drawn_units(i))
+                    if i in outputs:
+                        color = network.color_encoding['output']
+                    elif network._in_degree_[i] == 0:
+                        color = network.color_encoding['input']
+                    else:
+                        color = network.color_encoding['hidden']
+                    color = network._heat_fill(i) or color
+                    self.shapes_.append(('point', POINT_SIZE, POINT_SIZE, color, ''))
+
+                    size = POINT_SIZE
+                    cross_size = nodes * POINT_SIZE + (nodes - 1) * NODE_SEP
+                else:
+                    shape, width, height = SPATIAL_SHAPES[layer_type]
+                    color = network._heat_fill(i) or network.color_encoding.get(layer_type, 'black')
+                    self.shapes_.append((shape, width, height, color, network._layer_label(i)))
+
+                    nodes = 1
+                    size = width if horizontal else height
+                    cross_size = height if horizontal else width
+
+                rank_size = max(rank_size, size)
+                sizes.append((nodes, cross_size))
+
+            if rank_centers:
+                rank_pos = rank_pos + RANK_SEP
+            rank_centers.append(rank_pos + rank_size / 2)
+            rank_pos = rank_pos + rank_size
+
+        # the layers of a rank are side by side, RANK_SEP / 2 apart
+        rank_cross = list()
+        pos = 0
+        for members in ranks:
+            rank_cross.append(sum(cross for _, cross in sizes[pos:pos + len(members)]) + (len(members) - 1) * RANK_SEP / 2)
+            pos = pos + len(members)
+
+        max_cross = max(rank_cross)
+        total_rank = rank_pos
+
+        if horizontal:
+            self.width = total_rank + 2 * MARGIN
+            self.height = max_cross + 2 * MARGIN + TITLE_HEIGHT
+        else:
+            self.width = max_cross + 2 * MARGIN
+            self.height = total_rank + 2 * MARGIN + TITLE_HEIGHT
+
+        step = POINT_SIZE + NODE_SEP
+        pos = 0
+        for members, rank, cross in zip(ranks, rank_centers, rank_cross):
+            # the free space of the rank is shared by its layers, a single layer spans the whole drawing
+            extra = (max_cross - cross) / len(members)
+            span_start = 0
+            for i in members:
+                nodes, cross_size = sizes[pos]
+                span = cross_size + extra
+                start = span_start + (span - (nodes - 1) * step) / 2
+                crosses = [start + j * step for j in range(nodes)]
+
+                self.nodes_.append([self._transform(rank, c, total_rank) for c in crosses])
+
+                rows = list()
+                if table.is_dense(i) and table.units[i] > nodes:
+                    rows.append('+'+str(table.units[i] - nodes))
+                if network.costs_ is not None:
+                    rows.append(network._cost_label(i))
+                if rows:
+                    x, y = self._transform(rank, span_start + span, total_rank)
+                    self.extras_.append((x, y + FONT_SIZE, '\n'.join(rows)))
+
+                span_start = span_start + span + RANK_SEP / 2
+                pos = pos + 1
+
+        position = {i: pos for pos, i in enumerate(self.layers_)}
+        self.pairs_ = [(position[i], position[j]) for i, j in pairs]
+        self.links_ = [network._selected_edges(i, j) for i, j in pairs]
+
+        pos = 0
+        for run in runs:
+            if run.count > 1:
+                self.blocks_.append(self._bounding_box(range(pos, pos + run.period), '× '+str(run.count)))
+            pos = pos + run.period
+
+        return
+
+    def _bounding_box(self, positions, label):
+        # Box around all the nodes of the given layer positions
+
+        left, top, right, bottom = float('inf'), float('inf'), float('-inf'), float('-inf')
+        for pos in positions:
+            _, width, height, _, _ = self.shapes_[pos]
+            for x, y in self.nodes_[pos]:
+                left, right = min(left, x - width / 2), max(right, x + width / 2)
+                top, bottom = min(top, y - height / 2), max(bottom, y + height / 2)
+
+        pad = NODE_SEP
+        return (left - pad, top - pad - FONT_SIZE, right + pad, bottom + pad, label)
+
+    def _transform(self, rank, cross, total_rank):
+        # Transform the rank/cross coordinates into the drawing coordinates
+
+        if self.orient_ == 'LR':
+            x, y = rank, cross
+        elif self.orient_ == 'RL':
+            x, y = total_rank - rank, cross
+        elif self.orient_ == 'TB':
+            x, y = cross, rank
+        else:
+            x, y = cross, total_rank - rank
+
+        return (x + MARGIN, y + MARGIN + TITLE_HEIGHT)
+
+    def edges(self):
+        """Yields the end points of every edge in the network
+
+        Yields
+        ------
+        edge : tuple
+            ((x1, y1), (x2, y2)) end points of an edge
+        """
+
+        for p1, p2, _ in self._edges():
+            yield (p1, p2)
+
+    def _edges(self):
+        # End points and strength of every edge, the strength is None when all the nodes are connected
+
+        for (a, b), link in zip(self.pairs_, self.links_):
+            if link is not None:
+                for t, h, strength in link:
+                    yield (self.nodes_[a][t], self.nodes_[b][h], strength)
+                continue
+
+            for p1 in self.nodes_[a]:
+                for p2 in self.nodes_[b]:
+                    yield (p1, p2, None)
+
+    def to_svg(self):
+        """Draws the network as an SVG document
+
+        Returns
+        -------
+        svg : str
+            The SVG document
+        """
+
+        lines = list()
+        add = lines.append
+
+        add('<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n')
+        add('<svg xmlns="http://www.w3.org/2000/svg" width="{0:.0f}pt" height="{1:.0f}pt" viewBox="0 0 {0:.2f} {1:.2f}">\n'.format(self.width, self.height))
+        add('<rect width="100%" height="100%" fill="white"/>\n')
+        add('<text x="{:.2f}" y="{:.2f}" text-anchor="middle" font-family="Times,serif" font-size="{}">{}</text>\n'.format(self.width / 2, MARGIN, FONT_SIZE, escape(self.title)))
+
+        for left, top, right, bottom, label in self.blocks_:
+            add('<rect x="{:.2f}" y="{:.2f}" width="{:.2f}" height="{:.2f}" fill="none" stroke="black" stroke-dasharray="5,3"/>\n'.format(left, top, right - left, bottom - top))
+            add('<text x="{:.2f}" y="{:.2f}" text-anchor="middle" font-family="Times,serif" font-size="{}">{}</text>\n'.format((left + right) / 2, top + FONT_SIZE, FONT_SIZE, escape(label)))
+
+        add('<g stroke="black" stroke-width="1">\n')
+        for (x1, y1), (x2, y2), strength in self._edges():
+            if strength is None:
+                add('<line x1="{:.2f}" y1="{:.2f}" x2="{:.2f}" y2="{:.2f}"/>\n'.format(x1, y1, x2, y2))
+            else:
+                level = int(round(200 * (1 - strength)))
+                add('<line x1="{:.2f}" y1="{:.2f}" x2="{:.2f}" y2="{:.2f}" stroke="#{:02x}{:02x}{:02x}" stroke-width="{:.2f}"/>\n'.format(
+                    x1, y1, x2, y2, level, level, level, 0.5 + 2.5 * strength))
+        add('</g>\n')
+
+        for points, (shape, width, height, color, label) in zip(self.nodes_, self.shapes_):
+            for x, y in points:
+                add(_svg_node(shape, x, y, width, height, color, label))
+
+        for x, y, text in self.extras_:
+            for j, row in enumerate(text.split('\n')):
+                add('<text x="{:.2f}" y="{:.2f}" text-anchor="middle" font-family="Times,serif" font-size="{}">{}</text>\n'.format(x, y + j * LINE_HEIGHT, FONT_SIZE, escape(row)))
+
+        add('</svg>\n')
+
+        return "".join(lines)
+
+    def to_bytes(self, file_type='svg')->bytes:
+        """Draws the network as an image
+
+        Parameters
+        ----------
+        file_type : str, optional
+            One of 'svg', 'png', 'pdf'. Default is 'svg'
+
+            'png' and 'pdf' needs the optional `cairosvg` package to rasterize the SVG
+
+        Returns
+        -------
+        data : bytes
+            The image
+
+        Raises
+        ------
+        ImportError
+            When a raster format is asked and `cairosvg` is not installed
+        """
+
+        return _convert(self.to_svg().encode('utf-8'), file_type)
+
+    def write(self, path, file_type='svg'):
+        """Writes the drawing to a file
+
+        Parameters
+        ----------
+        path : str
+            Path of the output file
+        file_type : str, optional
+            One of 'svg', 'png', 'pdf'. Default is 'svg'
+        """
+
+        self.write_many([(file_type, path)])
+
+        return
+
+    def write_many(self, outputs):
+        """Writes the drawing to many files, the SVG is drawn once and converted to every format
+
+        Parameters
+        ----------
+        outputs : list
+            (file_type, path) of every output file, file_type is one of 'svg', 'png', 'pdf'
+        """
+
+        svg = self.to_svg().encode('utf-8')
+
+        for file_type, path in outputs:
+            data = _convert(svg, file_type)
+            with open(path, 'wb') as f:
+                f.write(data)
+
+        return
+
+def _convert(svg, file_type):
+    # The SVG drawing in the given format
+
+    if file_type == 'svg':
+        return svg
+
+    try:
+        import cairosvg
+    except ImportError:
+        raise ImportError("Writing '"+file_type+"' with the native engine needs cairosvg, install it with `pip install cairosvg`")
+
+    if file_type == 'png':
+        return cairosvg.svg2png(bytestring=svg)
+
+    return cairosvg.svg2pdf(bytestring=svg)
+
+def _svg_node(shape, x, y, width, height, color, label):
+    # SVG element(s) of a single node centered at (x, y)
+
+    style = 'fill="{}" stroke="black"'.format(color)
+
+    if shape == 'point':
+        return '<circle cx="{:.2f}" cy="{:.2f}" r="{:.2f}" {}/>\n'.format(x, y, width / 2, style)
+
+    left, top = x - width / 2, y - height / 2
+    if shape == 'ellipse':
+        node = '<ellipse cx="{:.2f}" cy="{:.2f}" rx="{:.2f}" ry="{:.2f}" {}/>\n'.format(x, y, width / 2, height / 2, style)
+    else:
+        node = '<rect x="{:.2f}" y="{:.2f}" width="{:.2f}" height="{:.2f}" {}/>\n'.format(left, top, width, height, style)
+        if shape == 'box3d':
+            # a shifted copy behind the box gives the 3D look
+            back = '<rect x="{:.2f}" y="{:.2f}" width="{:.2f}" height="{:.2f}" {}/>\n'.format(left + 4, top - 4, width, height, style)
+            node = back + node
+
+    rows = label.split('\n')
+    first = y - (len(rows) - 1) * LINE_HEIGHT / 2 + FONT_SIZE / 3
+    for j, row in enumerate(rows):
+        node = node + '<text x="{:.2f}" y="{:.2f}" text-anchor="middle" font-family="Times,serif" font-size="{}">{}</text>\n'.format(
+            x, first + j * LINE_HEIGHT, FONT_SIZE, escape(row))
+
+    return node
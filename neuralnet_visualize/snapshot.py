@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+
+"""
+Architecture Snapshots
+======================
+
+A compact binary file holding the layer table, the connections and the style of a network, so
+that a diagram can be drawn again without the framework the model was built with.
+
+All the integers are little endian. The file is
+
+* a header, struct HEADER: the magic b'NNVZ', the format version, the flags (0), the number of
+  layers, the number of connections and the size of the metadata
+* the type code of every layer, one byte each, padded with zeros to a multiple of 8 bytes
+* the units of every layer, int64
+* the source then the target layer of every connection, int64
+* the metadata, UTF-8 JSON: the layer names and parameters, and the options of the visualizer
+
+The file is memory-mapped when read, the columns are copied straight into arrays and only the
+metadata is parsed.
+"""
+
+import sys
+import json
+import mmap
+import struct
+import numbers
+
+from array import array
+
+MAGIC = b'NNVZ'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQQ')
+
+def _pack(value):
+    # The value with its tuples tagged, as JSON keeps only lists
+
+    if isinstance(value, tuple):
+        return {'tuple': [_pack(item) for item in value]}
+    if isinstance(value, list):
+        return [_pack(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _pack(item) for key, item in value.items()}
+    if isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        # such as the numpy integers given by some adapters
+        return int(value)
+
+    return value
+
+def _tuple_hook(value):
+    # A decoded JSON object, or the tuple it tags
+
+    if len(value) == 1 and 'tuple' in value:
+        return tuple(value['tuple'])
+
+    return value
+
+def _little_endian(values):
+    # Bytes of an int64 array, little endian
+
+    if sys.byteorder == 'big':
+        values = array('q', values)
+        values.byteswap()
+
+    return values.tobytes()
+
+def _column(buf, start, count):
+    # int64 array of `count` little endian values starting at `start`
+
+    values = array('q')
+    values.frombytes(buf[start:start + 8 * count])
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    return values
+
+def write_snapshot(path:str, type_codes, units, sources, targets, meta:dict)->int:
+    """Writes a snapshot file
+
+    Parameters
+    ----------
+    path : str
+        Path of the file
+    type_codes : array.array
+        Type code of every layer, unsigned bytes
+    units : array.array
+        Units of every layer, int64
+    sources : array.array
+        Source layer of every connection, int64
+    targets : array.array
+        Target layer of every connection, int64
+    meta : dict
+        JSON compatible metadata, tuples are kept
+
+    Returns
+    -------
+    size : int
+        Number of bytes written
+    """
+
+    n = len(type_codes)
+    data = json.dumps(_pack(meta), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    codes = type_codes.tobytes()
+
+    chunks = [HEADER.pack(MAGIC, VERSION, 0, n, len(sources), len(data)),
+              codes, bytes(-n % 8),
+              _little_endian(units), _little_endian(sources), _little_endian(targets),
+              data]
+
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+    return sum(len(chunk) for chunk in chunks)
+
+def read_snapshot(path:str)->dict:
+    """Reads a snapshot file
+
+    Parameters
+    ----------
+    path : str
+        Path of the file
+
+    Returns
+    -------
+    snapshot : dict
+        'type_codes', 'units', 'sources', 'targets', the columns as arrays, and 'meta', the metadata
+
+    Raises
+    ------
+    ValueError
+        When the file is not a snapshot, or was written by a newer version
+    """
+
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be mapped
+            raise ValueError(path+" is not a network snapshot, it is empty")
+
+    try:
+        if len(buf) < HEADER.size or buf[:4] != MAGIC:
+            raise ValueError(path+" is not a network snapshot")
+
+        _, version, _, n, edges, meta_size = HEADER.unpack_from(buf, 0)
+        if version > VERSION:
+            raise ValueError(path+" is a version "+str(version)+" snapshot, only the versions up to "+str(VERSION)+" can be read, upgrade neuralnet-visualize")
+
+        if HEADER.size + n + (-n % 8) + 8 * n + 16 * edges + meta_size != len(buf):
+            raise ValueError(path+" is a truncated or corrupted network snapshot")
+
+        pos = HEADER.size
+        type_codes = array('B', buf[pos:pos + n])
+        pos = pos + n + (-n % 8)
+        units = _column(buf, pos, n)
+        pos = pos + 8 * n
+        sources = _column(buf, pos, edges)
+        pos = pos + 8 * edges
+        targets = _column(buf, pos, edges)
+        pos = pos + 8 * edges
+
+        meta = json.loads(buf[pos:pos + meta_size].decode('utf-8'), object_hook=_tuple_hook)
+    finally:
+        buf.close()
+
+    return dict(type_codes=type_codes, units=units, sources=sources, targets=targets, meta=meta)
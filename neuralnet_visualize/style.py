@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+
+"""
+Shared Style and Fragment Templates
+===================================
+
+The default style and the option lists are read-only and shared by all the visualizers, so
+creating a visualizer does not build them again.
+
+The DOT fragment of a layer only depends on its type, parameters, drawn units, color and
+annotation, not on its name. It is emitted once, for a placeholder name, and kept in a bounded
+LRU cache shared by all the visualizers and threads, then every layer with the same look gets
+it with its own name substituted. The spatial layer labels are cached the same way.
+"""
+
+import threading
+
+from collections import OrderedDict
+from types import MappingProxyType
+
+COLOR_ENCODING = MappingProxyType({'input': 'yellow', 'hidden': 'green', 'output': 'red', 'conv2d': 'pink', 'maxpool2d': 'blue', 'avgpool2d': 'cyan', 'flatten': 'brown'})
+
+SPATIAL_LAYERS = ('conv2d', 'maxpool2d', 'avgpool2d', 'flatten')
+FILE_TYPES = ('png', 'jpeg', 'jpg', 'svg', 'gif')
+ORIENTATIONS = ('LR', 'TB', 'BT', 'RL')
+ENGINES = ('dot', 'native')
+NATIVE_FILE_TYPES = ('svg', 'png', 'pdf')
+
+# Name of the layer in a template, a valid DOT id which never appears in a label
+PLACEHOLDER = '__nnviz_layer__'
+
+DEFAULT_CACHE_SIZE = 4096
+
+def freeze(value):
+    """Gives a hashable key of a parameter value, lists and tuples are told apart, as their labels differ"""
+
+    if isinstance(value, list):
+        return ('list',) + tuple(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return ('tuple',) + tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return ('dict',) + tuple((key, freeze(item)) for key, item in value.items())
+
+    return value
+
+class TemplateCache():
+    """
+    Bounded LRU cache of immutable values, safe to share between threads
+
+    Parameters
+    ----------
+    max_size : int, optional
+        Maximum number of entries, the least recently used ones are evicted. Default is 4096
+
+    Attributes
+    ----------
+    hits_ : int
+        Number of lookups which found a stored value
+    misses_ : int
+        Number of lookups which had to make the value
+    evictions_ : int
+        Number of entries removed to keep the cache under `max_size`
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        if max_size <= 0:
+            raise ValueError("max_size should be a positive integer, but got "+str(max_size))
+
+        self.max_size = max_size
+        self.hits_ = 0
+        self.misses_ = 0
+        self.evictions_ = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, make):
+        """Gives the value of a key, made and stored on a miss
+
+        Parameters
+        ----------
+        key : hashable
+            The key
+        make : callable
+            Called without arguments to make the value on a miss, outside of the lock. It should
+            give an immutable value, such as a tuple of strings
+
+        Returns
+        -------
+        value : object
+            The stored value
+        """
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits_ = self.hits_ + 1
+                return value
+            self.misses_ = self.misses_ + 1
+
+        # two threads may make the same value, the first one stored is kept
+        value = make()
+
+        with self._lock:
+            value = self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions_ = self.evictions_ + 1
+
+        return value
+
+    def clear(self)->None:
+        """Removes all the entries"""
+
+        with self._lock:
+            self._entries.clear()
+
+        return
+
+    def stats(self)->dict:
+        """Gives the counters and the size of the cache"""
+
+        return dict(hits=self.hits_, misses=self.misses_, evictions=self.evictions_, size=len(self._entries), max_size=self.max_size)
+
+# The cache shared by all the visualizers
+TEMPLATES = TemplateCache()
@@ -0,0 +1,335 @@
+#!/usr/bin/python3
+
+"""
+Interactive HTML Viewer
+=======================
+
+Writes the network as a single self-contained HTML file, drawn on a canvas by a small script.
+
+The layer table and the coordinates of the native layout are embedded as JSON, so the browser
+does not lay anything out. The layers are sorted along the rank axis and only the ones inside
+the viewport are drawn, found with a binary search, so panning and zooming stay fast with
+10k layers. When zoomed out, the layers are drawn as bars, without their nodes and edges.
+"""
+
+import json
+
+from html import escape
+
+from .layout import LayeredLayout
+
+def layout_data(network)->dict:
+    """Gives the layer table and the layout of the network, as JSON compatible data
+
+    Parameters
+    ----------
+    network : visualizer
+        The visualizer object
+
+    Returns
+    -------
+    data : dict
+        'title', 'orient', 'width', 'height', 'layers' (one list per layer drawn: name, type, units,
+        params, shape, width, height, color, label, extra text, first node x, y, last node x, y and
+        number of nodes), 'edges' (the positions in 'layers' of every pair of connected layers, and
+        the 'topk' edges between them, or None) and 'blocks' (the boxes of the folded runs)
+    """
+
+    layout = LayeredLayout(network)
+    table = network.layer_table_
+
+    layers = list()
+    for i, points, (shape, width, height, color, label) in zip(layout.layers_, layout.nodes_, layout.shapes_):
+        extra = list()
+        if table.is_dense(i) and table.units[i] > len(points):
+            extra.append('+'+str(table.units[i] - len(points)))
+        if network.costs_ is not None:
+            extra.append(network._cost_label(i))
+
+        (x0, y0), (x1, y1) = points[0], points[-1]
+        layers.append([table.names[i], table.type(i), table.units[i], table.params[i], shape, width, height, color, label,
+                       '\n'.join(extra), round(x0, 2), round(y0, 2), round(x1, 2), round(y1, 2), len(points)])
+
+    edges = [[a, b, None if link is None else [[t, h, round(strength, 3)] for t, h, strength in link]]
+             for (a, b), link in zip(layout.pairs_, layout.links_)]
+
+    return dict(title=network.title, orient=layout.orient_, width=layout.width, height=layout.height,
+                layers=layers, edges=edges, blocks=layout.blocks_)
+
+def to_html(network)->str:
+    """Gives the HTML document of the interactive viewer
+
+    Parameters
+    ----------
+    network : visualizer
+        The visualizer object
+
+    Returns
+    -------
+    html : str
+        The HTML document, with the data and the script inline
+    """
+
+    data = json.dumps(layout_data(network), separators=(',', ':'), default=str)
+    # the JSON is inside a script element, which must not be closed by a string in it
+    data = data.replace('</', '<\\/')
+
+    return VIEWER_TEMPLATE.replace('__TITLE__', escape(network.title)).replace('__DATA__', data)
+
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+html, body { margin: 0; height: 100%; overflow: hidden; font-family: Times, serif; }
+canvas { display: block; cursor: grab; }
+#bar { position: absolute; top: 8px; left: 8px; background: #fff; border: 1px solid #999; padding: 4px; }
+#info { position: absolute; bottom: 8px; left: 8px; background: #fff; border: 1px solid #999; padding: 4px 8px; white-space: pre; display: none; }
+</style>
+</head>
+<body>
+<canvas id="view"></canvas>
+<div id="bar"><input id="search" placeholder="Search a layer name" size="28"> <span id="found"></span> <button id="fit">Fit</button></div>
+<div id="info"></div>
+<script type="application/json" id="data">__DATA__</script>
+<script>
+(function () {
+  var data = JSON.parse(document.getElementById('data').textContent);
+  var canvas = document.getElementById('view'), ctx = canvas.getContext('2d');
+  var horizontal = data.orient === 'LR' || data.orient === 'RL';
+  var FONT = 14, LINE = 17, DETAIL = 400;
+
+  var layers = data.layers.map(function (l, i) {
+    var x0 = l[10], y0 = l[11], x1 = l[12], y1 = l[13];
+    var half = horizontal ? l[5] / 2 : l[6] / 2;
+    return {index: i, name: l[0], type: l[1], units: l[2], params: l[3], shape: l[4], w: l[5], h: l[6], color: l[7],
+            label: l[8], extra: l[9], x0: x0, y0: y0, x1: x1, y1: y1, n: l[14], rank: horizontal ? x0 : y0,
+            left: Math.min(x0, x1) - l[5] / 2, right: Math.max(x0, x1) + l[5] / 2,
+            top: Math.min(y0, y1) - l[6] / 2, bottom: Math.max(y0, y1) + l[6] / 2 + (l[9] ? LINE * 5 : 0), half: half};
+  });
+  // the layers sorted along the rank axis, for the binary search of the viewport
+  var order = layers.slice().sort(function (a, b) { return a.rank - b.rank; });
+  var maxHalf = layers.reduce(function (m, l) { return Math.max(m, l.half); }, 0);
+
+  var scale = 1, tx = 0, ty = 0, selected = null, matches = [], current = -1, pending = false;
+
+  function point(l, k) {
+    var t = l.n > 1 ? k / (l.n - 1) : 0;
+    return [l.x0 + (l.x1 - l.x0) * t, l.y0 + (l.y1 - l.y0) * t];
+  }
+
+  function lowerBound(value) {
+    var lo = 0, hi = order.length;
+    while (lo < hi) {
+      var mid = (lo + hi) >> 1;
+      if (order[mid].rank < value) { lo = mid + 1; } else { hi = mid; }
+    }
+    return lo;
+  }
+
+  function viewport() {
+    // world coordinates of the viewport along the rank axis
+    if (horizontal) { return [-tx / scale - maxHalf, (canvas.width - tx) / scale + maxHalf]; }
+    return [-ty / scale - maxHalf, (canvas.height - ty) / scale + maxHalf];
+  }
+
+  function visibleRange() {
+    var view = viewport();
+    return [lowerBound(view[0]), lowerBound(view[1])];
+  }
+
+  function drawNode(l, x, y) {
+    ctx.fillStyle = l.color;
+    ctx.beginPath();
+    if (l.shape === 'point') {
+      ctx.arc(x, y, l.w / 2, 0, 2 * Math.PI);
+    } else if (l.shape === 'ellipse') {
+      ctx.ellipse(x, y, l.w / 2, l.h / 2, 0, 0, 2 * Math.PI);
+    } else {
+      if (l.shape === 'box3d') { ctx.rect(x - l.w / 2 + 4, y - l.h / 2 - 4, l.w, l.h); ctx.fill(); ctx.stroke(); ctx.beginPath(); }
+      ctx.rect(x - l.w / 2, y - l.h / 2, l.w, l.h);
+    }
+    ctx.fill();
+    ctx.stroke();
+  }
+
+  function drawText(text, x, y) {
+    var rows = text.split('\\n');
+    for (var j = 0; j < rows.length; j++) { ctx.fillText(rows[j], x, y + j * LINE); }
+  }
+
+  function draw() {
+    pending = false;
+    ctx.setTransform(1, 0, 0, 1, 0, 0);
+    ctx.fillStyle = '#fff';
+    ctx.fillRect(0, 0, canvas.width, canvas.height);
+    ctx.setTransform(scale, 0, 0, scale, tx, ty);
+    ctx.lineWidth = 1 / Math.max(scale, 0.05);
+
+    var range = visibleRange(), count = range[1] - range[0];
+    if (count <= 0) { return; }
+
+    if (count > DETAIL || scale < 0.05) {
+      // zoomed out, a bar per layer and at most one layer per pixel
+      var step = Math.max(1, Math.floor(count / canvas.width));
+      for (var p = range[0]; p < range[1]; p += step) {
+        var l = order[p];
+        ctx.fillStyle = l === selected ? 'orange' : l.color;
+        ctx.fillRect(l.left, l.top, l.right - l.left, l.bottom - l.top);
+      }
+      return;
+    }
+
+    // the edges crossing the viewport, a skip connection can have both its layers outside
+    var view = viewport();
+    ctx.strokeStyle = '#000';
+    for (var i = 0; i < data.edges.length; i++) {
+      var a = layers[data.edges[i][0]], b = layers[data.edges[i][1]], link = data.edges[i][2];
+      if (Math.max(a.rank, b.rank) < view[0] || Math.min(a.rank, b.rank) > view[1]) { continue; }
+      if (link) {
+        for (var e = 0; e < link.length; e++) {
+          var s = link[e][2], level = Math.round(200 * (1 - s)), p1 = point(a, link[e][0]), p2 = point(b, link[e][1]);
+          ctx.strokeStyle = 'rgb(' + level + ',' + level + ',' + level + ')';
+          ctx.lineWidth = (0.5 + 2.5 * s) / Math.max(scale, 0.25);
+          ctx.beginPath(); ctx.moveTo(p1[0], p1[1]); ctx.lineTo(p2[0], p2[1]); ctx.stroke();
+        }
+        ctx.strokeStyle = '#000';
+        ctx.lineWidth = 1 / Math.max(scale, 0.05);
+        continue;
+      }
+      ctx.beginPath();
+      for (var t = 0; t < a.n; t++) {
+        var p1 = point(a, t);
+        for (var h = 0; h < b.n; h++) { var p2 = point(b, h); ctx.moveTo(p1[0], p1[1]); ctx.lineTo(p2[0], p2[1]); }
+      }
+      ctx.stroke();
+    }
+
+    ctx.setLineDash([5, 3]);
+    for (var k = 0; k < data.blocks.length; k++) {
+      var block = data.blocks[k];
+      ctx.strokeRect(block[0], block[1], block[2] - block[0], block[3] - block[1]);
+    }
+    ctx.setLineDash([]);
+
+    var labels = scale * FONT >= 6;
+    ctx.font = FONT + 'px Times, serif';
+    ctx.textAlign = 'center';
+    for (var p = range[0]; p < range[1]; p++) {
+      var l = order[p];
+      ctx.strokeStyle = l === selected ? 'orange' : '#000';
+      for (var k = 0; k < l.n; k++) { var c = point(l, k); drawNode(l, c[0], c[1]); }
+      if (!labels) { continue; }
+      ctx.fillStyle = '#000';
+      if (l.label) {
+        var rows = l.label.split('\\n').length;
+        drawText(l.label, l.x0, l.y0 - (rows - 1) * LINE / 2 + FONT / 3);
+      }
+      if (l.extra) { drawText(l.extra, l.x1, l.bottom - LINE * 5 + FONT); }
+    }
+    ctx.strokeStyle = '#000';
+
+    if (labels) {
+      ctx.font = (FONT * 1.5) + 'px Times, serif';
+      ctx.fillStyle = '#000';
+      ctx.fillText(data.title, data.width / 2, 28);
+    }
+  }
+
+  function redraw() {
+    if (!pending) { pending = true; requestAnimationFrame(draw); }
+  }
+
+  function resize() {
+    var ratio = window.devicePixelRatio || 1;
+    canvas.width = window.innerWidth * ratio;
+    canvas.height = window.innerHeight * ratio;
+    canvas.style.width = window.innerWidth + 'px';
+    canvas.style.height = window.innerHeight + 'px';
+    redraw();
+  }
+
+  function fit() {
+    scale = Math.min(canvas.width / data.width, canvas.height / data.height);
+    tx = (canvas.width - data.width * scale) / 2;
+    ty = (canvas.height - data.height * scale) / 2;
+    redraw();
+  }
+
+  function focus(l) {
+    selected = l;
+    scale = Math.max(scale, 1);
+    tx = canvas.width / 2 - (l.x0 + l.x1) / 2 * scale;
+    ty = canvas.height / 2 - (l.y0 + l.y1) / 2 * scale;
+    show(l);
+    redraw();
+  }
+
+  function show(l) {
+    var info = document.getElementById('info');
+    if (!l) { info.style.display = 'none'; return; }
+    var text = l.name + '\\nType: ' + l.type + '\\nUnits: ' + l.units;
+    for (var key in l.params) { text += '\\n' + key + ': ' + JSON.stringify(l.params[key]); }
+    if (l.extra) { text += '\\n' + l.extra; }
+    info.textContent = text;
+    info.style.display = 'block';
+  }
+
+  function pick(x, y) {
+    var wx = (x - tx) / scale, wy = (y - ty) / scale, range = visibleRange();
+    for (var p = range[0]; p < range[1]; p++) {
+      var l = order[p];
+      if (wx >= l.left && wx <= l.right && wy >= l.top && wy <= l.bottom) { return l; }
+    }
+    return null;
+  }
+
+  var drag = null, moved = false;
+  canvas.addEventListener('pointerdown', function (e) {
+    drag = [e.clientX, e.clientY, tx, ty]; moved = false;
+    canvas.setPointerCapture(e.pointerId);
+  });
+  canvas.addEventListener('pointermove', function (e) {
+    if (!drag) { return; }
+    var ratio = window.devicePixelRatio || 1, dx = e.clientX - drag[0], dy = e.clientY - drag[1];
+    if (Math.abs(dx) + Math.abs(dy) > 3) { moved = true; }
+    tx = drag[2] + dx * ratio; ty = drag[3] + dy * ratio;
+    redraw();
+  });
+  canvas.addEventListener('pointerup', function (e) {
+    var ratio = window.devicePixelRatio || 1;
+    if (!moved) { selected = pick(e.clientX * ratio, e.clientY * ratio); show(selected); redraw(); }
+    drag = null;
+  });
+  canvas.addEventListener('wheel', function (e) {
+    e.preventDefault();
+    var ratio = window.devicePixelRatio || 1, x = e.clientX * ratio, y = e.clientY * ratio;
+    var factor = Math.exp(-e.deltaY * 0.0015);
+    tx = x - (x - tx) * factor; ty = y - (y - ty) * factor; scale = scale * factor;
+    redraw();
+  }, {passive: false});
+
+  var search = document.getElementById('search'), found = document.getElementById('found');
+  search.addEventListener('input', function () {
+    var query = search.value.toLowerCase();
+    matches = query ? layers.filter(function (l) { return l.name.toLowerCase().indexOf(query) >= 0; }) : [];
+    current = -1;
+    found.textContent = query ? matches.length + ' found' : '';
+  });
+  search.addEventListener('keydown', function (e) {
+    if (e.key !== 'Enter' || !matches.length) { return; }
+    current = (current + (e.shiftKey ? matches.length - 1 : 1)) % matches.length;
+    found.textContent = (current + 1) + ' / ' + matches.length;
+    focus(matches[current]);
+  });
+  document.getElementById('fit').addEventListener('click', fit);
+
+  window.addEventListener('resize', resize);
+  resize();
+  fit();
+})();
+</script>
+</body>
+</html>
+"""
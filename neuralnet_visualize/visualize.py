@@ -1,10 +1,32 @@
 #!/usr/bin/python3
 
-import graphviz as gv
+import os
+import functools
+import threading
 
-from typing import Union
+from array import array
+from types import MappingProxyType
 
 from .exceptions import *
+from .layout import LayeredLayout
+from .layers import LayerTable, LAYER_TYPES, TYPE_CODES, NAME_PREFIXES, IS_DENSE, DENSE, CONV2D
+from .graph import LayerGraph
+from .adapters import get_adapter
+from .folding import Run, find_runs, layer_signatures, visible_layers
+from .edges import top_edges, edge_style, as_matrix, EDGE_MODES
+from .costs import propagate, format_count, format_bytes, format_shape, heat_color, COST_FIELDS
+from .style import (TEMPLATES, PLACEHOLDER, COLOR_ENCODING, SPATIAL_LAYERS, FILE_TYPES, ORIENTATIONS,
+                    ENGINES, NATIVE_FILE_TYPES, freeze)
+
+def _synchronized(method):
+    # Run the method holding the lock of the visualizer, the lock is reentrant so locked methods can call each other
+
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return locked
 
 class visualizer():
     """
@@ -24,27 +46,63 @@ class visualizer():
         orientation of the network architecture, one of 'LR', 'TB', 'BT', 'RL' (case-insensitive)
 
         LR means Left to Right, TB means Top to Bottom, BT means Bottom to Top, RL means Right to Left. Default is 'LR'
+    engine : str, optional
+        Layout engine, one of 'dot', 'native' (case-insensitive). Default is 'dot'
+
+        'dot' runs the Graphviz dot process, 'native' computes the layered layout in pure Python
+        and writes the image directly, only 'svg', 'png' and 'pdf' are supported by it ('png' and 'pdf' needs cairosvg)
+    cache : RenderCache, optional
+        Cache of the rendered images, when given the dot process is skipped for an already rendered graph. Default is None
+    fold : bool, optional
+        Draw every run of a repeated layer subsequence once, in a cluster labeled with the repeat count. Default is False
+    timer : StageTimer, optional
+        Records the duration of every stage, from the framework conversion to the layout process. Default is None
+    edges : str, optional
+        Edges drawn between two dense layers, one of 'all', 'topk'. Default is 'all'
+
+        'all' connects every drawn node of a layer to every drawn node of the next one, 'topk' draws only
+        the `top_k` connections of largest weight magnitude, wider and darker when stronger. It needs the
+        weights of the layers, given by from_pytorch, from_tensorflow or add_layer(weights=...), and numpy
+    top_k : int, optional
+        Number of connections drawn between two layers with the 'topk' edges, at least 1. Default is 20
+    max_nodes : int, optional
+        Number of nodes drawn for a dense layer, the nodes of a wider layer are sampled evenly over its units. Default is 10
 
     Attributes
     ----------
+    color_encoding : mappingproxy
+        Read-only color of every layer role and type, shared by all the visualizers until set_color_encoding() is called
     orient_ : str
         Orientation of the Architecture
     layers_ : int
         Total number of layers in the architecture
     network_ : graphviz.dot.Graph
         The Graphviz graph object
+    layer_table_ : LayerTable
+        Compact store of all the layers in the architecture
     layer_names_ : list
         Layer names in the architecture
     layer_types_ : list
         Layer types of the architecture
     layer_units_ : list
         Number of units each layer of the network
+    layer_params_ : list
+        Parameters of each layer of the network, such as filters, kernel_size, padding, stride, pool_size
+    layer_graph_ : LayerGraph
+        Adjacency index of the connections between the layers, every layer feeds the next one unless
+        its inputs are given to add_layer()
     nontrain_layers_ : int
         Number of layers whose parameters are non-trainable such as maxpool, avgpool, flatten etc.
+    costs_ : list
+        LayerCost of every layer, once annotate_costs() is called
+    layer_weights_ : dict
+        Weight matrix of the dense layers added with their weights, by layer index
     from_pytorch_called_ : bool
         To check wheather from_pytorch method called
     from_tensorflow_called_ : bool
         To check wheather from_tensorflow method called 
+    from_onnx_called_ : bool
+        To check wheather from_onnx method called
 
     Methods
     -------
@@ -54,10 +112,40 @@ class visualizer():
         Make a network from the PyTorch model object
     from_tensorflow()
         Make a network from the TensorFlow model object
+    from_keras_file()
+        Make a network from a saved .keras/.h5 file, without tensorflow
+    from_onnx()
+        Make a network from an .onnx file, without loading its weights
+    from_adapter()
+        Make a network with a registered framework adapter
     get_meta_data()
         Return a dictionary containing the networks meta data
+    save()
+        Write the layers, connections and style of the network to a compact snapshot file
+    load()
+        Make a network from a snapshot file, without any framework
     summarize()
         Print a network summary in a MySQL Tabular format
+    costs()
+        Compute the shape, parameters, multiply-accumulates and activation memory of every layer
+    annotate_costs()
+        Annotate the layers of the diagram with their cost, optionally as a heatmap
+    stats()
+        Return the stage durations, node and edge counts and DOT size of the network
+    render()
+        Render the network into an image file
+    render_async()
+        Render the network in an asyncio subprocess and give the image as bytes
+    render_bytes()
+        Render the network in memory and give the image as bytes, or write it to a file-like object
+    export()
+        Lay the network out once and write it in many formats
+    stream_dot()
+        Write the DOT source layer by layer as the layers are added, without building the graph in memory
+    export_tiles()
+        Write an overview of the network and detail tiles of fixed layer ranges, rendered in parallel
+    export_html()
+        Write the network as a self-contained interactive HTML viewer
     visualize()
         Render the network and open it with a suitable application
 
@@ -65,6 +153,18 @@ class visualizer():
     ------
     NotAValidOption
         When the option is not available
+    CannotCreateModel
+        When top_k or max_nodes is less than 1
+
+    Notes
+    -----
+    A visualizer can be shared between threads, every method which reads or changes the layers
+    holds the lock of the visualizer, and the rendering processes run outside of it. The style is
+    shared and read-only, and the DOT fragments of the layers come from the template cache of
+    style.py, shared by all the visualizers, so creating one per request is cheap.
+
+    edges, top_k and max_nodes can be set again after the layers are added, the options are checked
+    the same way and the next call to visualize() draws all the nodes and edges with the new values.
 
     Examples
     --------
@@ -79,46 +179,168 @@ class visualizer():
     >>> network.visualize()
     """
 
-    def __init__(self, title="Neural Network", filename='neuralnet', file_type='png', savepdf=False, orientation='LR'):
+    # The options are shared by all the visualizers, and never changed
+    possible_layers = LAYER_TYPES #, 'relu', 'sigmoid', 'softmax', 'swish'
+    spatial_layers = SPATIAL_LAYERS
+    possible_filetypes = FILE_TYPES
+    possible_orientations = ORIENTATIONS
+    possible_engines = ENGINES
+    possible_edges = tuple(EDGE_MODES)
+    native_filetypes = NATIVE_FILE_TYPES
+
+    def __init__(self, title="Neural Network", filename='neuralnet', file_type='png', savepdf=False, orientation='LR', engine='dot', cache=None, fold=False, timer=None, edges='all', top_k=20, max_nodes=10):
         self.title = title
         self.filename = filename
-        self.color_encoding = {'input': 'yellow', 'hidden': 'green', 'output': 'red', 'conv2d': 'pink', 'maxpool2d': 'blue', 'avgpool2d': 'cyan', 'flatten': 'brown'}
-        self.possible_layers = ['dense', 'conv2d', 'maxpool2d', 'avgpool2d', 'flatten', 'linear'] #, 'relu', 'sigmoid', 'softmax', 'swish']
-        self.spatial_layers = ['conv2d', 'maxpool2d', 'avgpool2d', 'flatten']
-        self.possible_filetypes = ['png', 'jpeg', 'jpg', 'svg', 'gif']
-        self.possible_orientations = ['LR', 'TB', 'BT', 'RL']
+        self.color_encoding = COLOR_ENCODING
 
         if savepdf:
             self.file_type = 'pdf'
         else:
             if file_type.lower() not in self.possible_filetypes:
-                raise NotAValidOption(file_type, self.possible_filetypes)
+                raise NotAValidOption(file_type, list(self.possible_filetypes))
             self.file_type = file_type
 
         if orientation.upper() not in self.possible_orientations:
-            raise NotAValidOption(orientation, self.possible_orientations)
+            raise NotAValidOption(orientation, list(self.possible_orientations))
         self.orient_ = orientation
 
-        self.network_ = gv.Graph(filename=filename, directory='./graphs', format=self.file_type,
-              graph_attr=dict(ranksep='2', rankdir=self.orient_, label=title, labelloc='t', color='white', splines='line'),
-              node_attr=dict(label='', nodesep='4', shape='circle', width='0.5'))
+        if engine.lower() not in self.possible_engines:
+            raise NotAValidOption(engine, list(self.possible_engines))
+        self.engine = engine.lower()
+        self.cache = cache
+        self.fold = fold
+        self.timer = timer
+
+        if self.engine == 'native' and self.file_type.lower() not in self.native_filetypes:
+            raise NotAValidOption(self.file_type, list(self.native_filetypes))
+
+        self._lock = threading.RLock()
+        self._network = None
 
         self.layers_ = 0
         self.nontrain_layers_ = 0
-        self.layer_names_ = list()
-        self.layer_types_ = list()
-        self.layer_units_ = list()
+        self.layer_table_ = LayerTable()
+        self.layer_weights_ = dict()
+        self._node_fragments_ = list()
+        self._edge_fragments_ = list()
+        self._output_fragment_ = list()
+        self._dirty_layers_ = set()
+        self._built_layers_ = 0
+        self._edge_sources_ = array('q')
+        self._edge_targets_ = array('q')
+        self._in_degree_ = array('q')
+        self._out_degree_ = array('q')
+        self._built_edges_ = 0
+        self._built_folded_ = False
+        self._node_lines_ = 0
+        self._chain_ = True
+        self._graph = None
+        self.cost_options_ = None
+        self.costs_ = None
+        self._converted_ = False
+        self._dot_bytes_ = None
         self.from_torch_called_ = False
         self.from_tensorflow_called_ = False
+        self.from_onnx_called_ = False
+
+        self.edges = edges
+        self.top_k = top_k
+        self.max_nodes = max_nodes
 
     def __str__(self):
         return self.title
 
+    @property
+    def network_(self):
+        # The graphviz graph is created on first use, so that graphviz is never imported by the native engine
+
+        if self._network is None:
+            self._network = self._new_graph(self.filename, self.title)
+
+        return self._network
+
+    @property
+    def edges(self):
+        return self._edges
+
+    @edges.setter
+    @_synchronized
+    def edges(self, edges):
+        if edges.lower() not in self.possible_edges:
+            raise NotAValidOption(edges, list(self.possible_edges))
+        self._edges = edges.lower()
+        self._invalidate()
+
+    @property
+    def top_k(self):
+        return self._top_k
+
+    @top_k.setter
+    @_synchronized
+    def top_k(self, top_k):
+        if top_k < 1:
+            raise CannotCreateModel("top_k should be at least 1")
+        self._top_k = top_k
+        self._invalidate()
+
+    @property
+    def max_nodes(self):
+        return self._max_nodes
+
+    @max_nodes.setter
+    @_synchronized
+    def max_nodes(self, max_nodes):
+        if max_nodes < 1:
+            raise CannotCreateModel("max_nodes should be at least 1")
+        self._max_nodes = max_nodes
+        self._invalidate()
+
+    def _invalidate(self):
+        # The nodes and edges depend on edges, top_k and max_nodes, all of them are emitted again on the next build
+
+        self._edge_fragments_ = list()
+        self._dirty_layers_.update(range(self.layers_))
+
+    def _new_graph(self, filename, title):
+        # An empty graphviz graph with the attributes of the network
+
+        import graphviz as gv
+
+        return gv.Graph(filename=filename, directory='./graphs', format=self.file_type,
+                  graph_attr=dict(ranksep='2', rankdir=self.orient_, label=title, labelloc='t', color='white', splines='line'),
+                  node_attr=dict(label='', nodesep='4', shape='circle', width='0.5'))
+
+    @property
+    def layer_names_(self):
+        return self.layer_table_.names
+
+    @property
+    def layer_types_(self):
+        return self.layer_table_.types()
+
+    @property
+    def layer_units_(self):
+        return self.layer_table_.units.tolist()
+
+    @property
+    def layer_params_(self):
+        return self.layer_table_.params
+
+    @property
+    def layer_graph_(self):
+        # The CSR index is built again only when layers or connections were added since the last use
+
+        graph = self._graph
+        if graph is None or len(graph) != self.layers_ or graph.offsets[-1] != len(self._edge_sources_):
+            graph = self._graph = LayerGraph(self.layers_, self._edge_sources_, self._edge_targets_)
+
+        return graph
+
     def _check_dtype(self, value, val_type):
         # Check the datatype of the variable
 
-        if isinstance(value, Union[list, tuple].__args__):
-            if isinstance(value[0], int) and isinstance(value[1], int):
+        if isinstance(value, (list, tuple)):
+            if len(value) == 2 and isinstance(value[0], int) and isinstance(value[1], int):
                 if val_type == 'kernel_size':
                     vstr = "x".join(map(str, value))
                 else:
@@ -135,31 +357,64 @@ class visualizer():
 
         return vstr
 
-    def _update_meta_data(self, layer_type:str, nodes)->str:
+    def _params_key(self, idx):
+        # Hashable key of the type and parameters of the layer at the given index
+
+        return (self.layer_table_.type_codes[idx], freeze(self.layer_table_.params[idx]))
+
+    def _layer_label(self, idx)->str:
+        # Label of the spatial layer at the given index
+
+        return self._label(self.layer_table_.type(idx), self.layer_table_.params[idx])
+
+    def _label(self, layer_type:str, params:dict)->str:
+        # Label of a spatial layer, formatted once per type and parameters
+
+        key = ('label', (TYPE_CODES[layer_type], freeze(params)))
+
+        return TEMPLATES.get(key, lambda: self._format_label(layer_type, params))
+
+    def _format_label(self, layer_type:str, params:dict)->str:
+        # Format the label of a spatial layer, raises the TypeError of invalid parameters
+
+        if layer_type == 'conv2d':
+            ksstr = self._check_dtype(params['kernel_size'], 'kernel_size')
+            sstr = self._check_dtype(params['stride'], 'stride')
+
+            return "Kernal Size: "+ksstr+"\nFilters: "+str(params['filters'])+"\nPadding: "+str(params['padding']).capitalize()+"\nStride: "+sstr
+        elif layer_type == 'maxpool2d':
+            return "Max Pooling\nPool Size: "+self._check_dtype(params['pool_size'], 'pool_size')
+        elif layer_type == 'avgpool2d':
+            return "Avg Pooling\nPool Size: "+self._check_dtype(params['pool_size'], 'pool_size')
+        elif layer_type == 'flatten':
+            return 'Flatten'
+
+        return ''
+
+    def _update_meta_data(self, layer_type:str, nodes, params:dict)->str:
         # Update the meta data of the network
 
-        if layer_type.lower() in ['dense', 'linear']:
-            self.layer_units_.append(nodes)
-        elif layer_type.lower() in self.spatial_layers:
-            self.layer_units_.append(1)
+        code = TYPE_CODES[layer_type]
+        prefix = NAME_PREFIXES[code]
 
         if self.layers_ == 0:
-            layer_name = layer_type.capitalize()+'_input'
+            layer_name = '%s_input' % prefix
         else:
-            if layer_type.lower() in ['dense', 'conv2d']:
-                layer_name = layer_type.capitalize()+'_hidden'+str(self.layers_ - self.nontrain_layers_)
+            if code == DENSE or code == CONV2D:
+                layer_name = '%s_hidden%d' % (prefix, self.layers_ - self.nontrain_layers_)
             else:
                 self.nontrain_layers_ = self.nontrain_layers_ + 1
 
-                layer_name = layer_type.capitalize()+'_'+str(self.nontrain_layers_)
+                layer_name = '%s_%d' % (prefix, self.nontrain_layers_)
 
-        self.layer_names_.append(layer_name)
-        self.layer_types_.append(layer_type)
+        units = nodes if IS_DENSE[code] else 1
+        self.layer_table_.append(layer_name, layer_type, units, params)
         self.layers_ = self.layers_ + 1
 
         return layer_name
 
-    def add_layer(self, layer_type:str, nodes=10, filters=32, kernel_size=3, padding='valid', stride=1, pool_size=2)->None:
+    @_synchronized
+    def add_layer(self, layer_type:str, nodes=10, filters=32, kernel_size=3, padding='valid', stride=1, pool_size=2, weights=None, inputs=None)->None:
         """Adds a layer to the network
 
         Parameters
@@ -180,6 +435,12 @@ class visualizer():
             Stride of the Convolution window, an integer or tuple/list of 2 integers, only if layer_type == 'conv2d'. Default is 1
         pool_size : int, tuple, optional
             Size of the Maxpooling layer, an integer or tuple of 2 integers only if layer_type in ['maxpool2d', 'avgpool2d']. Default is 2
+        weights : array-like, optional
+            Weight matrix of shape (inputs, nodes), only if layer_type in ['dense', 'linear'], used by the 'topk' edges.
+            Nested lists are turned into a numpy array. Default is None
+        inputs : list, optional
+            Names or indices of the layers feeding this one, which must be already added, for residual,
+            multi-branch or multi-input networks. An empty list starts a new input. Default is None, the previous layer
 
         Raises
         ------
@@ -191,108 +452,397 @@ class visualizer():
             When the layer_type is not implemented
         """
 
+        timer = self.timer
+        if timer is not None:
+            start = timer.start()
+
         if self.from_tensorflow_called_:
             raise CannotCreateModel("Network was already created from the tensorflow model object")
     
         if self.from_torch_called_:
             raise CannotCreateModel("Network was already created from the pytorch model object")
 
+        if self.from_onnx_called_:
+            raise CannotCreateModel("Network was already created from the onnx model file")
+
         if layer_type not in self.possible_layers:
-            raise NotAValidOption(layer_type, self.possible_layers)
-
-        layer_name = self._update_meta_data(layer_type, nodes)
-        color = self.color_encoding.get(self.layer_types_[-1], 'black')
-
-        if self.layer_types_[-1] == 'dense' or self.layer_types_[-1] == 'linear':
-            with self.network_.subgraph(name='cluster_{}'.format(layer_name)) as layer:
-                # update label so that title doesn't print multiple times
-                layer.graph_attr.update(dict(label=""))
-
-                if nodes > 10:
-                    layer.attr(labeljust='right', labelloc='bottom', label='+'+str(nodes - 10))
-                    nodes = 10
-
-                for i in range(nodes):
-                    if self.layers_ == 1:
-                        color = self.color_encoding['input']
-                    else:
-                        color = self.color_encoding['hidden']
-                    layer.node('{}_{}'.format(layer_name, i), shape='point', style='filled', fillcolor=color)
-        elif self.layer_types_[-1] == 'conv2d':
-            ksstr = self._check_dtype(kernel_size, 'kernel_size')
-            sstr = self._check_dtype(stride, 'stride')
-
-            content = "Kernal Size: "+ksstr+"\nFilters: "+str(filters)+"\nPadding: "+str(padding).capitalize()+"\nStride: "+sstr
-
-            with self.network_.subgraph(node_attr=dict(shape='box3d')) as layer:
-                layer.node(name=self.layer_names_[-1], label=content, height='1.5', width='1.5', style='filled', fillcolor=color)
-        elif self.layer_types_[-1] == 'maxpool2d':
-            pstr = self._check_dtype(pool_size, 'pool_size')
-            content = "Max Pooling\nPool Size: "+pstr
-
-            with self.network_.subgraph(node_attr=dict(shape='ellipse')) as layer:
-                layer.node(name=self.layer_names_[-1], label=content, height='2', width='0.5', style='filled', fillcolor=color)
-        elif self.layer_types_[-1] == 'avgpool2d':
-            pstr = self._check_dtype(pool_size, 'pool_size')
-            content = "Avg Pooling\nPool Size: "+pstr
-
-            with self.network_.subgraph(node_attr=dict(shape='ellipse')) as layer:
-                layer.node(name=self.layer_names_[-1], label=content, height='2', width='0.5', style='filled', fillcolor=color)
-        elif self.layer_types_[-1] == 'flatten':
-            with self.network_.subgraph(node_attr=dict(shape='rectangle')) as layer:
-                layer.node(name=self.layer_names_[-1], label='Flatten', height='4.5', width='0.5', style='filled', fillcolor=color)
+            raise NotAValidOption(layer_type, list(self.possible_layers))
+
+        idx = self.layers_
+        chained = [idx - 1] if idx > 0 else []
+        if inputs is None:
+            inputs = chained
+        else:
+            inputs = list(dict.fromkeys(self._input_index(ref, idx) for ref in inputs))
+
+        if weights is not None and layer_type in ['dense', 'linear']:
+            try:
+                weights = as_matrix(weights)
+            except ValueError:
+                raise CannotCreateModel("The weights of a layer should be a matrix, nested lists of rows of the same length")
+            if len(weights.shape) != 2 or weights.shape[1] != nodes:
+                raise CannotCreateModel("The weights of a layer of "+str(nodes)+" nodes should be of shape (inputs, "+str(nodes)+"), got "+str(tuple(weights.shape)))
+
+        if layer_type == 'conv2d':
+            params = dict(filters=filters, kernel_size=kernel_size, padding=padding, stride=stride)
+        elif layer_type in ['maxpool2d', 'avgpool2d']:
+            params = dict(pool_size=pool_size)
+        else:
+            params = dict()
+
+        if layer_type in self.spatial_layers:
+            # Raises the TypeError of invalid parameters before the layer is added
+            self._label(layer_type, params)
+
+        self._update_meta_data(layer_type, nodes, params)
+
+        # the inputs are always added before, so the index order is a topological order of the graph
+        if inputs != chained:
+            self._chain_ = False
+        self._in_degree_.append(len(inputs))
+        self._out_degree_.append(0)
+        for j in inputs:
+            self._edge_sources_.append(j)
+            self._edge_targets_.append(idx)
+            self._out_degree_[j] = self._out_degree_[j] + 1
+
+        if weights is not None and layer_type in ['dense', 'linear']:
+            self.layer_weights_[self.layers_ - 1] = weights
+
+        if timer is not None:
+            timer.stop('add_layer', start, layer_type=layer_type)
 
         return
 
-    def _connect_layers(self, l1_nodes, l2_nodes, l1_idx, l2_idx):
-        # Connect all the nodes between the two layers
-
-        for l1 in range(l1_nodes):
-            for l2 in range(l2_nodes):
-                if self.layer_types_[l1_idx] in ['dense', 'linear'] and self.layer_types_[l2_idx] in ['dense', 'linear']:
-                    n1 = self.layer_names_[l1_idx]+'_'+str(l1)
-                    n2 = self.layer_names_[l2_idx]+'_'+str(l2)
-                elif self.layer_types_[l1_idx] in ['dense', 'linear'] and self.layer_types_[l2_idx] in self.spatial_layers:
-                    n1 = self.layer_names_[l1_idx]+'_'+str(l1)
-                    n2 = self.layer_names_[l2_idx]
-                elif self.layer_types_[l1_idx] in self.spatial_layers and self.layer_types_[l2_idx] in ['dense', 'linear']:
-                    n1 = self.layer_names_[l1_idx]
-                    n2 = self.layer_names_[l2_idx]+'_'+str(l2)
-                elif self.layer_types_[l1_idx] in self.spatial_layers and self.layer_types_[l2_idx] in self.spatial_layers:
-                    n1 = self.layer_names_[l1_idx]
-                    n2 = self.layer_names_[l2_idx]
-
-                self.network_.edge(n1, n2)
+    def _input_index(self, ref, idx)->int:
+        # Index of an input of the layer at the given index, from its name or index
+
+        if isinstance(ref, str):
+            try:
+                return self.layer_table_.index(ref)
+            except KeyError:
+                raise CannotCreateModel("There is no layer named "+ref+" to connect from")
+
+        if not 0 <= ref < idx:
+            raise CannotCreateModel("The inputs of a layer should be added before it, got the layer "+str(ref)+" for the layer "+str(idx))
+
+        return ref
+
+    def _subgraph_lines(self, layer)->list:
+        # DOT lines of a subgraph, the same as the ones network_.subgraph() adds to the body
+
+        return ['\t'+line for line in layer.__iter__(subgraph=True)]
+
+    def _layer_fragment(self, idx)->list:
+        # DOT lines of the nodes of the layer at the given index, from the template of the layers which look the same
+
+        table = self.layer_table_
+        annotation = self._cost_label(idx)
+
+        if table.is_dense(idx):
+            role = 'input' if self._in_degree_[idx] == 0 else 'hidden'
+            color = self._heat_fill(idx) or self.color_encoding[role]
+            key = ('layer', table.type_codes[idx], table.units[idx], self.max_nodes, color, annotation)
+        else:
+            color = self._heat_fill(idx) or self.color_encoding.get(table.type(idx), 'black')
+            key = ('layer', self._params_key(idx), color, annotation)
+
+        template = TEMPLATES.get(key, lambda: self._layer_template(idx, color, annotation))
+        name = table.names[idx]
+
+        return [line.replace(PLACEHOLDER, name) for line in template]
+
+    def _layer_template(self, idx, color, annotation)->tuple:
+        # DOT lines of the nodes of the layer at the given index, named PLACEHOLDER
+
+        import graphviz as gv
+
+        table = self.layer_table_
+        layer_type = table.type(idx)
+        extra = dict(xlabel=annotation) if annotation else dict()
+
+        if table.is_dense(idx):
+            layer = gv.Graph(name='cluster_{}'.format(PLACEHOLDER))
+            # update label so that title doesn't print multiple times
+            layer.graph_attr.update(dict(label=""))
+
+            drawn = self._drawn_units(idx)
+            hidden = table.units[idx] - len(drawn)
+            if annotation:
+                label = ('+'+str(hidden)+'\n' if hidden > 0 else '')+annotation
+                layer.attr(labeljust='right', labelloc='bottom', label=label)
+            elif hidden > 0:
+                layer.attr(labeljust='right', labelloc='bottom', label='+'+str(hidden))
+
+            for i in drawn:
+                layer.node('%s_%d' % (PLACEHOLDER, i), shape='point', style='filled', fillcolor=color)
+        elif layer_type == 'conv2d':
+            layer = gv.Graph(node_attr=dict(shape='box3d'))
+            layer.node(name=PLACEHOLDER, label=self._layer_label(idx), height='1.5', width='1.5', style='filled', fillcolor=color, **extra)
+        elif layer_type in ['maxpool2d', 'avgpool2d']:
+            layer = gv.Graph(node_attr=dict(shape='ellipse'))
+            layer.node(name=PLACEHOLDER, label=self._layer_label(idx), height='2', width='0.5', style='filled', fillcolor=color, **extra)
+        elif layer_type == 'flatten':
+            layer = gv.Graph(node_attr=dict(shape='rectangle'))
+            layer.node(name=PLACEHOLDER, label='Flatten', height='4.5', width='0.5', style='filled', fillcolor=color, **extra)
+
+        return tuple(self._subgraph_lines(layer))
+
+    def _cost_label(self, idx)->str:
+        # Annotation with the cost of the layer at the given index, empty when the costs are not annotated
+
+        if self.costs_ is None:
+            return ''
+
+        cost = self.costs_[idx]
+
+        return (format_shape(cost.output_shape)+"\n"+format_count(cost.params)+" params\n"
+                +format_count(cost.macs)+" MACs\n"+format_bytes(cost.activation_bytes))
+
+    def _refresh_costs(self)->None:
+        # New layers change the costs, and the scale of the heatmap
+
+        if self.cost_options_ is not None and len(self.costs_) != self.layers_:
+            self.annotate_costs(**self.cost_options_)
 
         return
 
-    def _build_network(self):
-        # Connect all the adjacent layers in the network
+    def _heat_fill(self, idx):
+        # Heat color of the layer at the given index, None when there is no heatmap
+
+        if self.costs_ is None or self.cost_options_['heatmap'] is None:
+            return None
+
+        field = self.cost_options_['heatmap']
+
+        return heat_color(getattr(self.costs_[idx], field), self._heat_max_)
+
+    def _output_fragment(self, idx)->list:
+        # DOT lines updating the color of the output dense layer, at the given index, to red
+
+        table = self.layer_table_
+        if not table.is_dense(idx) or self._heat_fill(idx) is not None:
+            return []
+
+        color = self.color_encoding['output']
+        template = TEMPLATES.get(('output', table.units[idx], self.max_nodes, color), lambda: self._output_template(idx, color))
+        name = table.names[idx]
+
+        return [line.replace(PLACEHOLDER, name) for line in template]
+
+    def _output_template(self, idx, color)->tuple:
+        # DOT lines of the output coloring of the dense layer at the given index, named PLACEHOLDER
+
+        import graphviz as gv
+
+        layer = gv.Graph(name='cluster_{}'.format(PLACEHOLDER))
+        for i in self._drawn_units(idx):
+            layer.node('%s_%d' % (PLACEHOLDER, i), style='filled', fillcolor=color)
+
+        return tuple(self._subgraph_lines(layer))
+
+    def _drawn_units(self, idx):
+        # Indices of the units drawn for the dense layer at the given index, spread evenly over the units of a wide layer
+
+        units = self.layer_table_.units[idx]
+        cap = self.max_nodes
+        if units <= cap:
+            return range(units)
+        if cap == 1:
+            return [0]
+
+        return [(i * (units - 1)) // (cap - 1) for i in range(cap)]
+
+    def _node_ids(self, idx)->list:
+        # DOT node ids drawn for the layer at the given index, the generated layer names never need quoting
+
+        table = self.layer_table_
+        if table.is_dense(idx):
+            return ['%s_%d' % (table.names[idx], i) for i in self._drawn_units(idx)]
+
+        return [table.names[idx]]
+
+    def _selected_edges(self, l1_idx, l2_idx):
+        # (tail, head, strength) of the connections drawn with the 'topk' edges, None when all the nodes are connected
 
-        for i in range(self.layers_ - 1):
-            nodes1 = self.layer_units_[i]
-            nodes2 = self.layer_units_[i+1]
+        if self.edges != 'topk' or l2_idx not in self.layer_weights_:
+            return None
+        # the weights are read only when l1 is the single layer feeding l2, not across a folded run
+        if self._in_degree_[l2_idx] != 1 or (self._chain_ and l2_idx != l1_idx + 1):
+            return None
 
-            if self.layer_units_[i] > 10:
-                nodes1 = 10
-            if self.layer_units_[i+1] > 10:
-                nodes2 = 10
+        table = self.layer_table_
+        weights = self.layer_weights_[l2_idx]
+        if not table.is_dense(l1_idx) or tuple(weights.shape) != (table.units[l1_idx], table.units[l2_idx]):
+            # the inputs of the layer are not the nodes of the layer feeding it
+            return None
 
-            self._connect_layers(nodes1, nodes2, i, i+1)
+        return top_edges(weights, self._drawn_units(l1_idx), self._drawn_units(l2_idx), self.top_k)
 
-        if self.layer_types_[-1] in ['dense', 'linear']:
-            # Updating the color of output dense layer to red
+    def _connect_layers(self, l1_idx, l2_idx)->list:
+        # DOT lines connecting all the nodes between the two layers.
+        # The node ids are computed once per layer and all the edges of the pair are written as a single chunk.
 
-            nodes = ((self.layer_units_[-1] > 10) and 10) or self.layer_units_[-1]
-            with self.network_.subgraph(name='cluster_{}'.format(self.layer_names_[-1])) as layer:
-                for i in range(nodes):
-                    layer.node('{}_{}'.format(self.layer_names_[-1], i), style='filled', fillcolor='red')
+        selected = self._selected_edges(l1_idx, l2_idx)
+        if selected is not None:
+            tails, heads = self._node_ids(l1_idx), self._node_ids(l2_idx)
+            edges = ['\t%s -- %s [%s]\n' % (tails[t], heads[h], edge_style(strength)) for t, h, strength in selected]
+
+            return [''.join(edges)]
+
+        heads = [' -- %s\n' % head for head in self._node_ids(l2_idx)]
+        edges = ['\t'+tail+head for tail in self._node_ids(l1_idx) for head in heads]
+
+        return [''.join(edges)]
+
+    @_synchronized
+    def _build_network(self):
+        # Build network_, timed as the 'build' stage when there is a timer
+
+        timer = self.timer
+        if timer is None:
+            return self._build_body()
+
+        start = timer.start()
+        self._build_body()
+        timer.stop('build', start, layers=self.layers_)
 
         return
 
+    def _build_body(self):
+        # Emit the nodes of the new and restyled layers and the edges of the new connections, in the
+        # order they were added. Calling it again without any change leaves network_ as it is.
+
+        self._refresh_costs()
+
+        restyled = False
+        for i in self._dirty_layers_:
+            if i < len(self._node_fragments_):
+                self._node_fragments_[i] = self._layer_fragment(i)
+                restyled = True
+        self._dirty_layers_.clear()
+
+        for i in range(len(self._node_fragments_), self.layers_):
+            self._node_fragments_.append(self._layer_fragment(i))
+
+        sources, targets = self._edge_sources_, self._edge_targets_
+        for e in range(len(self._edge_fragments_), len(sources)):
+            self._edge_fragments_.append(self._connect_layers(sources[e], targets[e]))
+
+        body = self.network_.body
+
+        if self.fold and self._chain_:
+            # The runs depend on the whole sequence, so the body is assembled again from the cached fragments
+            body[:] = self._folded_body()
+            self._output_fragment_ = list()
+            self._built_layers_ = self.layers_
+            self._built_edges_ = len(sources)
+            self._built_folded_ = True
+            return
+
+        output = [line for i in self._sinks() for line in self._output_fragment(i)]
+
+        if restyled or self._built_folded_:
+            # a restyled layer, or a folded body which is not folded any more since a connection made it a graph
+            body[:] = [line for fragment in self._node_fragments_ for line in fragment]
+            self._node_lines_ = len(body)
+            for fragment in self._edge_fragments_:
+                body.extend(fragment)
+        else:
+            # Only add what is new, after dropping the output coloring of the previous build. The new
+            # nodes go after the previous ones and before the edges, in the order of a fresh build
+            del body[len(body) - len(self._output_fragment_):]
+            nodes = [line for i in range(self._built_layers_, self.layers_) for line in self._node_fragments_[i]]
+            body[self._node_lines_:self._node_lines_] = nodes
+            self._node_lines_ = self._node_lines_ + len(nodes)
+            for e in range(self._built_edges_, len(sources)):
+                body.extend(self._edge_fragments_[e])
+
+        body.extend(output)
+        self._output_fragment_ = output
+        self._built_layers_ = self.layers_
+        self._built_edges_ = len(sources)
+        self._built_folded_ = False
+
+        return
+
+    def _sinks(self)->list:
+        # Indices of the layers feeding no other layer, the outputs of the network
+
+        if self._chain_:
+            return [self.layers_ - 1] if self.layers_ else []
+
+        return [i for i, degree in enumerate(self._out_degree_) if degree == 0]
+
+    def _edge_pairs(self)->list:
+        # (tail, head) of every connection drawn, between the visible layers when the network is folded
+
+        if self._chain_:
+            visible = visible_layers(self._runs())
+            return list(zip(visible, visible[1:]))
+
+        return list(zip(self._edge_sources_, self._edge_targets_))
+
+    def _first_inputs(self):
+        # Index of the first layer feeding every layer, None for the inputs, or None for a chain
+
+        if self._chain_:
+            return None
+
+        graph = self.layer_graph_
+        offsets, sources = graph.reverse_offsets, graph.sources
+
+        return [sources[offsets[i]] if offsets[i] < offsets[i + 1] else None for i in range(self.layers_)]
+
+    def _runs(self)->list:
+        # Runs of repeated layers when folding, otherwise a run per layer.
+        # Only a chain is folded, the repeats of a graph are not found from the layer order alone.
+
+        if not self.fold or not self._chain_:
+            return [Run(i, 1, 1) for i in range(self.layers_)]
+
+        return find_runs(layer_signatures(self.layer_table_))
+
+    def _folded_body(self)->list:
+        # DOT lines of the network with the first copy of every repeated run, in a cluster labeled with its count
+
+        import graphviz as gv
+
+        runs = self._runs()
+        body = list()
+
+        for run in runs:
+            copy = range(run.start, run.start + run.period)
+            if run.count == 1:
+                for i in copy:
+                    body.extend(self._node_fragments_[i])
+                continue
+
+            block = gv.Graph(name='cluster_repeat_{}'.format(run.start), graph_attr=dict(label='× '+str(run.count), style='dashed', color='black'))
+            # reset the attributes, so that the clusters of the dense layers inside are not drawn
+            inner = gv.Graph(graph_attr=dict(label='', style='solid', color='white'))
+            for i in copy:
+                inner.body.extend(self._node_fragments_[i])
+            block.subgraph(inner)
+            body.extend(self._subgraph_lines(block))
+
+        visible = visible_layers(runs)
+        for i, j in zip(visible, visible[1:]):
+            if j == i + 1:
+                body.extend(self._edge_fragments_[i])
+            else:
+                body.extend(self._connect_layers(i, j))
+
+        body.extend(self._output_fragment(visible[-1]))
+
+        return body
+
     def from_pytorch(self, model):
         """Converts a given PyTorch model into graph
 
+        The forward pass is traced with torch.fx, so residual and multi-branch models are drawn with
+        their connections. A model which cannot be traced is drawn as the chain of its modules
+
         Parameters
         ----------
         model : torch.nn.modules.container.Sequential
@@ -307,69 +857,120 @@ class visualizer():
         if self.from_torch_called_ == True:
             raise ValueError("The model has already been initialised, with a PyTorch model")
 
-        layers = model.modules() # Returns a generator object
-        split = str.split
+        self.from_adapter('pytorch', model)
+        self.from_torch_called_ = True
 
-        for layer in layers:
-            layer_name = split(str(type(layer)),"'")[1] # Returns string like torch.nn.modules.container.Sequential/layer
-            layer_name = split(layer_name,'.')[-1].lower() # Splitting by . gives us name of layer
+        return
 
-            if layer_name not in self.possible_layers:  # Skip specific activation layers
-                continue
+    def from_tensorflow(self, model):
+        """Converts a given TensorFlow model into graph
 
-            self.add_layer(**self._create_dict(layer,layer_name))
+        The layers of a functional model are connected as in its config, the layers of a
+        Sequential model are chained
 
-        self.from_torch_called_ = True
+        Parameters
+        ----------
+        model : tensorflow.python.keras.engine.sequential.Sequential
+            A tensorflow model
+        """
+
+        self.from_adapter('tensorflow', model)
+        self.from_tensorflow_called_ = True
 
         return
 
-    def _create_dict(self, layer, layer_name):
-        # creates a parameter dict of layer
+    def from_keras_file(self, path:str):
+        """Converts a saved keras model into graph, without importing tensorflow
 
-        params = {}
+        Only the model config is read from the file, the weights are never loaded
 
-        params['layer_type'] = layer_name
+        Parameters
+        ----------
+        path : str
+            Path of a .keras archive or of a .h5 file, the latter needs h5py
 
-        if layer_name == 'conv2d':
-            params['kernel_size'] = layer.kernel_size
-            params['filters'] = layer.out_channels
-            params['stride'] = layer.stride
-            params['padding'] = layer.padding
-        elif layer_name in ['maxpool2d', 'avgpool2d']:
-            params['pool_size'] = layer.kernel_size
-        elif layer_name == 'linear':
-            params['layer_type'] = 'dense'
-            params['nodes'] = layer.out_features
+        Raises
+        ------
+        ValueError
+            When the file has no model config
+        """
 
-        return params
+        self.from_adapter('keras_file', path)
+        self.from_tensorflow_called_ = True
 
-    def from_tensorflow(self, model):
-        """Converts a given TensorFlow model into graph
+        return
+
+    def from_onnx(self, path:str):
+        """Converts an onnx model into graph, without the onnx package
+
+        The file is memory-mapped and only the graph nodes and the initializer dims are read,
+        the weights are never loaded.
+
+        Gemm/MatMul are drawn as dense, Conv as conv2d, MaxPool as maxpool2d,
+        AveragePool as avgpool2d and Flatten as flatten layers. A Gemm/MatMul whose
+        weight is computed in the graph is skipped, its width is unknown
 
         Parameters
         ----------
-        model : tensorflow.python.keras.engine.sequential.Sequential
-            A tensorflow model
+        path : str
+            Path of an .onnx file
+
+        Raises
+        ------
+        ValueError
+            When the file is not an onnx model
         """
 
-        layers = model.get_config()['layers']
-        for layer in layers:
-            layer_params = layer['config']
-            if layer['class_name'] == 'Dense':
-                self.add_layer('dense', nodes=layer_params['units'])
-            elif layer['class_name'] == 'Conv2D':
-                self.add_layer('conv2d', filters=layer_params['filters'], kernel_size=layer_params['kernel_size'], stride=layer_params['strides'], padding=layer_params['padding'])
-            elif layer['class_name'] == 'MaxPooling2D':
-                self.add_layer('maxpool2d', pool_size=layer_params['pool_size'])
-            elif layer['class_name'] == 'AveragePooling2D':
-                self.add_layer('avgpool2d', pool_size=layer_params['pool_size'])
-            elif layer['class_name'] == 'Flatten':
-                self.add_layer('flatten')
+        self.from_adapter('onnx', path)
+        self.from_onnx_called_ = True
 
-        self.from_tensorflow_called_ = True
+        return
+
+    @_synchronized
+    def from_adapter(self, name:str, model):
+        """Converts a model into graph with a registered framework adapter
+
+        The adapter, and the framework it needs, is imported only on its first use
+
+        Parameters
+        ----------
+        name : str
+            Name of the adapter, such as 'pytorch', 'tensorflow', 'keras_config'
+        model : object
+            The model, in the form the adapter expects
+
+        Raises
+        ------
+        KeyError
+            When there is no adapter with that name
+        """
+
+        timer = self.timer
+        if timer is not None:
+            start = timer.start()
+            layers = self.layers_
+
+        base = self.layers_
+        for params in get_adapter(name)(model):
+            self.add_layer(**self._shift_inputs(params, base))
+        # the first layers of a converted model are weighted layers, not the input nodes
+        self._converted_ = True
+
+        if timer is not None:
+            timer.stop('convert', start, adapter=name, layers=self.layers_ - layers)
 
         return
 
+    def _shift_inputs(self, params:dict, base:int)->dict:
+        # add_layer() arguments of a layer given by an adapter, which gives the inputs as positions in
+        # the layers it yields, the first one being added at the index base
+
+        if params.get('inputs') is None:
+            return params
+
+        return dict(params, inputs=[ref if isinstance(ref, str) else base + ref for ref in params['inputs']])
+
+    @_synchronized
     def set_color_encoding(self, encoding):
         """Set Custom Color Encoding to the layers
 
@@ -387,12 +988,25 @@ class visualizer():
         if not isinstance(encoding, dict):
             raise ValueError("Expected a dict, but got {}".format(type(encoding)))
 
-        for k, _ in encoding:
-            if self.color_encoding.get(k, False):
-                self.color_encoding[k] = encoding[k]
+        # the shared encoding is never changed, the visualizer gets its own copy
+        colors = dict(self.color_encoding)
+        for k, v in encoding.items():
+            if colors.get(k, False) and colors[k] != v:
+                colors[k] = v
+
+                # Only the layers drawn with this color have to be emitted again
+                for i, layer_type in enumerate(self.layer_table_.types()):
+                    if self.layer_table_.is_dense(i):
+                        if (k == 'input' and self._in_degree_[i] == 0) or (k == 'hidden' and self._in_degree_[i] > 0):
+                            self._dirty_layers_.add(i)
+                    elif layer_type == k:
+                        self._dirty_layers_.add(i)
+
+        self.color_encoding = MappingProxyType(colors)
 
         return
 
+    @_synchronized
     def get_meta_data(self):
         """Give a dictionary which contains meta data of the network.
 
@@ -411,40 +1025,914 @@ class visualizer():
 
         return meta_data
 
-    def summarize(self):
+    @_synchronized
+    def save(self, path:str)->int:
+        """Writes the network to a snapshot file
+
+        The layer table, the connections, the title, the orientation, the color encoding and the
+        options of the visualizer are written in a compact versioned binary format, see snapshot.py.
+        The weights of the layers are not written, so the 'topk' edges are drawn as 'all' after a load
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file, such as 'model.nnviz'
+
+        Returns
+        -------
+        size : int
+            Number of bytes written
+        """
+
+        from .snapshot import write_snapshot
+
+        table = self.layer_table_
+        meta = dict(title=self.title, filename=self.filename, file_type=self.file_type, orientation=self.orient_,
+                    engine=self.engine, fold=self.fold, edges=self.edges, top_k=self.top_k, max_nodes=self.max_nodes,
+                    color_encoding=dict(self.color_encoding), cost_options=self.cost_options_, converted=self._converted_,
+                    nontrain_layers=self.nontrain_layers_, names=table.names, params=table.params)
+
+        return write_snapshot(path, table.type_codes, table.units, self._edge_sources_, self._edge_targets_, meta)
+
+    @classmethod
+    def load(cls, path:str, **options):
+        """Makes a network from a snapshot file written by save()
+
+        The file is memory-mapped and no framework is imported, so a diagram can be drawn again
+        from a stored snapshot, with the same or a new style
+
+        Parameters
+        ----------
+        path : str
+            Path of the snapshot file
+        **options
+            Arguments of the visualizer overriding the saved ones, such as file_type, engine, cache or timer
+
+        Returns
+        -------
+        network : visualizer
+            The network, with the saved layers, connections, style and cost annotations
+
+        Raises
+        ------
+        ValueError
+            When the file is not a snapshot, or is corrupted
+
+        Examples
+        --------
+        >>> network.from_pytorch(model)
+        >>> network.save('model.nnviz')
+        >>>
+        >>> nnviz.visualizer.load('model.nnviz', file_type='svg', orientation='TB').render()
+        './graphs/neuralnet.svg'
+        """
+
+        from .snapshot import read_snapshot
+
+        snapshot = read_snapshot(path)
+        meta = snapshot['meta']
+        type_codes, units = snapshot['type_codes'], snapshot['units']
+        sources, targets = snapshot['sources'], snapshot['targets']
+        n = len(type_codes)
+
+        if len(meta['names']) != n or len(meta['params']) != n or any(code >= len(LAYER_TYPES) for code in type_codes):
+            raise ValueError(path+" is a corrupted network snapshot, its layers do not match")
+        if any(not 0 <= u < v < n for u, v in zip(sources, targets)):
+            raise ValueError(path+" is a corrupted network snapshot, its connections do not match the layers")
+
+        file_type = meta['file_type']
+        kwargs = dict(title=meta['title'], filename=meta['filename'], file_type='png' if file_type == 'pdf' else file_type,
+                      savepdf=file_type == 'pdf' and 'file_type' not in options, orientation=meta['orientation'], engine=meta['engine'], fold=meta['fold'],
+                      edges=meta['edges'], top_k=meta['top_k'], max_nodes=meta['max_nodes'])
+        kwargs.update(options)
+
+        network = cls(**kwargs)
+        network.set_color_encoding(meta['color_encoding'])
+        network.layer_table_ = LayerTable.from_columns(meta['names'], type_codes, units, meta['params'])
+        network.layers_ = n
+        network.nontrain_layers_ = meta['nontrain_layers']
+        network._converted_ = meta.get('converted', False)
+
+        network._edge_sources_ = sources
+        network._edge_targets_ = targets
+        network._in_degree_ = array('q', bytes(8 * n))
+        network._out_degree_ = array('q', bytes(8 * n))
+        for u, v in zip(sources, targets):
+            network._in_degree_[v] = network._in_degree_[v] + 1
+            network._out_degree_[u] = network._out_degree_[u] + 1
+        network._chain_ = len(sources) == max(n - 1, 0) and all(u == e and v == e + 1 for e, (u, v) in enumerate(zip(sources, targets)))
+
+        if meta['cost_options'] is not None:
+            network.annotate_costs(**meta['cost_options'])
+
+        return network
+
+    @_synchronized
+    def stats(self)->dict:
+        """Give the statistics of the network and of its stages
+
+        Returns
+        -------
+        stats : dict
+            'layers', the number of layers, 'nodes' and 'edges', the number of nodes and edges drawn,
+            'dot_bytes', the size of the last DOT source generated (None before the first render), and
+            'stages', the duration and number of calls of every stage when there is a timer (empty otherwise)
+        """
+
+        table = self.layer_table_
+        drawn = {i: len(self._drawn_units(i)) if table.is_dense(i) else 1 for i in visible_layers(self._runs())}
+
+        stats = dict()
+        stats['layers'] = self.layers_
+        stats['nodes'] = sum(drawn.values())
+        stats['edges'] = 0
+        for i, j in self._edge_pairs():
+            selected = self._selected_edges(i, j)
+            stats['edges'] = stats['edges'] + (drawn[i] * drawn[j] if selected is None else len(selected))
+        stats['dot_bytes'] = self._dot_bytes_
+        stats['stages'] = self.timer.stats() if self.timer is not None else dict()
+
+        return stats
+
+    @_synchronized
+    def costs(self, input_shape=None, batch_size=1, dtype='float32')->list:
+        """Computes the output shape, parameters, multiply-accumulates and activation memory of every layer
+
+        Parameters
+        ----------
+        input_shape : tuple, optional
+            Shape of a single input, channels first (channels, height, width), or (features,) for a dense input.
+            Default is None, only for a network built with add_layer() starting with dense layers, which are
+            the inputs and have no parameters. A model converted by from_pytorch, from_tensorflow, from_onnx,
+            etc. needs it
+        batch_size : int, optional
+            Number of inputs processed at once. Default is 1
+        dtype : str, optional
+            Data type of the activations, one of 'float64', 'float32', 'float16', 'bfloat16', 'int32', 'int8', 'uint8'. Default is 'float32'
+
+        Returns
+        -------
+        costs : list
+            LayerCost(output_shape, params, macs, activation_bytes) of every layer, macs and activation_bytes are for the whole batch
+
+        Raises
+        ------
+        CannotCreateModel
+            When a layer cannot be applied on the shape it receives, or the input_shape is needed
+        """
+
+        if input_shape is None and self._converted_:
+            raise CannotCreateModel("The costs of a converted model need its input_shape, its first layers have weights")
+
+        return propagate(self.layer_table_, input_shape, batch_size, dtype, self._first_inputs())
+
+    @_synchronized
+    def annotate_costs(self, input_shape=None, batch_size=1, dtype='float32', heatmap=None)->None:
+        """Annotates every layer of the diagram with its cost
+
+        Parameters
+        ----------
+        input_shape : tuple, optional
+            Shape of a single input, channels first (channels, height, width), or (features,) for a dense input.
+            Default is None, as for costs()
+        batch_size : int, optional
+            Number of inputs processed at once. Default is 1
+        dtype : str, optional
+            Data type of the activations. Default is 'float32'
+        heatmap : str, optional
+            Colors the layers from yellow to red by one of 'params', 'macs', 'activation_bytes'. Default is None, the color encoding is kept
+
+        Raises
+        ------
+        NotAValidOption
+            When the heatmap is not a cost
+        CannotCreateModel
+            When a layer cannot be applied on the shape it receives
+        """
+
+        if heatmap is not None and heatmap not in COST_FIELDS:
+            raise NotAValidOption(heatmap, COST_FIELDS)
+
+        self.costs_ = self.costs(input_shape, batch_size, dtype)
+        self.cost_options_ = dict(input_shape=input_shape, batch_size=batch_size, dtype=dtype, heatmap=heatmap)
+        if heatmap is not None:
+            self._heat_max_ = max(getattr(cost, heatmap) for cost in self.costs_)
+
+        self._dirty_layers_.update(range(self.layers_))
+
+        return
+
+    @_synchronized
+    def summarize(self, input_shape=None, batch_size=1, dtype='float32'):
         """Prints a summary of the network in MySQL tabular format.\nCurrently, we are support tensorflow 
         models.\n We will implement pytorch summarization soon
 
+        When the network is folded, every repeated run is printed once, after a row with its repeat count
+
+        Parameters
+        ----------
+        input_shape : tuple, optional
+            Shape of a single input, when given the output shape, parameters, multiply-accumulates and
+            activation memory of every layer are printed too. Default is None, or the shape given to annotate_costs()
+        batch_size : int, optional
+            Number of inputs processed at once. Default is 1
+        dtype : str, optional
+            Data type of the activations. Default is 'float32'
+
         Raises
         ------
         ValueError
             when the model is not yet created
         """
 
-        if not self.from_torch_called_ and not self.from_tensorflow_called_ and self.layers_ < 2:
-            if not self.from_torch_called_ and not self.from_tensorflow_called_:
+        if not self.from_torch_called_ and not self.from_tensorflow_called_ and not self.from_onnx_called_ and self.layers_ < 2:
+            if not self.from_torch_called_ and not self.from_tensorflow_called_ and not self.from_onnx_called_:
                 raise ValueError('This model has not yet been created. Create the model first by calling `from_pytorch()` or calling `from_tensorflow()`')
             else:
                 raise ValueError('The model has not been built yet or the model is not supported.\n Check the docs for further information')
         
+        costs = None
+        if input_shape is not None:
+            costs = self.costs(input_shape, batch_size, dtype)
+        elif self.cost_options_ is not None:
+            costs = self.costs(self.cost_options_['input_shape'], self.cost_options_['batch_size'], self.cost_options_['dtype'])
+
+        if costs is None:
+            widths = [28, 24, 15]
+            header = ["Layer Name", "Layer Type", "Layer Units"]
+        else:
+            widths = [24, 12, 11, 16, 11, 11, 12]
+            header = ["Layer Name", "Layer Type", "Units", "Output Shape", "Params", "MACs", "Activations"]
+
+        width = sum(widths) + len(widths) - 1
         title = "Neural Network Architecture"
-        hline = "+"+"-"*69+"+"
+        hline = "+"+"-"*width+"+"
 
         print(hline)
-        print("|"+title.center(69)+"|")
+        print("|"+title.center(width)+"|")
         print(hline)
-        print("|"+"Layer Name".center(28)+"|"+"Layer Type".center(24)+"|"+"Layer Units".center(15)+"|")
+        print("|"+"|".join(col.center(w) for col, w in zip(header, widths))+"|")
         print(hline)
-        for i in range(self.layers_):
-            col1 = self.layer_names_[i].center(28)
-            col2 = self.layer_types_[i].capitalize().center(24)
-            col3 = str(self.layer_units_[i]).center(15)
-            print("|"+col1+"|"+col2+"|"+col3+"|")
+        table = self.layer_table_
+        for run in self._runs():
+            if run.count > 1:
+                last = run.start + run.period * run.count - 1
+                print("|"+("× "+str(run.count)+" : "+table.names[run.start]+" to "+table.names[last]).center(width)+"|")
+                print(hline)
+
+            for i in range(run.start, run.start + run.period):
+                cols = [table.names[i], NAME_PREFIXES[table.type_codes[i]], str(table.units[i])]
+                if costs is not None:
+                    cost = costs[i]
+                    cols = cols + [format_shape(cost.output_shape), format_count(cost.params), format_count(cost.macs), format_bytes(cost.activation_bytes)]
+                print("|"+"|".join(col.center(w) for col, w in zip(cols, widths))+"|")
+                print(hline)
+
+        if costs is not None:
+            total = "Total params: "+format_count(sum(cost.params for cost in costs))+"    Total MACs: "+format_count(sum(cost.macs for cost in costs))
+            total = total+"    Activations: "+format_bytes(sum(cost.activation_bytes for cost in costs))
+            print("|"+total.center(width)+"|")
             print(hline)
 
         return
 
-    def visualize(self, give_obj=False):
+    def _source(self)->str:
+        # DOT source of the built network, timed as the 'source' stage when there is a timer
+
+        timer = self.timer
+        if timer is not None:
+            start = timer.start()
+
+        source = self.network_.source
+        self._dot_bytes_ = len(source.encode('utf-8'))
+
+        if timer is not None:
+            timer.stop('source', start, bytes=self._dot_bytes_)
+
+        return source
+
+    def _build_source(self)->str:
+        # Build network_ and give its DOT source, the render itself runs without the lock
+
+        with self._lock:
+            self._build_network()
+            return self._source()
+
+    def _layout(self)->LayeredLayout:
+        # Native layout of the network, which copies all it draws while holding the lock
+
+        with self._lock:
+            return LayeredLayout(self)
+
+    def _header_lines(self)->list:
+        # DOT lines of the graph before its body, the attributes of the graph and of the nodes
+
+        graph = self.network_
+        body, graph.body = graph.body, []
+        try:
+            lines = list(graph)
+        finally:
+            graph.body = body
+
+        # the last line closes the graph
+        return lines[:-1]
+
+    @_synchronized
+    def stream_dot(self, out, layers=()):
+        """Write the DOT source layer by layer, without building the graph in memory
+
+        The layers already added are written first, then every layer of `layers` is added and
+        written right away with the edges from its inputs. Only the compact layer table is
+        kept, so the memory used does not grow with the size of the DOT source. The layers are
+        drawn unfolded and without cost annotations, which both need the whole network.
+
+        Parameters
+        ----------
+        out : str or file-like
+            Path of the DOT file, or a text file-like object such as the stdin of a dot process
+        layers : iterable, optional
+            add_layer() arguments of every layer, as dicts, such as the generator of an adapter. As for an
+            adapter, the integer `inputs` are positions in `layers`. Default is ()
+
+        Returns
+        -------
+        size : int
+            Number of bytes of the DOT source
+
+        Raises
+        ------
+        CannotCreateModel
+            When the network is folded or annotated with its costs, or has less than two layers
+
+        Examples
+        --------
+        >>> from neuralnet_visualize.adapters import get_adapter
+        >>>
+        >>> network = nnviz.visualizer()
+        >>> network.stream_dot('model.gv', get_adapter('onnx')('model.onnx'))
+        """
+
+        if self.fold or self.cost_options_ is not None:
+            raise CannotCreateModel("Streaming writes every layer as it is added, it cannot fold the network or annotate its costs")
+
+        if isinstance(out, str):
+            with open(out, 'w', encoding='utf-8') as f:
+                return self.stream_dot(f, layers)
+
+        timer = self.timer
+        if timer is not None:
+            start = timer.start()
+
+        size = 0
+
+        def write(lines):
+            nonlocal size
+            for line in lines:
+                out.write(line)
+                size = size + len(line.encode('utf-8'))
+
+        write(self._header_lines())
+
+        def added():
+            # indices of the layers to write, the ones already added then the new ones
+            base = self.layers_
+            yield from range(base)
+            for params in layers:
+                self.add_layer(**self._shift_inputs(params, base))
+                yield self.layers_ - 1
+
+        # the connections of a layer are added with it, after the ones of all the previous layers
+        sources, targets = self._edge_sources_, self._edge_targets_
+        e = 0
+        for i in added():
+            write(self._layer_fragment(i))
+            while e < len(sources) and targets[e] <= i:
+                write(self._connect_layers(sources[e], targets[e]))
+                e = e + 1
+
+        if self.layers_ < 2:
+            raise CannotCreateModel("Cannot draw Neural Network, Add atleast two layers to the network")
+
+        for i in self._sinks():
+            write(self._output_fragment(i))
+        write(['}\n'])
+        self._dot_bytes_ = size
+
+        if timer is not None:
+            timer.stop('stream', start, layers=self.layers_, bytes=size)
+
+        return size
+
+    def _tile_source(self, start, end, filename)->str:
+        # DOT source of the layers in [start, end), unfolded, and the connections between them
+
+        graph = self._new_graph(filename, self.title+" : "+self.layer_table_.names[start]+" to "+self.layer_table_.names[end - 1])
+        layer_graph = self.layer_graph_
+
+        for i in range(start, end):
+            graph.body.extend(self._layer_fragment(i))
+        for i in range(start, end):
+            for j in layer_graph.successors(i):
+                if j < end:
+                    graph.body.extend(self._connect_layers(i, j))
+        for i in self._sinks():
+            if start <= i < end:
+                graph.body.extend(self._output_fragment(i))
+
+        return graph.source
+
+    def _overview_source(self, tile_size, tile_files)->str:
+        # DOT source of a node per layer, or per folded run, in a cluster per tile linking to its image
+
+        import graphviz as gv
+
+        table = self.layer_table_
+        graph = self._new_graph(self.filename+'_overview', self.title)
+        graph.node_attr.update(dict(shape='box', style='filled', width='1', height='0.5', fontsize='10'))
+        graph.graph_attr.update(dict(ranksep='0.5'))
+
+        clusters = dict()
+        names = list()
+
+        def cluster(tile):
+            if tile not in clusters:
+                clusters[tile] = gv.Graph(name='cluster_tile_{}'.format(tile), graph_attr=dict(label='Tile '+str(tile), style='dashed', color='black', URL=tile_files[tile]))
+            return clusters[tile]
+
+        for run in self._runs():
+            code = table.type_codes[run.start]
+            if IS_DENSE[code]:
+                role = 'input' if self._in_degree_[run.start] == 0 else 'output' if self._out_degree_[run.start] == 0 else 'hidden'
+                color = self.color_encoding[role]
+            else:
+                color = self.color_encoding.get(table.type(run.start), 'white')
+
+            last = run.start + run.period * run.count - 1
+            if run.count > 1:
+                label = '× '+str(run.count)+'\n'+table.names[run.start]+' to '+table.names[last]
+            else:
+                label = table.names[run.start]+('\n'+str(table.units[run.start])+' units' if IS_DENSE[code] else '')
+
+            tile = run.start // tile_size
+            name = 'b%d' % run.start
+            cluster(tile).node(name, label=label, fillcolor=color, URL=tile_files[tile])
+            names.append(name)
+
+            # the tiles lying wholly inside a folded run get a node of their own, so that every tile is linked
+            for tile in range(tile + 1, last // tile_size + 1):
+                end = min((tile + 1) * tile_size, self.layers_) - 1
+                if end > last:
+                    break
+                name = 't%d' % tile
+                label = table.names[tile * tile_size]+' to '+table.names[end]
+                cluster(tile).node(name, label=label, fillcolor=color, style='filled,dashed', URL=tile_files[tile])
+                names.append(name)
+
+        for tile in sorted(clusters):
+            graph.subgraph(clusters[tile])
+        if self._chain_:
+            for tail, head in zip(names, names[1:]):
+                graph.edge(tail, head)
+        else:
+            for tail, head in zip(self._edge_sources_, self._edge_targets_):
+                graph.edge('b%d' % tail, 'b%d' % head)
+
+        return graph.source
+
+    def export_tiles(self, directory='./graphs', tile_size=50, file_type=None, workers=None)->dict:
+        """Write an overview of the network and detail tiles of fixed layer ranges
+
+        The overview has one node per layer, or per folded run when `fold` is set, grouped by tile
+        and linking to the image of its tile in 'svg'. Every tile draws `tile_size` layers unfolded,
+        with up to `max_nodes` nodes per dense layer. The layout of every tile stays small, and the
+        tiles are rendered in parallel by Graphviz, whatever the engine of the visualizer.
+
+        Parameters
+        ----------
+        directory : str, optional
+            Directory in which the images are written. Default is './graphs'
+        tile_size : int, optional
+            Number of layers of a tile. Default is 50
+        file_type : str, optional
+            Format of the images. Default is the file_type of the visualizer
+        workers : int, optional
+            Number of tiles rendered at once. Default is the number of CPUs
+
+        Returns
+        -------
+        filepaths : dict
+            'overview', the path of the overview image, and 'tiles', the paths of the tile images in order
+
+        Raises
+        ------
+        CannotCreateModel
+            When a model cannot be created under certain conditions
+
+        Examples
+        --------
+        >>> network = nnviz.visualizer(fold=True, max_nodes=6)
+        >>> network.from_onnx('resnet152.onnx')
+        >>> network.export_tiles(tile_size=40, file_type='svg')['overview']
+        './graphs/neuralnet_overview.svg'
+        """
+
+        from concurrent.futures import ThreadPoolExecutor
+        from .backend import render_files
+
+        if self.layers_ < 2:
+            raise CannotCreateModel("Cannot draw Neural Network, Add atleast two layers to the network")
+        if tile_size < 1:
+            raise CannotCreateModel("tile_size should be at least 1")
+
+        file_type = (file_type or self.file_type).lower()
+        os.makedirs(directory, exist_ok=True)
+
+        starts = range(0, self.layers_, tile_size)
+        tiles = [os.path.join(directory, '%s_tile%d.%s' % (self.filename, n, file_type)) for n in range(len(starts))]
+        overview = os.path.join(directory, self.filename+'_overview.'+file_type)
+        engine = self.network_.engine
+
+        with self._lock:
+            jobs = [(self._overview_source(tile_size, [os.path.basename(tile) for tile in tiles]), overview)]
+            for start, tile in zip(starts, tiles):
+                jobs.append((self._tile_source(start, min(start + tile_size, self.layers_), tile), tile))
+
+        # the dot processes run in parallel, the threads only wait for them
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = [executor.submit(render_files, source, [(file_type, filepath)], engine) for source, filepath in jobs]
+
+            for future in futures:
+                future.result()
+
+        return dict(overview=overview, tiles=tiles)
+
+    def _render_cached(self, directory, source)->str:
+        # Render the image through the render cache and write it into the given directory
+
+        from .backend import pipe
+
+        file_type = self.file_type.lower()
+        engine = self.network_.engine
+        # piped from the source, network_ may be built again by another thread meanwhile
+        data = self.cache.fetch(source, file_type, lambda: pipe(source, file_type, engine), engine=engine)
+
+        os.makedirs(directory, exist_ok=True)
+        filepath = os.path.join(directory, self.filename+'.'+file_type)
+        with open(filepath, 'wb') as f:
+            f.write(data)
+
+        return filepath
+
+    def render(self, directory='./graphs')->str:
+        """Render the network into an image file, without opening it
+
+        Parameters
+        ----------
+        directory : str, optional
+            Directory in which the image is written. Default is './graphs'
+
+        Returns
+        -------
+        filepath : str
+            Path of the rendered image
+
+        Raises
+        ------
+        CannotCreateModel
+            When a model cannot be created under certain conditions
+        """
+
+        if self.layers_ < 2:
+            raise CannotCreateModel("Cannot draw Neural Network, Add atleast two layers to the network")
+
+        timer = self.timer
+
+        if self.engine == 'native':
+            if timer is not None:
+                start = timer.start()
+
+            os.makedirs(directory, exist_ok=True)
+            filepath = os.path.join(directory, self.filename+'.'+self.file_type.lower())
+            self._layout().write(filepath, self.file_type.lower())
+
+            if timer is not None:
+                timer.stop('layout', start, file_type=self.file_type.lower())
+
+            return filepath
+
+        import graphviz as gv
+
+        source = self._build_source()
+
+        if timer is not None:
+            start = timer.start()
+
+        if self.cache is not None:
+            hits = self.cache.hits_
+            filepath = self._render_cached(directory, source)
+            cached = self.cache.hits_ > hits
+        else:
+            # The same files as network_.render(), without serializing the source again
+            graph = gv.Source(source, filename=self.network_.filename, directory=directory, format=self.network_.format, engine=self.network_.engine)
+            filepath = graph.render()
+            cached = False
+
+        if timer is not None:
+            timer.stop('render', start, file_type=self.file_type.lower(), cached=cached)
+
+        return filepath
+
+    def render_bytes(self, format=None, out=None):
+        """Render the network in memory, nothing is written to the disk
+
+        The DOT source is piped to the layout process over stdin and the image is read from its stdout,
+        so it can be streamed straight into an HTTP response
+
+        Parameters
+        ----------
+        format : str, optional
+            Format of the image. Default is the file_type of the visualizer
+        out : file-like, optional
+            When given, the image is written to it in chunks, as the layout process produces it. Default is None
+
+        Returns
+        -------
+        data : bytes or int
+            The image, or the number of bytes written when `out` is given
+
+        Raises
+        ------
+        CannotCreateModel
+            When a model cannot be created under certain conditions
+        NotAValidOption
+            When the native engine cannot write the format
+
+        Examples
+        --------
+        >>> network.render_bytes('svg')[:5]
+        b'<?xml'
+        >>> with open('network.png', 'wb') as f:
+        ...     network.render_bytes('png', out=f)
+        """
+
+        from .backend import pipe, write_chunks
+
+        if self.layers_ < 2:
+            raise CannotCreateModel("Cannot draw Neural Network, Add atleast two layers to the network")
+
+        file_type = (format or self.file_type).lower()
+        timer = self.timer
+
+        if self.engine == 'native':
+            if file_type not in self.native_filetypes:
+                raise NotAValidOption(file_type, list(self.native_filetypes))
+
+            if timer is not None:
+                start = timer.start()
+
+            data = self._layout().to_bytes(file_type)
+
+            if timer is not None:
+                timer.stop('layout', start, file_type=file_type)
+
+            return data if out is None else write_chunks(data, out)
+
+        source = self._build_source()
+
+        if timer is not None:
+            start = timer.start()
+
+        if self.cache is not None:
+            hits = self.cache.hits_
+            data = self.cache.fetch(source, file_type, lambda: pipe(source, file_type, self.network_.engine), engine=self.network_.engine)
+            cached = self.cache.hits_ > hits
+            if out is not None:
+                data = write_chunks(data, out)
+        else:
+            data = pipe(source, file_type, self.network_.engine, out)
+            cached = False
+
+        if timer is not None:
+            timer.stop('render', start, file_type=file_type, cached=cached)
+
+        return data
+
+    def export(self, formats=None, directory='./graphs')->dict:
+        """Lay the network out once and write it in many formats
+
+        With the 'dot' engine a single dot process writes all the formats from the same layout,
+        the formats already in the render cache are not rendered again. With the 'native' engine
+        the layout is computed and drawn as SVG once, then converted to every format.
+
+        Parameters
+        ----------
+        formats : list, optional
+            Formats of the images, such as ['png', 'svg', 'pdf']. Default is ['png', 'svg', 'pdf']
+        directory : str, optional
+            Directory in which the images are written. Default is './graphs'
+
+        Returns
+        -------
+        filepaths : dict
+            Path of the image of every format
+
+        Raises
+        ------
+        CannotCreateModel
+            When a model cannot be created under certain conditions
+        NotAValidOption
+            When a format is not supported by the engine
+
+        Examples
+        --------
+        >>> network.export(['png', 'svg', 'pdf'])
+        {'png': './graphs/neuralnet.png', 'svg': './graphs/neuralnet.svg', 'pdf': './graphs/neuralnet.pdf'}
+        """
+
+        from .backend import render_files
+
+        if self.layers_ < 2:
+            raise CannotCreateModel("Cannot draw Neural Network, Add atleast two layers to the network")
+
+        formats = [file_type.lower() for file_type in (formats or ['png', 'svg', 'pdf'])]
+        possible = list(self.native_filetypes) if self.engine == 'native' else list(self.possible_filetypes) + ['pdf']
+        for file_type in formats:
+            if file_type not in possible:
+                raise NotAValidOption(file_type, possible)
+
+        os.makedirs(directory, exist_ok=True)
+        filepaths = {file_type: os.path.join(directory, self.filename+'.'+file_type) for file_type in formats}
+        timer = self.timer
+
+        if self.engine == 'native':
+            if timer is not None:
+                start = timer.start()
+
+            self._layout().write_many(list(filepaths.items()))
+
+            if timer is not None:
+                timer.stop('layout', start, file_type=','.join(formats))
+
+            return filepaths
+
+        source = self._build_source()
+        engine = self.network_.engine
+
+        if timer is not None:
+            start = timer.start()
+
+        missing = list(filepaths.items())
+        if self.cache is not None:
+            missing = list()
+            for file_type, filepath in filepaths.items():
+                data = self.cache.get(self.cache.key(source, file_type, engine), file_type)
+                if data is None:
+                    missing.append((file_type, filepath))
+                    continue
+                with open(filepath, 'wb') as f:
+                    f.write(data)
+
+        if missing:
+            render_files(source, missing, engine)
+
+            if self.cache is not None:
+                for file_type, filepath in missing:
+                    with open(filepath, 'rb') as f:
+                        self.cache.put(self.cache.key(source, file_type, engine), file_type, f.read())
+
+        if timer is not None:
+            timer.stop('render', start, file_type=','.join(formats), cached=not missing)
+
+        return filepaths
+
+    async def render_async(self, file_type=None, semaphore=None)->bytes:
+        """Render the network in an asyncio subprocess and give the image as bytes
+
+        The DOT source is piped to the layout process over stdin, nothing is written to the graphs directory.
+        Building the source, the native layout and the render cache files run in the default executor of the
+        loop, so the event loop is never blocked by them
+
+        Parameters
+        ----------
+        file_type : str, optional
+            Format of the image. Default is the file_type of the visualizer
+        semaphore : asyncio.Semaphore, optional
+            Limits the number of concurrently running layout processes, share one between
+            all the requests of a server. Default is None, no limit
+
+        Returns
+        -------
+        data : bytes
+            The image
+
+        Raises
+        ------
+        CannotCreateModel
+            When a model cannot be created under certain conditions
+        NotAValidOption
+            When the engine is 'native' and the file_type is not one of 'svg', 'png', 'pdf'
+
+        Examples
+        --------
+        >>> limit = asyncio.Semaphore(8)
+        >>>
+        >>> async def diagram(request):
+        ...     network = build_network(request)
+        ...     return await network.render_async('svg', semaphore=limit)
+        """
+
+        import asyncio
+        from .backend import pipe_async
+
+        if self.layers_ < 2:
+            raise CannotCreateModel("Cannot draw Neural Network, Add atleast two layers to the network")
+
+        file_type = (file_type or self.file_type).lower()
+        timer = self.timer
+        loop = asyncio.get_running_loop()
+
+        if self.engine == 'native':
+            if file_type not in self.native_filetypes:
+                raise NotAValidOption(file_type, list(self.native_filetypes))
+
+            if timer is not None:
+                start = timer.start()
+
+            data = await loop.run_in_executor(None, lambda: self._layout().to_bytes(file_type))
+
+            if timer is not None:
+                timer.stop('layout', start, file_type=file_type)
+
+            return data
+
+        source = await loop.run_in_executor(None, self._build_source)
+        engine = self.network_.engine
+
+        if timer is not None:
+            start = timer.start()
+
+        data = None
+        if self.cache is not None:
+            key = self.cache.key(source, file_type, engine)
+            data = await loop.run_in_executor(None, self.cache.get, key, file_type)
+        cached = data is not None
+
+        if data is None:
+            data = await pipe_async(source, file_type, engine, semaphore)
+            if self.cache is not None:
+                await loop.run_in_executor(None, self.cache.put, key, file_type, data)
+
+        if timer is not None:
+            timer.stop('render', start, file_type=file_type, cached=cached)
+
+        return data
+
+    def export_html(self, directory='./graphs')->str:
+        """Write the network as a self-contained interactive HTML viewer
+
+        The layer table and the coordinates of the native layout are embedded in the file, the
+        viewer draws only the layers inside the window on a canvas, with pan, zoom, and search by
+        layer name, so it opens fast for networks where a full SVG would freeze the browser
+
+        Parameters
+        ----------
+        directory : str, optional
+            Directory in which the file is written. Default is './graphs'
+
+        Returns
+        -------
+        filepath : str
+            Path of the HTML file
+
+        Raises
+        ------
+        CannotCreateModel
+            When a model cannot be created under certain conditions
+        """
+
+        from .viewer import to_html
+
+        if self.layers_ < 2:
+            raise CannotCreateModel("Cannot draw Neural Network, Add atleast two layers to the network")
+
+        timer = self.timer
+        if timer is not None:
+            start = timer.start()
+
+        with self._lock:
+            page = to_html(self)
+
+        os.makedirs(directory, exist_ok=True)
+        filepath = os.path.join(directory, self.filename+'.html')
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(page)
+
+        if timer is not None:
+            timer.stop('layout', start, file_type='html')
+
+        return filepath
+
+    def visualize(self, give_obj=False, html=False):
         """Visualize the network
 
         Opens an image containing the visualised network
@@ -453,11 +1941,14 @@ class visualizer():
         ----------
         give_obj : bool, optional
             If set true, returns the graph object. Default is False
+        html : bool, optional
+            If set true, opens the interactive HTML viewer in the web browser instead of the image. Default is False
 
         Returns
         -------
         network_ : graphviz.dot.Graph
-            The graphviz graph object after complete building of the network
+            The graphviz graph object after complete building of the network,
+            or the LayeredLayout object when the engine is 'native'
 
         Raises
         ------
@@ -468,16 +1959,30 @@ class visualizer():
         if self.layers_ < 2:
             raise CannotCreateModel("Cannot draw Neural Network, Add atleast two layers to the network")
 
-        self._build_network()
-
         if give_obj:
+            if self.engine == 'native':
+                return self._layout()
+
+            self._build_network()
+
             return self.network_
 
-        self.network_.view()
+        if html:
+            import webbrowser
+
+            webbrowser.open('file://'+os.path.abspath(self.export_html()))
+
+            return
+
+        import graphviz as gv
+
+        gv.view(self.render())
 
         return
 
 if __name__ == '__main__':
+    import tensorflow as tf
+
     input_nodes = 7
     hidden_nodes = 12
     output_nodes = 4
@@ -24,11 +24,13 @@ setup_args = dict(
         "Natural Language :: English",
         "Intended Audience :: Developers",
         "Intended Audience :: Science/Research",
-        "Programming Language :: Python :: 2",
-        "Programming Language :: Python :: 2.7",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
+        "Programming Language :: Python :: 3 :: Only",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
         "Programming Language :: Python :: Implementation",
         "Operating System :: OS Independent",
         "License :: OSI Approved :: Apache Software License",
@@ -36,12 +38,23 @@ setup_args = dict(
         "Topic :: Scientific/Engineering :: Visualization",
         "Topic :: Scientific/Engineering :: Artificial Intelligence",
     ],
-    python_requires='>=2.7'
+    python_requires='>=3.8',
+    entry_points={
+        'console_scripts': ['nnviz=neuralnet_visualize.cli:main'],
+    }
 )
 
 install_requirments = [
     'graphviz>=0.14'
 ]
 
+extras_requirements = {
+    'torch': ['torch'],
+    'tf': ['tensorflow>=2.0.0'],
+    'native': ['cairosvg'],
+    'keras': ['h5py'],
+    'topk': ['numpy'],
+}
+
 if __name__ == '__main__':
-    setup(**setup_args, install_requires=install_requirments)
\ No newline at end of file
+    setup(**setup_args, install_requires=install_requirments, extras_require=extras_requirements)
\ No newline at end of file
@@ -0,0 +1,55 @@
+import os
+
+from neuralnet_visualize.cache import RenderCache
+
+def put(cache, source, mtime, size=1000):
+    key = cache.key(source, 'svg')
+    cache.put(key, 'svg', bytes(size))
+    # the least recently used order comes from the mtimes, set apart so that it does not depend on the clock
+    os.utime(cache._path(key, 'svg'), (mtime, mtime))
+
+    return key
+
+def test_lru_eviction_keeps_foreign_files(tmp_path):
+    notes = tmp_path / 'notes.txt'
+    notes.write_bytes(bytes(5000))
+    drawing = tmp_path / 'neuralnet.svg'
+    drawing.write_bytes(b'<svg/>')
+
+    cache = RenderCache(str(tmp_path), max_size=3000)
+    assert cache.size_ == 0
+
+    a = put(cache, 'a', 100)
+    b = put(cache, 'b', 200)
+    c = put(cache, 'c', 300)
+    assert cache.size_ == 3000 and cache.evictions_ == 0
+
+    # a becomes the most recently used, b is then the least recently used
+    assert cache.get(a, 'svg') == bytes(1000)
+    d = cache.key('d', 'svg')
+    cache.put(d, 'svg', bytes(1000))
+
+    assert cache.evictions_ == 1
+    assert not os.path.exists(cache._path(b, 'svg'))
+    # checked without get(), which would touch them
+    assert all(os.path.exists(cache._path(key, 'svg')) for key in [a, c, d])
+    assert cache.size_ == 3000
+    assert notes.read_bytes() == bytes(5000) and drawing.exists()
+
+    cache.put(cache.key('e', 'svg'), 'svg', bytes(2500))
+    assert cache.get(c, 'svg') is None
+    assert cache.stats()['size'] <= 3000
+    assert notes.exists() and drawing.exists()
+
+    cache.clear()
+    assert cache.size_ == 0
+    assert sorted(os.listdir(tmp_path)) == ['neuralnet.svg', 'notes.txt']
+
+def test_stats_counts(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    key = cache.key('graph {}', 'png')
+
+    assert cache.fetch('graph {}', 'png', lambda: b'image') == b'image'
+    assert cache.fetch('graph {}', 'png', lambda: b'other') == b'image'
+    assert cache.get(key, 'png') == b'image'
+    assert cache.stats() == dict(hits=2, misses=1, evictions=0, size=5, max_size=cache.max_size)
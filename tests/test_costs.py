@@ -0,0 +1,59 @@
+import pytest
+
+from neuralnet_visualize.exceptions import CannotCreateModel
+from neuralnet_visualize.visualize import visualizer
+
+MLP = {'layers': [{'class_name': 'Dense', 'config': {'units': 256, 'name': 'hidden'}},
+                  {'class_name': 'Dense', 'config': {'units': 10, 'name': 'logits'}}]}
+
+def test_converted_dense_has_weights():
+    network = visualizer()
+    network.from_adapter('keras_config', MLP)
+
+    costs = network.costs((784,))
+
+    assert [cost.params for cost in costs] == [784 * 256 + 256, 256 * 10 + 10]
+    assert sum(cost.params for cost in costs) == 203530
+    assert [cost.macs for cost in costs] == [784 * 256, 256 * 10]
+    assert [cost.output_shape for cost in costs] == [(256,), (10,)]
+
+def test_converted_needs_input_shape():
+    network = visualizer()
+    network.from_adapter('keras_config', MLP)
+
+    with pytest.raises(CannotCreateModel):
+        network.costs()
+
+def test_input_layer_without_input_shape():
+    network = visualizer()
+    network.add_layer('dense', 784)
+    network.add_layer('dense', 256)
+    network.add_layer('dense', 10)
+
+    costs = network.costs()
+
+    assert [cost.params for cost in costs] == [0, 784 * 256 + 256, 256 * 10 + 10]
+
+def test_input_shape_weighs_the_first_dense_layer():
+    network = visualizer()
+    network.add_layer('dense', 256)
+    network.add_layer('dense', 10)
+
+    assert [cost.params for cost in network.costs((784,))] == [784 * 256 + 256, 256 * 10 + 10]
+
+def test_conv_net():
+    network = visualizer()
+    network.add_layer('conv2d', filters=32, kernel_size=3, padding='valid', stride=1)
+    network.add_layer('maxpool2d', pool_size=2)
+    network.add_layer('flatten')
+    network.add_layer('dense', 10)
+
+    costs = network.costs((1, 28, 28), batch_size=2)
+
+    assert [cost.output_shape for cost in costs] == [(32, 26, 26), (32, 13, 13), (5408,), (10,)]
+    assert [cost.params for cost in costs] == [(9 + 1) * 32, 0, 0, 5408 * 10 + 10]
+    assert costs[0].macs == 2 * 9 * 32 * 26 * 26
+    assert costs[3].activation_bytes == 2 * 10 * 4
+
+    with pytest.raises(CannotCreateModel):
+        network.costs()
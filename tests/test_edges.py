@@ -0,0 +1,112 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from neuralnet_visualize.edges import as_matrix, edge_style, top_edges
+from neuralnet_visualize.exceptions import CannotCreateModel, NotAValidOption
+from neuralnet_visualize.visualize import visualizer
+
+WEIGHTS = np.array([[0.1, -0.9, 0.3],
+                    [0.5, 0.0, -0.2],
+                    [-0.8, 0.4, 0.6]])
+
+def test_top_edges():
+    edges = top_edges(WEIGHTS, [0, 1, 2], [0, 1, 2], 3)
+
+    # in the order of the inputs, not of the magnitudes
+    assert [(tail, head) for tail, head, _ in edges] == [(0, 1), (2, 0), (2, 2)]
+    assert [round(strength, 6) for _, _, strength in edges] == [1.0, round(0.8 / 0.9, 6), round(0.6 / 0.9, 6)]
+
+def test_top_edges_of_drawn_units():
+    # the positions are among the drawn rows and columns, not the indices of the weights
+    edges = top_edges(WEIGHTS, [1, 2], [0, 2], 2)
+
+    assert [(tail, head) for tail, head, _ in edges] == [(1, 0), (1, 1)]
+    assert edges[0][2] == 1.0
+
+def test_ties():
+    weights = np.array([[1.0, -1.0, 0.5],
+                        [1.0, 0.5, -1.0]])
+
+    edges = top_edges(weights, [0, 1], [0, 1, 2], 3)
+
+    # three of the four largest magnitudes are kept, sorted, all of strength 1
+    kept = [(tail, head) for tail, head, _ in edges]
+    assert len(kept) == 3 and kept == sorted(kept)
+    assert set(kept) < {(0, 0), (0, 1), (1, 0), (1, 2)}
+    assert all(strength == 1.0 for _, _, strength in edges)
+
+    # the same selection every time, so that the DOT source is stable
+    assert top_edges(weights, [0, 1], [0, 1, 2], 3) == edges
+
+def test_k_larger_than_the_edges():
+    edges = top_edges(WEIGHTS, [0, 1, 2], [0, 1, 2], 100)
+
+    assert [(tail, head) for tail, head, _ in edges] == [(i, j) for i in range(3) for j in range(3)]
+    assert max(strength for _, _, strength in edges) == 1.0
+
+def test_zero_weights():
+    edges = top_edges(np.zeros((2, 2)), [0, 1], [0, 1], 2)
+
+    assert len(edges) == 2 and all(strength == 1.0 for _, _, strength in edges)
+
+def test_as_matrix_and_style():
+    matrix = as_matrix([[1, 2], [3, 4]])
+
+    assert matrix.shape == (2, 2) and matrix.dtype == np.float64
+    assert as_matrix(WEIGHTS) is WEIGHTS
+    assert edge_style(1.0) == 'color="#000000" penwidth=3.00'
+    assert edge_style(0.0) == 'color="#c8c8c8" penwidth=0.50'
+
+def weighted(**options):
+    network = visualizer(**{'edges': 'topk', **options})
+    network.add_layer('dense', 3)
+    network.add_layer('dense', 3, weights=WEIGHTS.tolist())
+
+    return network
+
+def source(network):
+    return network.visualize(give_obj=True).source
+
+def test_topk_edges_drawn():
+    network = weighted(top_k=2)
+
+    text = source(network)
+    assert text.count(' -- ') == 2
+    assert 'Dense_input_0 -- Dense_hidden1_1 [color="#000000" penwidth=3.00]' in text
+
+@pytest.mark.parametrize('weights', [[[1.0, 2.0, 3.0]] * 2 + [[1.0, 2.0]],
+                                     np.ones((3, 2)),
+                                     np.ones(3)])
+def test_invalid_weights_leave_the_network_unchanged(weights):
+    network = weighted()
+    before = source(network)
+
+    with pytest.raises(CannotCreateModel):
+        network.add_layer('dense', 3, weights=weights)
+
+    assert network.layers_ == 2 and sorted(network.layer_weights_) == [1]
+    assert source(network) == before
+
+@pytest.mark.parametrize('option, value', [('top_k', 4), ('max_nodes', 2), ('edges', 'all')])
+def test_options_changed_after_a_build(option, value):
+    network = weighted()
+    source(network)
+
+    setattr(network, option, value)
+
+    assert source(network) == source(weighted(**{option: value}))
+
+def test_invalid_options():
+    network = weighted()
+
+    with pytest.raises(CannotCreateModel):
+        network.top_k = 0
+    with pytest.raises(CannotCreateModel):
+        network.max_nodes = 0
+    with pytest.raises(CannotCreateModel):
+        visualizer(top_k=0)
+    with pytest.raises(NotAValidOption):
+        network.edges = 'strongest'
+
+    assert network.top_k == 20 and network.max_nodes == 10 and network.edges == 'topk'
@@ -0,0 +1,119 @@
+import re
+
+import pytest
+
+from neuralnet_visualize.folding import Run, find_runs, layer_signatures, visible_layers
+from neuralnet_visualize.layers import LayerTable
+from neuralnet_visualize.visualize import visualizer
+
+@pytest.mark.parametrize('signatures, runs', [
+    ([], []),
+    ([0], [Run(0, 1, 1)]),
+    ([0, 1, 2], [Run(0, 1, 1), Run(1, 1, 1), Run(2, 1, 1)]),
+    # a run between single layers
+    ([0, 1, 1, 1, 2], [Run(0, 1, 1), Run(1, 1, 3), Run(4, 1, 1)]),
+    # a block of two layers, then a partial copy which is not folded
+    ([0, 1, 2, 1, 2, 1, 2, 1], [Run(0, 1, 1), Run(1, 2, 3), Run(7, 1, 1)]),
+    # the smallest period covering the most layers
+    ([3, 3, 3, 3], [Run(0, 1, 4)]),
+    # two runs side by side
+    ([1, 1, 2, 2, 2], [Run(0, 1, 2), Run(2, 1, 3)]),
+    # the longer period wins when it covers more layers
+    ([1, 1, 2, 1, 1, 2], [Run(0, 3, 2)]),
+])
+def test_find_runs(signatures, runs):
+    found = find_runs(signatures)
+
+    assert found == runs
+    # the runs cover all the layers in order
+    assert sum(run.period * run.count for run in found) == len(signatures)
+
+def test_max_period():
+    signatures = [0, 1, 2, 3] * 2
+
+    assert find_runs(signatures, max_period=3) == [Run(i, 1, 1) for i in range(8)]
+    assert find_runs(signatures, max_period=4) == [Run(0, 4, 2)]
+
+def test_visible_layers():
+    assert visible_layers([Run(0, 1, 1), Run(1, 2, 3), Run(7, 1, 1)]) == [0, 1, 2, 7]
+
+def test_layer_signatures():
+    table = LayerTable()
+    table.append('a', 'dense', 4, {})
+    table.append('b', 'dense', 4, {})
+    table.append('c', 'dense', 5, {})
+    table.append('d', 'conv2d', 1, dict(filters=8, kernel_size=3))
+    table.append('e', 'conv2d', 1, dict(kernel_size=3, filters=8))
+    table.append('f', 'conv2d', 1, dict(filters=8, kernel_size=(3, 3)))
+
+    signatures = layer_signatures(table)
+
+    assert signatures[0] == signatures[1] and signatures[1] != signatures[2]
+    assert signatures[3] == signatures[4] != signatures[5]
+
+def folded(layers, **options):
+    network = visualizer(fold=True, **options)
+    for params in layers:
+        network.add_layer(**params)
+
+    return network, network.visualize(give_obj=True).source
+
+BLOCKS = ([dict(layer_type='conv2d', filters=8)]
+          + [dict(layer_type='conv2d', filters=16), dict(layer_type='maxpool2d')] * 3
+          + [dict(layer_type='flatten'), dict(layer_type='dense', nodes=4)])
+
+def test_folded_labels_and_edges():
+    network, source = folded(BLOCKS)
+
+    assert re.findall(r'label="× (\d+)"', source) == ['3']
+    assert 'cluster_repeat_1' in source
+    # only the first copy of the run is drawn
+    assert 'Conv2d_hidden1' in source and 'Conv2d_hidden2' not in source and 'Maxpool2d_3' not in source
+    # the last layer of the first copy is connected to the layer after the run
+    assert 'Maxpool2d_1 -- Flatten_4' in source
+    assert 'Conv2d_input -- Conv2d_hidden1' in source and 'Conv2d_hidden1 -- Maxpool2d_1' in source
+    assert 'Maxpool2d_1 -- Conv2d_hidden2' not in source
+    assert source.count('fillcolor=red') == 4
+
+def test_folded_dense_run_at_the_end():
+    network, source = folded([dict(layer_type='dense', nodes=3)] + [dict(layer_type='dense', nodes=5)] * 4)
+
+    assert re.findall(r'label="× (\d+)"', source) == ['4']
+    # the output is the last visible layer, the first copy of the run
+    assert 'Dense_hidden1_0 [fillcolor=red' in source
+    assert network._edge_pairs() == [(0, 1)]
+
+def test_single_layer_runs_are_not_clustered():
+    network, source = folded([dict(layer_type='dense', nodes=n) for n in [3, 4, 5, 6]])
+
+    assert 'cluster_repeat' not in source
+    assert source == unfolded([3, 4, 5, 6])
+
+def unfolded(sizes):
+    network = visualizer()
+    for n in sizes:
+        network.add_layer('dense', n)
+
+    return network.visualize(give_obj=True).source
+
+def test_graph_is_not_folded():
+    network = visualizer(fold=True)
+    network.add_layer('dense', 3)
+    for _ in range(4):
+        network.add_layer('dense', 5)
+    network.add_layer('dense', 2, inputs=[0, 4])
+
+    source = network.visualize(give_obj=True).source
+
+    assert 'cluster_repeat' not in source
+    assert [run.count for run in network._runs()] == [1] * 6
+    assert sorted(network._edge_pairs()) == [(0, 1), (0, 5), (1, 2), (2, 3), (3, 4), (4, 5)]
+
+def test_summary_rows(capsys):
+    network, _ = folded(BLOCKS)
+    network.summarize()
+
+    out = capsys.readouterr().out
+    assert "× 3 : Conv2d_hidden1 to Maxpool2d_3" in out
+    # the rows of the first copy only
+    assert out.count("Conv2d_hidden1") == 2 and "Conv2d_hidden2" not in out
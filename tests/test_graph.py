@@ -0,0 +1,159 @@
+import json
+import zipfile
+
+import pytest
+
+from neuralnet_visualize.exceptions import CannotCreateModel
+from neuralnet_visualize.graph import LayerGraph
+from neuralnet_visualize.visualize import visualizer
+
+def test_csr():
+    graph = LayerGraph(5, [0, 0, 1, 2, 3, 0], [1, 2, 3, 3, 4, 4])
+
+    assert len(graph) == 5
+    assert list(graph.offsets) == [0, 3, 4, 5, 6, 6]
+    assert list(graph.targets) == [1, 2, 4, 3, 3, 4]
+    assert list(graph.reverse_offsets) == [0, 0, 1, 2, 4, 6]
+    assert list(graph.sources) == [0, 0, 1, 2, 3, 0]
+    assert list(graph.successors(0)) == [1, 2, 4] and list(graph.successors(4)) == []
+    assert list(graph.predecessors(3)) == [1, 2] and list(graph.predecessors(0)) == []
+    assert list(graph.edges()) == [(0, 1), (0, 2), (0, 4), (1, 3), (2, 3), (3, 4)]
+    assert graph.topological_order() == [0, 1, 2, 3, 4]
+    assert graph.levels() == [0, 1, 1, 2, 3]
+
+def test_topological_order_of_unordered_layers():
+    graph = LayerGraph(4, [3, 3, 1, 0], [1, 0, 2, 2])
+
+    order = graph.topological_order()
+
+    assert order == [3, 1, 0, 2]
+    assert graph.levels(order) == [1, 1, 2, 0]
+
+def test_empty_and_invalid_graphs():
+    assert LayerGraph(0, [], []).topological_order() == []
+    assert LayerGraph(3, [], []).levels() == [0, 0, 0]
+
+    with pytest.raises(CannotCreateModel):
+        LayerGraph(2, [0], [2])
+    with pytest.raises(CannotCreateModel):
+        LayerGraph(2, [-1], [1])
+    with pytest.raises(CannotCreateModel):
+        LayerGraph(3, [0, 1, 2], [1, 2, 1]).topological_order()
+
+def residual():
+    network = visualizer()
+    network.add_layer('dense', 4)
+    network.add_layer('dense', 6)
+    network.add_layer('dense', 6)
+    network.add_layer('dense', 3, inputs=['Dense_hidden1', 2, 2])
+    network.add_layer('dense', 2, inputs=[])
+    network.add_layer('dense', 2, inputs=[4, 'Dense_hidden3'])
+
+    return network
+
+def test_inputs_by_name_and_index():
+    network = residual()
+
+    assert not network._chain_
+    assert list(zip(network._edge_sources_, network._edge_targets_)) == [(0, 1), (1, 2), (1, 3), (2, 3), (4, 5), (3, 5)]
+    assert list(network._in_degree_) == [0, 1, 1, 2, 0, 2]
+    assert list(network._out_degree_) == [1, 2, 1, 1, 1, 0]
+    assert list(network.layer_graph_.predecessors(5)) == [4, 3]
+    assert network._first_inputs() == [None, 0, 1, 1, None, 4]
+
+    source = network.visualize(give_obj=True).source
+    assert 'Dense_hidden1_5 -- Dense_hidden3_2' in source
+    assert 'Dense_hidden4_1 -- Dense_hidden5_1' in source
+    # the layers without inputs are drawn as inputs
+    assert 'Dense_hidden4_0 [fillcolor=yellow' in source
+
+def test_sinks():
+    network = residual()
+    assert network._sinks() == [5]
+
+    network.add_layer('dense', 2, inputs=[1])
+    assert network._sinks() == [5, 6]
+    assert network.visualize(give_obj=True).source.count('fillcolor=red') == 4
+
+    chain = visualizer()
+    assert chain._sinks() == []
+    chain.add_layer('dense', 3)
+    chain.add_layer('dense', 2)
+    assert chain._chain_ and chain._sinks() == [1]
+
+def test_invalid_inputs():
+    network = residual()
+    layers = network.layers_
+
+    with pytest.raises(CannotCreateModel):
+        network.add_layer('dense', 2, inputs=['missing'])
+    with pytest.raises(CannotCreateModel):
+        network.add_layer('dense', 2, inputs=[layers])
+    with pytest.raises(CannotCreateModel):
+        network.add_layer('dense', 2, inputs=[-1])
+
+    assert network.layers_ == layers
+
+def keras2(name, class_name, config, inbound):
+    nodes = [[[layer, 0, 0, {}] for layer in inbound]] if inbound else []
+    return dict(name=name, class_name=class_name, config=dict(config, name=name), inbound_nodes=nodes)
+
+def keras3(name, class_name, config, inbound):
+    def tensor(layer):
+        return {'class_name': '__keras_tensor__', 'config': {'shape': [None, 8], 'dtype': 'float32', 'keras_history': [layer, 0, 0]}}
+    args = [[tensor(layer) for layer in inbound]] if len(inbound) > 1 else [tensor(layer) for layer in inbound]
+    nodes = [{'args': args, 'kwargs': {}}] if inbound else []
+    return dict(name=name, class_name=class_name, config=dict(config, name=name), inbound_nodes=nodes)
+
+def functional(layer):
+    # a residual block with an Add merge and a side branch, listed out of order
+    layers = [layer('in', 'InputLayer', {}, []),
+              layer('d1', 'Dense', {'units': 8}, ['in']),
+              layer('relu', 'Activation', {}, ['d1']),
+              layer('d2', 'Dense', {'units': 8}, ['relu']),
+              layer('add', 'Add', {}, ['d2', 'd1']),
+              layer('out', 'Dense', {'units': 2}, ['add']),
+              layer('side', 'Dense', {'units': 3}, ['d1'])]
+
+    return {'name': 'model', 'layers': layers[::-1]}
+
+def check(network, base=0):
+    assert network.layer_units_[base:] == [8, 3, 8, 2]
+    edges = [(a - base, b - base) for a, b in zip(network._edge_sources_, network._edge_targets_) if b >= base]
+    # the Activation and the Add are not drawn, the layers around them are connected
+    assert sorted(edges) == [(0, 1), (0, 2), (0, 3), (2, 3)]
+    assert [i for i in network._sinks() if i >= base] == [base + 1, base + 3]
+
+@pytest.mark.parametrize('layer', [keras2, keras3])
+def test_keras_config(layer):
+    network = visualizer()
+    network.from_adapter('keras_config', functional(layer))
+    check(network)
+
+    # the inputs are positions among the layers of the model, after the layers already added
+    network = visualizer()
+    network.add_layer('dense', 4)
+    network.from_adapter('keras_config', functional(layer))
+    check(network, base=1)
+
+@pytest.mark.parametrize('layer', [keras2, keras3])
+def test_keras_file(tmp_path, layer):
+    path = str(tmp_path / 'model.keras')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('config.json', json.dumps({'class_name': 'Functional', 'config': functional(layer)}))
+        archive.writestr('model.weights.h5', bytes(1024))
+
+    network = visualizer()
+    network.from_keras_file(path)
+    check(network)
+
+def test_keras_h5_file(tmp_path):
+    h5py = pytest.importorskip('h5py')
+
+    path = str(tmp_path / 'model.h5')
+    with h5py.File(path, 'w') as f:
+        f.attrs['model_config'] = json.dumps({'class_name': 'Functional', 'config': functional(keras2)})
+
+    network = visualizer()
+    network.from_keras_file(path)
+    check(network)
@@ -0,0 +1,120 @@
+import struct
+
+import pytest
+
+from neuralnet_visualize.adapters.onnx_file import read_graph, iter_layers
+from neuralnet_visualize.exceptions import CannotCreateModel
+from neuralnet_visualize.visualize import visualizer
+
+# The onnx.proto messages are encoded by hand, the reader must not need the onnx package
+
+def varint(value):
+    value = value & ((1 << 64) - 1)
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value = value >> 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def key(field, wire):
+    return varint(field << 3 | wire)
+
+def integer(field, value):
+    return key(field, 0) + varint(value)
+
+def message(field, payload):
+    return key(field, 2) + varint(len(payload)) + payload
+
+def string(field, text):
+    return message(field, text.encode('utf-8'))
+
+def packed(field, values):
+    return message(field, b''.join(varint(value) for value in values))
+
+def tensor(name, dims, size):
+    # TensorProto with the dims unpacked, as some exporters write them, and size bytes of raw_data
+    return b''.join(integer(1, dim) for dim in dims) + integer(2, 1) + string(8, name) + message(9, bytes(size))
+
+def attribute(name, value):
+    if isinstance(value, str):
+        return string(1, name) + string(4, value)
+    if isinstance(value, float):
+        return string(1, name) + key(2, 5) + struct.pack('<f', value)
+    if isinstance(value, list):
+        return string(1, name) + packed(8, value)
+    return string(1, name) + integer(3, value)
+
+def node(op_type, inputs, outputs, **attributes):
+    return (b''.join(string(1, name) for name in inputs) + b''.join(string(2, name) for name in outputs)
+            + string(4, op_type) + b''.join(message(5, attribute(name, value)) for name, value in attributes.items()))
+
+def model(nodes, initializers):
+    graph = b''.join(message(1, n) for n in nodes) + string(2, 'net') + b''.join(message(5, t) for t in initializers)
+    # ir_version, producer_name and a fixed64 field before the graph, which are all skipped
+    return integer(1, 8) + string(2, 'hand') + key(15, 1) + bytes(8) + message(7, graph)
+
+@pytest.fixture
+def onnx_path(tmp_path):
+    nodes = [node('Conv', ['x', 'conv.w', 'conv.b'], ['c'], kernel_shape=[3, 3], strides=[2, 2], pads=[1, 1, 1, 1]),
+             node('Relu', ['c'], ['r']),
+             node('MaxPool', ['r'], ['p'], kernel_shape=[2, 2], auto_pad='NOTSET'),
+             node('Flatten', ['p'], ['f'], axis=-1),
+             node('Gemm', ['f', 'fc.w', 'fc.b'], ['y'], alpha=1.0, transB=1)]
+    # 4 MiB of weights, which the reader skips by their length
+    initializers = [tensor('conv.w', [16, 3, 3, 3], 16 * 27 * 4), tensor('conv.b', [16], 64),
+                    tensor('fc.w', [10, 16384], 10 * 16384 * 4 * 6), tensor('fc.b', [10], 40)]
+
+    path = tmp_path / 'net.onnx'
+    path.write_bytes(model(nodes, initializers))
+
+    return str(path)
+
+def test_read_graph(onnx_path):
+    nodes, dims = read_graph(onnx_path)
+
+    assert [op_type for op_type, _, _, _ in nodes] == ['Conv', 'Relu', 'MaxPool', 'Flatten', 'Gemm']
+    assert nodes[0][1] == ['x', 'conv.w', 'conv.b']
+    assert nodes[3][3] == {'axis': -1}
+    assert nodes[4][3]['transB'] == 1
+    assert dims == {'conv.w': [16, 3, 3, 3], 'conv.b': [16], 'fc.w': [10, 16384], 'fc.b': [10]}
+
+def test_iter_layers(onnx_path):
+    assert list(iter_layers(onnx_path)) == [
+        dict(layer_type='conv2d', kernel_size=(3, 3), stride=(2, 2), padding=(1, 1), filters=16),
+        dict(layer_type='maxpool2d', pool_size=(2, 2)),
+        dict(layer_type='flatten'),
+        dict(layer_type='dense', nodes=10),
+    ]
+
+def test_from_onnx(onnx_path):
+    network = visualizer()
+    network.from_onnx(onnx_path)
+
+    assert network.layer_types_ == ['conv2d', 'maxpool2d', 'flatten', 'dense']
+    assert network.layer_units_[-1] == 10
+    assert network.from_onnx_called_
+
+    with pytest.raises(CannotCreateModel):
+        network.add_layer('dense', 2)
+
+def test_matmul_of_activations(tmp_path):
+    # attention scores, the product of two activations, then a projection by an initializer
+    nodes = [node('MatMul', ['q', 'k'], ['s']),
+             node('Softmax', ['s'], ['a']),
+             node('MatMul', ['a', 'v'], ['o']),
+             node('MatMul', ['o', 'proj.w'], ['y'])]
+    path = tmp_path / 'attention.onnx'
+    path.write_bytes(model(nodes, [tensor('proj.w', [64, 32], 64 * 32 * 4)]))
+
+    assert list(iter_layers(str(path))) == [dict(layer_type='dense', nodes=32)]
+
+def test_not_a_model(tmp_path):
+    path = tmp_path / 'other.onnx'
+    path.write_bytes(integer(1, 8) + string(2, 'no graph'))
+
+    with pytest.raises(ValueError):
+        read_graph(str(path))
@@ -0,0 +1,55 @@
+import threading
+
+from neuralnet_visualize.profiling import StageTimer
+from neuralnet_visualize.visualize import visualizer
+
+def run_threads(target, count=8):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_stats_and_reset():
+    ticks = iter(range(100))
+    timer = StageTimer(clock=lambda: next(ticks))
+
+    start = timer.start()
+    timer.stop('custom', start)
+    start = timer.start()
+    timer.stop('build', start, layers=3)
+
+    # the stages of the pipeline first, then the others by name
+    assert timer.stats() == {'build': dict(seconds=1, calls=1), 'custom': dict(seconds=1, calls=1)}
+
+    timer.reset()
+    assert timer.stats() == {}
+
+def test_concurrent_stops():
+    timer = StageTimer(clock=lambda: 0.0)
+
+    def stop():
+        for _ in range(2000):
+            timer.stop('build', timer.start())
+
+    run_threads(stop)
+
+    assert timer.calls_ == {'build': 8 * 2000}
+
+def test_shared_by_visualizers_in_threads():
+    calls = []
+    timer = StageTimer(lambda stage, start, end, info: calls.append(stage))
+
+    def draw():
+        network = visualizer(timer=timer)
+        for nodes in [4, 6, 2]:
+            network.add_layer('dense', nodes)
+        for _ in range(20):
+            network.visualize(give_obj=True)
+
+    run_threads(draw)
+
+    stats = timer.stats()
+    assert stats['add_layer']['calls'] == 8 * 3
+    assert stats['build']['calls'] == 8 * 20
+    assert sum(stage['calls'] for stage in stats.values()) == len(calls)
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from neuralnet_visualize.snapshot import HEADER, MAGIC, VERSION, read_snapshot
+from neuralnet_visualize.visualize import visualizer
+
+def build():
+    network = visualizer(title="Residual", fold=False, max_nodes=6)
+    network.add_layer('conv2d', filters=8, kernel_size=(3, 5), padding='same', stride=(1, 2))
+    network.add_layer('maxpool2d', pool_size=2)
+    network.add_layer('flatten')
+    network.add_layer('dense', 12)
+    network.add_layer('dense', 12)
+    network.add_layer('dense', 4, inputs=['Dense_hidden1', 3])
+    network.set_color_encoding({'hidden': 'blue'})
+
+    return network
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'net.nnviz')
+    assert build().save(path) == os.path.getsize(path)
+
+    return path
+
+def test_round_trip(path):
+    network = build()
+    loaded = visualizer.load(path)
+
+    assert loaded.title == network.title and loaded.max_nodes == network.max_nodes
+    assert loaded.layer_names_ == network.layer_names_
+    assert loaded.layer_params_ == network.layer_params_
+    assert list(loaded._edge_sources_) == list(network._edge_sources_)
+    assert list(loaded._edge_targets_) == list(network._edge_targets_)
+    assert loaded.color_encoding['hidden'] == 'blue'
+    assert loaded.visualize(give_obj=True).source == network.visualize(give_obj=True).source
+
+def test_columns(path):
+    snapshot = read_snapshot(path)
+
+    assert list(snapshot['units']) == [1, 1, 1, 12, 12, 4]
+    assert list(zip(snapshot['sources'], snapshot['targets'])) == [(0, 1), (1, 2), (2, 3), (3, 4), (3, 5)]
+    # tuples are kept, so that the labels are the same
+    assert snapshot['meta']['params'][0]['kernel_size'] == (3, 5)
+
+def test_truncated(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    for size in [len(data) - 1, HEADER.size + 3, HEADER.size - 1]:
+        with open(path, 'wb') as f:
+            f.write(data[:size])
+
+        with pytest.raises(ValueError):
+            visualizer.load(path)
+
+def test_newer_version(path):
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    _, _, flags, n, edges, meta_size = HEADER.unpack_from(data, 0)
+    data[:HEADER.size] = HEADER.pack(MAGIC, VERSION + 1, flags, n, edges, meta_size)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    with pytest.raises(ValueError, match="version"):
+        read_snapshot(path)
+
+def test_not_a_snapshot(tmp_path):
+    empty = tmp_path / 'empty.nnviz'
+    empty.write_bytes(b'')
+    other = tmp_path / 'other.nnviz'
+    other.write_bytes(b'PK\x03\x04' + bytes(HEADER.size))
+
+    for path in [empty, other]:
+        with pytest.raises(ValueError):
+            read_snapshot(str(path))
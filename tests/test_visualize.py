@@ -0,0 +1,81 @@
+import pytest
+
+from neuralnet_visualize.exceptions import CannotCreateModel, NotAValidOption
+from neuralnet_visualize.visualize import visualizer
+
+LAYERS = [dict(layer_type='conv2d', filters=8, kernel_size=(3, 5), stride=2),
+          dict(layer_type='maxpool2d', pool_size=2),
+          dict(layer_type='flatten'),
+          dict(layer_type='dense', nodes=12),
+          dict(layer_type='dense', nodes=4)]
+
+def build(layers=LAYERS, **options):
+    network = visualizer(**options)
+    for params in layers:
+        network.add_layer(**params)
+
+    return network
+
+def source(network):
+    return network.visualize(give_obj=True).source
+
+@pytest.mark.parametrize('params', [dict(layer_type='conv2d', kernel_size='3'),
+                                    dict(layer_type='conv2d', stride=[1]),
+                                    dict(layer_type='maxpool2d', pool_size=(2, 2.5)),
+                                    dict(layer_type='avgpool2d', pool_size=None)])
+def test_invalid_parameters_leave_the_network_unchanged(params):
+    network = build(LAYERS[:2])
+    before = source(network)
+
+    with pytest.raises(TypeError):
+        network.add_layer(**params)
+
+    assert network.layers_ == 2 and len(network.layer_table_) == 2
+    assert list(network._in_degree_) == [0, 1] and list(network._edge_sources_) == [0]
+    assert source(network) == before
+
+    for params in LAYERS[2:]:
+        network.add_layer(**params)
+    assert source(network) == source(build())
+
+def test_invalid_options():
+    network = build(LAYERS[:2])
+
+    with pytest.raises(NotAValidOption):
+        network.add_layer('lstm')
+    with pytest.raises(CannotCreateModel):
+        network.add_layer('dense', 3, inputs=['missing'])
+    with pytest.raises(CannotCreateModel):
+        network.add_layer('dense', 3, weights=[[1.0, 2.0]])
+
+    assert network.layers_ == 2 and list(network._out_degree_) == [1, 0]
+
+def test_visualize_twice():
+    network = build()
+
+    assert source(network) == source(network)
+
+@pytest.mark.parametrize('options', [dict(), dict(fold=True), dict(max_nodes=3)])
+def test_incremental_build(options):
+    layers = LAYERS + [dict(layer_type='dense', nodes=12), dict(layer_type='dense', nodes=4)] * 2
+    network = visualizer(**options)
+    for params in layers:
+        network.add_layer(**params)
+        if network.layers_ >= 2:
+            source(network)
+
+    assert source(network) == source(build(layers, **options))
+
+def test_incremental_restyle_and_costs():
+    network = build()
+    source(network)
+    network.set_color_encoding({'hidden': 'blue', 'conv2d': 'orange'})
+    network.annotate_costs((3, 32, 32))
+    network.add_layer('dense', 2)
+
+    fresh = build(LAYERS + [dict(layer_type='dense', nodes=2)])
+    fresh.set_color_encoding({'hidden': 'blue', 'conv2d': 'orange'})
+    fresh.annotate_costs((3, 32, 32))
+
+    assert source(network) == source(fresh)
+    assert 'fillcolor=blue' in source(network) and 'fillcolor=orange' in source(network)